@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:37:45 2026
+
+@author: gelenag
+
+Batch simulation of one Turing machine program over many inputs, and a multi-process runner
+for job lists of (machine file, input) pairs
+
+    python -m UNN.Batch jobs.jsonl -o results.jsonl --processes 4 --max-steps 100000
+
+Every line of the job file is a JSON object with the keys machine (path of a program), input and
+optionally max_steps, start_state, accept_states and blank_symbol (needed for the plain format
+of Programs/*.txt), id (copied to the result). Machines in the header format of TMs/*.txt run
+on their initial tape when the input is missing.
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import multiprocessing
+import sys
+import numpy as np
+from UNN.Turing import TuringMachine, TuringMachineConfiguration
+from UNN.Loader import read_machine, is_binary
+
+
+class BatchTuringMachine:
+    """Runs the compiled program of a TuringMachine over many inputs in lockstep with NumPy.
+    All tapes live in one 2-D matrix of symbol codes (one row per input), heads and states are
+    vectors, and every step does one gathered lookup in the flat transition tables for the whole
+    batch. Machines that halted or were rejected are masked out.
+    Arguments:
+        machine:    a TuringMachine with a loaded program"""
+
+    def __init__(self, machine):
+        if not machine.machine_has_program:
+            raise Exception("No program loaded")
+        self.program = machine.program
+
+    def _tables(self):
+        program = self.program
+        return (np.array(program.next_state, dtype=np.int64),
+                np.array(program.write, dtype=np.int64),
+                np.array(program.move, dtype=np.int64),
+                np.array(program.halting, dtype=bool))
+
+    def run(self, inputs, max_steps=None):
+        """Run every input string until its machine halts, is rejected or made max_steps steps.
+        Returns one dict per input with the keys input, status ('halted', 'rejected' or 'budget'),
+        steps, state, head (relative to the first input cell) and tape (blanks stripped)."""
+        program = self.program
+        inputs = list(inputs)
+        encoded = [program.encode(input_string) for input_string in inputs]
+        next_states, writes, moves, halting = self._tables()
+        n_states = program.n_states
+        batch = len(inputs)
+
+        # tape matrix with a blank margin on both sides, column `offset` is the first input cell
+        offset = 16
+        width = max([len(codes) for codes in encoded] + [1]) + 2 * offset
+        dtype = np.uint8 if len(program.symbols) <= 256 else np.uint32
+        tape = np.full((batch, width), program.blank, dtype=dtype)
+        for row, codes in enumerate(encoded):
+            tape[row, offset:offset + len(codes)] = codes
+
+        head = np.full(batch, offset, dtype=np.int64)
+        state = np.full(batch, program.start, dtype=np.int64)
+        steps = np.zeros(batch, dtype=np.int64)
+        rejected = np.zeros(batch, dtype=bool)
+        active = np.flatnonzero(~halting[state])
+        n_step = 0
+
+        while len(active) and (max_steps is None or n_step < max_steps):
+            # grow the tape matrix geometrically when a head reached the margin
+            h = head[active]
+            if h.min() == 0 or h.max() == width - 1:
+                tape = np.pad(tape, ((0, 0), (width, width)), constant_values=program.blank)
+                head += width
+                offset += width
+                width *= 3
+                h = head[active]
+
+            t = tape[active, h].astype(np.int64) * n_states + state[active]
+            nxt = next_states[t]
+            ok = nxt >= 0
+            if not ok.all():
+                rejected[active[~ok]] = True
+                active, h, t, nxt = active[ok], h[ok], t[ok], nxt[ok]
+
+            tape[active, h] = writes[t]
+            head[active] = h + moves[t]
+            state[active] = nxt
+            steps[active] += 1
+            n_step += 1
+
+            active = active[~halting[nxt]]
+
+        results = []
+        blank = program.blank_symbol
+        for row, input_string in enumerate(inputs):
+            if rejected[row]:
+                status = "rejected"
+            elif halting[state[row]]:
+                status = "halted"
+            else:
+                status = "budget"
+            results.append({"input": input_string,
+                            "status": status,
+                            "steps": int(steps[row]),
+                            "state": program.states[state[row]],
+                            "head": int(head[row] - offset),
+                            "tape": ''.join(program.decode(tape[row].tolist())).strip(blank)})
+        return results
+
+
+# compiled machines of the running BatchRunner, forked workers inherit them
+_machines = {}
+
+
+def _init_worker(machines):
+    global _machines
+    if machines is not None:
+        _machines = machines
+
+
+def _run_job(task):
+    index, key, input_string, max_steps, job_id = task
+    tm = copy.copy(_machines[key])
+    tm.reset(input_string)
+    # the engine reports rejections on stdout, which may be the result stream
+    with contextlib.redirect_stdout(io.StringIO()):
+        if max_steps is None:
+            status = tm._execute()
+        else:
+            status = tm._execute_checked(max_steps)
+    program = tm.program
+    left, right = tm.tape.span()
+    result = {"job": index,
+              "machine": key[0],
+              "input": input_string,
+              "status": status,
+              "steps": tm.steps,
+              "state": tm.current_state,
+              "head": tm.head_position,
+              "tape": ''.join(program.decode(tm.tape.to_list(left, right)))}
+    if job_id is not None:
+        result["id"] = job_id
+    return result
+
+
+def _run_jobs(tasks):
+    return [_run_job(task) for task in tasks]
+
+
+class BatchRunner:
+    """Runs jobs (machine file, input) on a pool of worker processes.
+    Every distinct machine is compiled once in the parent process. Where processes are forked the
+    workers inherit the compiled tables copy-on-write, elsewhere each worker receives them once at
+    start up, never with the tasks. Results come back in job order as dicts with the keys job
+    (index), machine, input, status (see RunResult), steps, state, head and tape (blanks stripped).
+    Arguments:
+        processes:  number of worker processes (default: all cores, 1 runs in this process)
+        cache:      optional UNN.Cache.CompileCache for the compiled machines
+        chunk_size: number of jobs sent to a worker at a time"""
+
+    def __init__(self, processes=None, cache=None, chunk_size=16):
+        self.processes = processes or multiprocessing.cpu_count()
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self.machines = {}
+        self.initial_tapes = {}
+
+    def machine(self, job):
+        """Compile the machine of a job (once per distinct machine), returns its key"""
+        path = job["machine"]
+        accept_states = job.get("accept_states")
+        key = (path, job.get("start_state"), None if accept_states is None else tuple(accept_states),
+               job.get("blank_symbol", "_"))
+        if key not in self.machines:
+            if not is_binary(path) and read_machine(path)[0]:
+                config = TuringMachineConfiguration.load(path, blank_symbol=key[3])
+                tm = TuringMachine()
+                tm.load_configuration(config, cache=self.cache)
+                self.initial_tapes[key] = config.tape
+            else:
+                tm = TuringMachine(start_state=key[1], accept_states=accept_states, blank_symbol=key[3])
+                tm.load_program(path, cache=self.cache)
+            self.machines[key] = tm
+        return key
+
+    def _tasks(self, jobs, max_steps):
+        for index, job in enumerate(jobs):
+            key = self.machine(job)
+            input_string = job.get("input")
+            if input_string is None:
+                input_string = self.initial_tapes.get(key, "")
+            yield (index, key, input_string, job.get("max_steps", max_steps), job.get("id"))
+
+    def run(self, jobs, max_steps=None):
+        """Run the jobs (iterable of dicts), yields one result per job as soon as it is available.
+        max_steps is the step budget of the jobs without their own max_steps (None: no budget)."""
+        global _machines
+        tasks = list(self._tasks(jobs, max_steps))
+        _machines = self.machines
+        if self.processes <= 1:
+            for task in tasks:
+                yield _run_job(task)
+            return
+        
+        chunks = [tasks[i:i + self.chunk_size] for i in range(0, len(tasks), self.chunk_size)]
+        if "fork" in multiprocessing.get_all_start_methods():
+            context, machines = multiprocessing.get_context("fork"), None
+        else:
+            context, machines = multiprocessing.get_context(), self.machines
+        with context.Pool(self.processes, _init_worker, (machines,)) as pool:
+            for results in pool.imap(_run_jobs, chunks):
+                yield from results
+
+    def run_file(self, job_path, output, max_steps=None):
+        """Run the jobs of a JSONL file and write the results as JSONL to output (a file object),
+        returns the number of jobs"""
+        with open(job_path) as f:
+            jobs = [json.loads(line) for line in f if line.strip()]
+        n = 0
+        for result in self.run(jobs, max_steps):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            n += 1
+        return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a JSONL file of Turing machine jobs")
+    parser.add_argument("jobs", help="JSONL file, one job per line")
+    parser.add_argument("-o", "--output", help="JSONL result file (default: stdout)")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-steps", type=int, default=None, help="step budget of the jobs without max_steps")
+    parser.add_argument("--chunk-size", type=int, default=16)
+    args = parser.parse_args(argv)
+    
+    runner = BatchRunner(args.processes, chunk_size=args.chunk_size)
+    if args.output is None:
+        runner.run_file(args.jobs, sys.stdout, args.max_steps)
+    else:
+        with open(args.output, "w") as output:
+            runner.run_file(args.jobs, output, args.max_steps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:04:12 2026
+
+@author: gelenag
+
+Benchmark suite: throughput, peak memory and compile time of every engine on the example machines
+
+    python -m UNN.Benchmark --save baseline.json
+    python -m UNN.Benchmark --compare baseline.json --threshold 0.2
+
+Every case runs at growing input sizes (--scale multiplies them). The results are written as JSON,
+in comparison mode every case that got slower, or needs more memory, by more than the threshold
+is reported and the exit status is 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from UNN.Turing import TuringMachine, TuringMachineConfiguration, Minsky47UniversalTuringMachine
+from UNN.Post import PostCanonicalSystem, TwoTagSystem
+from UNN.Derivation import DerivationSearch
+from UNN.Engines import RunLengthEngine, MacroEngine
+
+# the example machines are looked up next to the package
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _binary_operands(n, seed=0):
+    # the example machines count the second operand down, n is its value
+    a = random.Random(seed).getrandbits(32) | 1 << 31
+    return "{:b}_{:b}".format(a, n)
+
+
+def _execute(tm, engine):
+    # the engines are called directly, TuringMachine.run() would print the whole tape
+    if engine is None:
+        tm._execute()
+    else:
+        engine.execute(tm, None, None)
+    return tm.steps
+
+
+def _turing_machine(program, accept_states, input_string, engine_factory):
+    def build():
+        tm = TuringMachine(start_state='q0', accept_states=accept_states)
+        tm.load_program(str(ROOT / program))
+        return tm
+
+    def run(tm):
+        tm.reset(input_string)
+        return _execute(tm, engine_factory())
+    return build, run
+
+
+def _binarized(input_string, engine_factory):
+    def build():
+        config = TuringMachineConfiguration.load(str(ROOT / 'TMs/binary_addition.txt'))
+        config.tape = input_string
+        tm = TuringMachine()
+        tm.load_configuration(config.convert_to_binary())
+        return tm
+
+    def run(tm):
+        tm.reset(tm.config.tape)
+        return _execute(tm, engine_factory())
+    return build, run
+
+
+def _tag_direct(n, **options):
+    # De Mol's 2-tag system for the Collatz function, a^n ends in the word 'a'
+    def build():
+        return TwoTagSystem(alphabet=['a', 'b', 'c'], production=["a -> bc", "b -> a", "c -> aaa"], **options)
+
+    def run(system):
+        system.current_word = ['a'] * n
+        return system.engine.run()
+    return build, run
+
+
+def _tag_compiled(machine, tape, directory, **options):
+    # the machine file with a larger initial tape
+    lines = (ROOT / machine).read_text().splitlines()
+    lines = ["#initial_tape: " + tape if line.startswith("#initial_tape:") else line for line in lines]
+    path = Path(directory) / "{}_{}".format(len(tape), Path(machine).name)
+    path.write_text("\n".join(lines) + "\n")
+    start = []
+
+    def build():
+        system = TwoTagSystem(**options).from_turing_machine(str(path))
+        start[:] = system.engine.runs()
+        return system
+
+    def run(system):
+        # every run starts over from the compiled start word
+        if system.run_length:
+            system.engine.load_runs(start)
+        else:
+            system.engine.load([symbol for pattern, count in start for _ in range(count) for symbol in pattern])
+        return system.engine.run()
+    return build, run
+
+
+def _post_forward(n):
+    # Minsky's unary squares generator applied n times
+    def build():
+        return PostCanonicalSystem(alphabet=['1', 'P'], production=["($1)P($2) -> ($1)11P($2)($1)"])
+
+    def run(system):
+        word = '1P'
+        for _ in range(n):
+            word = system.forward(word)
+        return n
+    return build, run
+
+
+def _post_derivation(n):
+    def build():
+        return PostCanonicalSystem(alphabet=['M', 'I', 'U'],
+                                   production=["($1)I -> ($1)IU", "M($1) -> M($1)($1)",
+                                               "($1)III($2) -> ($1)U($2)", "($1)UU($2) -> ($1)($2)"])
+
+    def run(system):
+        search = DerivationSearch(system, max_length=n)
+        search.search('MI', target='MU')
+        return search.generated
+    return build, run
+
+
+def _utm(word):
+    def build():
+        tag = TwoTagSystem(alphabet=['a', 'b', 'c', 'H'], production=["a -> bH", "b -> ca", "c -> acb", "H -> *"])
+        utm = Minsky47UniversalTuringMachine()
+        utm.load_two_tag_system(tag)
+        return utm
+
+    def run(utm):
+        utm.reset(word)
+        return _execute(utm, RunLengthEngine())
+    return build, run
+
+
+def cases(scale=1, directory=None):
+    """Generator over the benchmark cases (name, engine, size, build, run).
+    build() compiles the machine, run(machine) runs it once and returns the number of steps."""
+    engines = [("compiled", lambda: None), ("run-length", RunLengthEngine), ("macro", lambda: MacroEngine(8))]
+    for size in (1000 * scale, 10000 * scale):
+        for engine, factory in engines:
+            yield ("tm-binary-addition", engine, size) + _turing_machine(
+                'Programs/binary_addition.txt', ['H'], _binary_operands(size), factory)
+    for size in (512 * scale, 2048 * scale):
+        word = ''.join(random.Random(size).choice('ab') for _ in range(size // 2))
+        for engine, factory in engines:
+            yield ("tm-palindrome", engine, size) + _turing_machine(
+                'Programs/palindrome_checker.txt', ['q8'], word + word[::-1], factory)
+    for size in (1000 * scale, 10000 * scale):
+        for engine, factory in engines[:2]:
+            yield ("binarized-addition", engine, size) + _binarized(_binary_operands(size), factory)
+    for size in (1000 * scale, 100000 * scale):
+        for engine, options in [("deque", {}), ("generation", {"vectorized": True}), ("run-length", {"run_length": True})]:
+            yield ("tag-direct", engine, size) + _tag_direct(size, **options)
+    # the deque engine holds the unary words compiled from the tape, which double with every bit
+    for engine, options, sizes in [("deque", {}, (4, 8)), ("run-length", {"run_length": True}, (8 * scale, 16 * scale))]:
+        for size in sizes:
+            tape = ''.join(random.Random(size).choice('01') for _ in range(size))
+            yield ("tag-compiled", engine, size) + _tag_compiled('TMs/toggle_bit_TM.txt', tape, directory, **options)
+    for size in (100 * scale, 400 * scale):
+        yield ("post-forward", "compiled", size) + _post_forward(size)
+    for size in (10 + 2 * scale, 12 + 2 * scale):
+        yield ("post-derivation", "breadth-first", size) + _post_derivation(size)
+    yield ("minsky-utm", "run-length", 4) + _utm('aabc')
+
+
+def measure(build, run, repeat=3, memory=True):
+    """Return the measurements of one case (dict): the best of repeat runs, the compile time and the
+    peak of the memory allocated by Python while compiling and running (traced in an extra run)"""
+    start = time.perf_counter()
+    machine = build()
+    compile_time = time.perf_counter() - start
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        steps = run(machine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    result = {"steps": steps,
+              "compile_time": compile_time,
+              "run_time": best,
+              "steps_per_sec": steps / best if best else 0.0}
+    if memory:
+        tracemalloc.start()
+        try:
+            run(build())
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_suite(scale=1, repeat=3, memory=True, select=None, log=None):
+    """Run the benchmark cases (whose name contains select) and return the results (dict)"""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, engine, size, build, run in cases(scale, directory):
+            if select is not None and select not in name:
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = measure(build, run, repeat, memory)
+            result = dict(case=name, engine=engine, size=size, **result)
+            results.append(result)
+            if log is not None:
+                print(format_result(result), file=log, flush=True)
+    return {"python": platform.python_version(),
+            "machine": platform.machine(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "scale": scale,
+            "results": results}
+
+
+def format_result(result):
+    text = "{case:<20} {engine:<14} {size:>7} {steps:>12} steps {steps_per_sec:>14,.0f} steps/s  compile {compile_time:8.4f}s".format(**result)
+    if "peak_memory" in result:
+        text += "  peak {:10,.0f} kB".format(result["peak_memory"] / 1024)
+    return text
+
+
+def compare(baseline, current, threshold=0.1):
+    """Return the regressions of current against baseline (list of str): cases whose steps/sec
+    dropped, or whose compile time or peak memory grew, by more than the threshold (fraction), and
+    cases that made a different number of steps"""
+    reference = {(r["case"], r["engine"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = reference.get((result["case"], result["engine"], result["size"]))
+        if old is None:
+            continue
+        label = "{case} {engine} {size}".format(**result)
+        if result["steps"] != old["steps"]:
+            regressions.append("{}: {} steps instead of {}".format(label, result["steps"], old["steps"]))
+        if result["steps_per_sec"] < old["steps_per_sec"] * (1 - threshold):
+            regressions.append("{}: {:,.0f} -> {:,.0f} steps/s".format(label, old["steps_per_sec"], result["steps_per_sec"]))
+        if result["compile_time"] > old["compile_time"] * (1 + threshold) and result["compile_time"] - old["compile_time"] > 1e-3:
+            regressions.append("{}: compile {:.4f}s -> {:.4f}s".format(label, old["compile_time"], result["compile_time"]))
+        if "peak_memory" in result and "peak_memory" in old and result["peak_memory"] > old["peak_memory"] * (1 + threshold):
+            regressions.append("{}: peak memory {:,} -> {:,} bytes".format(label, old["peak_memory"], result["peak_memory"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the engines on the example machines")
+    parser.add_argument("--scale", type=int, default=1, help="multiply the input sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the best one counts")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run measuring the peak memory")
+    parser.add_argument("--case", default=None, help="only run the cases whose name contains this")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run, report the regressions")
+    parser.add_argument("--threshold", type=float, default=0.1, help="tolerated change (fraction) in comparison mode")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.scale, args.repeat, not args.no_memory, args.case, log=sys.stdout)
+    if args.save:
+        Path(args.save).write_text(json.dumps(current, indent=1))
+    if args.compare:
+        regressions = compare(json.loads(Path(args.compare).read_text()), current, args.threshold)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
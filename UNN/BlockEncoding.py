@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 02:37:18 2026
+
+@author: gelenag
+
+Vectorized conversion between symbol sequences and fixed-width binary blocks, as used by the
+binarized Turing machines: symbol i of the alphabet is written as bit_depth bits, the most
+significant bit first. The routines work on NumPy arrays of bits (uint8 0/1) and run in linear time.
+"""
+import numpy as np
+
+
+def _code_type(n):
+    # the smallest unsigned type for the values 0 ... n - 1, the array operations are memory bound
+    return np.uint8 if n <= 1 << 8 else np.uint16 if n <= 1 << 16 else np.int64
+
+
+def symbol_codes(symbols, alphabet):
+    """Return the indices of symbols (str or sequence) in alphabet as an unsigned integer array"""
+    code_type = _code_type(len(alphabet))
+    if all(len(symbol) == 1 for symbol in alphabet):
+        # single character symbols are looked up in a table indexed by code point, the last entry
+        # stands for all characters beyond the alphabet
+        points = np.frombuffer(''.join(symbols).encode('utf-32-le'), np.uint32)
+        if len(points) != len(symbols):
+            raise Exception("The symbols are not in the alphabet of single characters")
+        table = np.full(max(map(ord, alphabet)) + 2, -1, np.int64)
+        table[[ord(symbol) for symbol in alphabet]] = np.arange(len(alphabet))
+        codes = table[np.minimum(points, len(table) - 1)]
+    else:
+        index = {symbol: i for i, symbol in enumerate(alphabet)}
+        codes = np.fromiter((index.get(symbol, -1) for symbol in symbols), np.int64, len(symbols))
+    unknown = codes < 0
+    if unknown.any():
+        position = int(np.argmax(unknown))
+        raise Exception("The symbol {!r} is not in the alphabet".format(list(symbols)[position]))
+    return codes.astype(code_type)
+
+
+def encode_blocks(symbols, alphabet, bit_depth):
+    """Return the bits (uint8 array) of the symbols, bit_depth bits per symbol"""
+    codes = symbol_codes(symbols, alphabet)
+    bits = np.empty((len(codes), bit_depth), np.uint8)
+    for k in range(bit_depth):
+        bits[:, k] = (codes >> (bit_depth - 1 - k)) & 1
+    return bits.ravel()
+
+
+def block_values(bits, bit_depth):
+    """Return the values (unsigned integer array) of the bit_depth wide blocks of bits, whose length
+    must be a multiple of bit_depth"""
+    bits = np.asarray(bits, np.uint8)
+    if len(bits) % bit_depth:
+        raise Exception("{} bits are not a multiple of {}".format(len(bits), bit_depth))
+    blocks = bits.reshape(-1, bit_depth)
+    values = np.zeros(len(blocks), _code_type(1 << bit_depth))
+    for k in range(bit_depth):
+        values <<= 1
+        values |= blocks[:, k]
+    return values
+
+
+def decode_blocks(bits, alphabet, bit_depth, offset=0):
+    """Return the symbols (list) of the blocks of bits (array or string of '0' and '1').
+    offset blank bits are put in front to align the blocks, the last block is padded with blanks."""
+    if isinstance(bits, str):
+        bits = bits_from_string(bits)
+    padding = -(offset + len(bits)) % bit_depth
+    bits = np.concatenate([np.zeros(offset, np.uint8), np.asarray(bits, np.uint8), np.zeros(padding, np.uint8)])
+    values = block_values(bits, bit_depth)
+    if len(values) and values.max() >= len(alphabet):
+        raise Exception("The block value {} has no symbol".format(int(values.max())))
+    return np.array(alphabet, dtype=object)[values].tolist()
+
+
+def bits_from_string(text):
+    """Return the bits (uint8 array) of a string of '0' and '1'"""
+    bits = np.frombuffer(text.encode('ascii'), np.uint8) - ord('0')
+    if len(bits) and bits.max() > 1:
+        raise Exception("Only '0' and '1' can be converted to bits")
+    return bits
+
+
+def bits_to_string(bits):
+    """Return the string of '0' and '1' of bits"""
+    return (np.asarray(bits, np.uint8) + ord('0')).tobytes().decode('ascii')
+
+
+def bits_to_int(bits):
+    """Return the number whose binary digits are bits, the first bit being the least significant"""
+    return int.from_bytes(np.packbits(np.asarray(bits, np.uint8), bitorder='little').tobytes(), 'little')
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:05:33 2026
+
+@author: gelenag
+
+Persistent cache of compiled machines, so warm starts skip parsing and compilation
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+
+class CompileCache:
+    """Content addressed on-disk cache of compiled artifacts (CompiledProgram, binarized machines,
+    tag system production tables). An entry is keyed by the SHA-256 of its kind, the source
+    definition and the compiler options, and stored as one pickle file. Reading an entry marks it
+    as recently used, when the cache grows beyond max_bytes the least recently used entries are
+    removed.
+    Arguments:
+        directory:  where the entries are stored (default: $UNN_CACHE_DIR or ~/.cache/unn)
+        max_bytes:  size bound of all entries together"""
+    VERSION = 2     # bump when the layout of a cached class changes
+
+    def __init__(self, directory=None, max_bytes=1 << 28):
+        if directory is None:
+            directory = os.environ.get("UNN_CACHE_DIR") or Path.home() / ".cache" / "unn"
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, kind, source, **options):
+        """Return the key of an artifact of some kind compiled from source (str) with options"""
+        digest = hashlib.sha256()
+        digest.update(repr((self.VERSION, kind, sorted(options.items()))).encode())
+        digest.update(source.encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory / (key + ".pkl")
+
+    def get(self, key):
+        """Return the cached artifact or None"""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            value = pickle.loads(data)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # truncated or written by an incompatible version
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store an artifact, the file is replaced atomically"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def get_or_build(self, kind, source, build, **options):
+        """Return the cached artifact for (kind, source, options), calling build() on a miss"""
+        key = self.key(kind, source, **options)
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def _entries(self):
+        entries = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        """Total size of the cached entries in bytes"""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits into max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        for _, _, path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def stats(self):
+        """Return the cache statistics (dict)"""
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries()),
+                "bytes": self.size()}
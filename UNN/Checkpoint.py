@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:14:06 2026
+
+@author: gelenag
+
+Checkpoints of long Turing machine and tag system runs: compact snapshots that are written
+atomically, restored quickly and can be forked into several continuations
+"""
+import copy
+import os
+import pickle
+import tempfile
+import zlib
+from array import array
+from pathlib import Path
+from UNN.Tape import Tape
+
+
+class Checkpoint:
+    """Snapshot of the configuration of a TuringMachine (state, head, steps and the non-blank span
+    of the tape) or of a TwoTagSystem (word and steps). Tapes and words are stored zlib compressed.
+    Use TuringMachine.checkpoint() / TwoTagSystem.checkpoint() to take one."""
+    VERSION = 1
+
+    def __init__(self, kind, data):
+        self.kind = kind
+        self.data = data
+
+    @classmethod
+    def of_machine(cls, machine, level=1):
+        program = machine.program
+        left, raw = machine.tape.span_bytes()
+        return cls("turing", {"symbols": program.symbols,
+                              "states": program.states,
+                              "typecode": machine.tape.typecode,
+                              "left": left,
+                              "tape": zlib.compress(raw, level),
+                              "head": machine.head_position,
+                              "state": machine.state_code,
+                              "steps": machine.steps})
+
+    def restore_machine(self, machine):
+        """Put the configuration into machine, which must have loaded the same program"""
+        data = self._check("turing")
+        program = machine.program
+        if data["symbols"] != program.symbols or data["states"] != program.states:
+            raise Exception("The checkpoint was taken from a machine with a different program")
+        raw = zlib.decompress(data["tape"])
+        if isinstance(machine.tape, Tape):
+            tape = Tape.from_span_bytes(data["left"], raw, program.blank, data["typecode"])
+        else:
+            # a PagedTape keeps its page options
+            tape = machine.tape.fresh()
+            tape.load(raw, data["left"])
+        tape.reserve(data["head"])
+        machine.tape = tape
+        machine.head_position = data["head"]
+        machine.state_code = data["state"]
+        machine.current_state = program.states[data["state"]]
+        machine.steps = data["steps"]
+        machine.loop = None
+        return machine
+
+    @classmethod
+    def of_tag_system(cls, system, level=1):
+        engine = system.engine
+        if hasattr(engine, "load_runs"):
+            word = ("runs", engine.runs())
+        else:
+            codes = engine.word.tolist() if hasattr(engine.word, "tolist") else list(engine.word)
+            word = ("codes", engine.symbols[:], zlib.compress(array('I', codes).tobytes(), level))
+        return cls("tag", {"word": word, "steps": system.steps, "engine_steps": engine.steps})
+
+    def restore_tag_system(self, system):
+        """Put the word into system, which must have the same productions"""
+        data = self._check("tag")
+        system._new_engine()
+        engine = system.engine
+        word = data["word"]
+        if word[0] == "runs":
+            engine.load_runs(word[1])
+        else:
+            _, symbols, packed = word
+            codes = array('I')
+            codes.frombytes(zlib.decompress(packed))
+            # the codes index the symbol table of the checkpoint, load() interns them in the new engine
+            engine.load([symbols[code] for code in codes])
+        engine.steps = data["engine_steps"]
+        system.steps = data["steps"]
+        return system
+
+    def restore(self, target):
+        """Restore into a TuringMachine or TwoTagSystem"""
+        if self.kind == "turing":
+            return self.restore_machine(target)
+        return self.restore_tag_system(target)
+
+    def fork(self, target):
+        """Return a copy of target (sharing its compiled program or productions) continued from
+        this checkpoint, target itself is not changed"""
+        clone = copy.copy(target)
+        return self.restore(clone)
+
+    def _check(self, kind):
+        if self.kind != kind:
+            raise Exception("This is a checkpoint of a {} run".format(self.kind))
+        return self.data
+
+    def save(self, path):
+        """Write the checkpoint, the file is replaced atomically"""
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((self.VERSION, self.kind, self.data), f, protocol=pickle.HIGHEST_PROTOCOL)
+                # the data must be on disk before the file takes the final name
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            version, kind, data = pickle.load(f)
+        if version != cls.VERSION:
+            raise Exception("{}: checkpoint version {} is not supported".format(path, version))
+        return cls(kind, data)
+
+    @property
+    def steps(self):
+        return self.data["steps"]
+
+    def __repr__(self):
+        return "Checkpoint(kind={!r}, steps={})".format(self.kind, self.steps)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:12:40 2026
+
+@author: gelenag
+
+Derivation search over Post canonical systems: which words are derivable from an axiom
+"""
+import hashlib
+import heapq
+import time
+from multiprocessing import Pool
+from UNN.Post import PostCanonicalSystem
+
+
+class BloomFilter:
+    """Bounded set of words with false positives but no false negatives.
+    Arguments:
+        n_bits:     size of the bit array, the memory is n_bits / 8 bytes whatever the number of words
+        n_hashes:   number of bits set per word"""
+
+    def __init__(self, n_bits=1 << 27, n_hashes=4):
+        self.n_bits = n_bits
+        self.n_hashes = n_hashes
+        self.bits = bytearray((n_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, word):
+        digest = hashlib.blake2b(word.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def __contains__(self, word):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(word))
+
+    def add(self, word):
+        """Add word, returns True if it was (probably) already in the filter"""
+        bits = self.bits
+        seen = True
+        for p in self._positions(word):
+            mask = 1 << (p & 7)
+            if not bits[p >> 3] & mask:
+                bits[p >> 3] |= mask
+                seen = False
+        self.count += not seen
+        return seen
+
+    def __len__(self):
+        return self.count
+
+
+_worker_system = None
+
+
+def _init_worker(alphabet, production):
+    global _worker_system
+    _worker_system = PostCanonicalSystem(alphabet, production)
+
+
+def _expand(words):
+    return [(word, _worker_system.successors(word)) for word in words]
+
+
+class DerivationSearch:
+    """Breadth-first or best-first exploration of the words derivable from an axiom.
+    Every production is applied at every possible match of its left side (PostCanonicalSystem.successors),
+    words seen before are pruned. With the default exact deduplication the parent of every word is
+    kept, so found words come with their derivation. A Bloom filter bounds the memory for very large
+    frontiers, at the price of (rarely) pruning a new word and of not keeping derivations.
+    Arguments:
+        system:         a PostCanonicalSystem
+        max_length:     words longer than this are not explored (None: no limit)
+        bloom_bits:     deduplicate with a BloomFilter of this many bits instead of a hash set
+        processes:      expand the breadth-first frontier with a pool of this many processes
+        chunk_size:     number of words sent to a process at a time"""
+
+    def __init__(self, system, max_length=None, bloom_bits=None, processes=None, chunk_size=256):
+        self.system = system
+        self.max_length = max_length
+        self.bloom_bits = bloom_bits
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self._reset()
+
+    def _reset(self):
+        self.parents = None if self.bloom_bits else {}
+        self.seen = BloomFilter(self.bloom_bits) if self.bloom_bits else self.parents
+        self.depth = 0
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.too_long = 0
+        self.frontier_size = 0
+        self.max_frontier = 0
+        self.elapsed = 0.0
+
+    def _visit(self, word, parent):
+        # returns True if word is new
+        self.generated += 1
+        if self.max_length is not None and len(word) > self.max_length:
+            self.too_long += 1
+            return False
+        if self.parents is None:
+            if self.seen.add(word):
+                self.duplicates += 1
+                return False
+        elif word in self.parents:
+            self.duplicates += 1
+            return False
+        else:
+            self.parents[word] = parent
+        return True
+
+    def derivation(self, word):
+        """Return the list of words from the axiom to word (None without exact deduplication)"""
+        if self.parents is None or word not in self.parents:
+            return None
+        path = []
+        while word is not None:
+            path.append(word)
+            word = self.parents[word]
+        return path[::-1]
+
+    def search(self, axiom, target=None, max_steps=None, heuristic=None, max_words=None):
+        """Explore the words derivable from axiom in at most max_steps steps.
+        Without a heuristic the search is breadth-first, level by level, so the target is found
+        with a shortest derivation. With a heuristic (function word -> number) the word with the
+        smallest value is expanded first. The search stops when target is reached, the steps or
+        max_words explored words are exhausted. Returns the depth at which target was found or None."""
+        self._reset()
+        start = time.perf_counter()
+        self._visit(axiom, None)
+        try:
+            if axiom == target:
+                return 0
+            if heuristic is None:
+                return self._breadth_first(axiom, target, max_steps, max_words)
+            return self._best_first(axiom, target, max_steps, heuristic, max_words)
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+    def _expand_level(self, frontier, pool):
+        if pool is None:
+            successors = self.system.successors
+            return [(word, successors(word)) for word in frontier]
+        chunks = [frontier[i:i + self.chunk_size] for i in range(0, len(frontier), self.chunk_size)]
+        return [pair for chunk in pool.imap(_expand, chunks) for pair in chunk]
+
+    def _breadth_first(self, axiom, target, max_steps, max_words):
+        pool = None
+        if self.processes and self.processes > 1:
+            pool = Pool(self.processes, _init_worker, (self.system.alphabet, self.system.production))
+        try:
+            frontier = [axiom]
+            while frontier and (max_steps is None or self.depth < max_steps):
+                self.depth += 1
+                next_frontier = []
+                for word, successors in self._expand_level(frontier, pool):
+                    self.expanded += 1
+                    for new in successors:
+                        if self._visit(new, word):
+                            if new == target:
+                                self.frontier_size = len(next_frontier) + 1
+                                self.max_frontier = max(self.max_frontier, self.frontier_size)
+                                return self.depth
+                            next_frontier.append(new)
+                frontier = next_frontier
+                self.frontier_size = len(frontier)
+                self.max_frontier = max(self.max_frontier, self.frontier_size)
+                if max_words is not None and self.expanded + self.frontier_size >= max_words:
+                    break
+            return None
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+    def _best_first(self, axiom, target, max_steps, heuristic, max_words):
+        successors = self.system.successors
+        queue = [(heuristic(axiom), 0, 0, axiom)]
+        order = 1
+        while queue:
+            _, depth, _, word = heapq.heappop(queue)
+            self.depth = max(self.depth, depth)
+            if max_steps is not None and depth >= max_steps:
+                continue
+            if max_words is not None and self.expanded >= max_words:
+                break
+            self.expanded += 1
+            for new in successors(word):
+                if self._visit(new, word):
+                    if new == target:
+                        self.frontier_size = len(queue)
+                        self.max_frontier = max(self.max_frontier, self.frontier_size)
+                        return depth + 1
+                    heapq.heappush(queue, (heuristic(new), depth + 1, order, new))
+                    order += 1
+            self.frontier_size = len(queue)
+            self.max_frontier = max(self.max_frontier, self.frontier_size)
+        return None
+
+    def stats(self):
+        """Return the statistics of the last search (dict)"""
+        return {"depth": self.depth,
+                "expanded": self.expanded,
+                "generated": self.generated,
+                "duplicates": self.duplicates,
+                "too_long": self.too_long,
+                "frontier_size": self.frontier_size,
+                "max_frontier": self.max_frontier,
+                "seen": len(self.seen),
+                "elapsed": self.elapsed,
+                "words_per_sec": self.generated / self.elapsed if self.elapsed else 0.0}
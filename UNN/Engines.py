@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:52:08 2026
+
+@author: gelenag
+
+Alternative execution engines for compiled Turing machines.
+An engine is passed to TuringMachine.run() and advances the machine through
+engine.execute(machine, max_steps, deadline), which returns a RunResult status.
+"""
+import time
+from collections import OrderedDict
+from UNN.Tape import Tape, RunLengthTape
+from UNN.Turing import RunResult
+
+
+class RunLengthEngine:
+    """Executes a compiled Turing machine on a run-length encoded tape.
+    Transitions that keep the state and move on (self loops like "q3 a q3 a R") are applied to a
+    whole run of equal symbols in one operation, the step count still advances by the run length.
+    sweeps and swept_steps count the accelerated operations and the steps they covered."""
+
+    def __init__(self):
+        self.sweeps = 0
+        self.swept_steps = 0
+
+    def execute(self, machine, max_steps=None, deadline=None):
+        """Run the machine until it halts, no transition applies, max_steps steps were made or the
+        time.monotonic() deadline passed. Returns the RunResult status."""
+        program = machine.program
+        next_states, writes, moves, halting = program.next_state, program.write, program.move, program.halting
+        n_states = program.n_states
+
+        tape = RunLengthTape.from_tape(machine.tape, machine.head_position)
+        left, right = tape.left, tape.right
+        push, pop = tape.push, tape.pop
+        head = tape.head
+        position = tape.position
+        state = machine.state_code
+        steps = machine.steps
+        limit = None if max_steps is None else steps + max_steps
+        machine.loop = None
+        status = RunResult.HALTED
+        iterations = 0
+
+        while not halting[state]:
+            if limit is not None and steps >= limit:
+                status = RunResult.BUDGET
+                break
+            iterations += 1
+            if deadline is not None and not iterations & 0xFFF and time.monotonic() > deadline:
+                status = RunResult.BUDGET
+                break
+            i = head * n_states + state
+            next_state = next_states[i]
+            if next_state < 0:
+                print("-------- Rejected --------")
+                status = RunResult.REJECTED
+                break
+            write, move = writes[i], moves[i]
+            if move > 0:
+                ahead, behind = right, left
+            else:
+                ahead, behind = left, right
+
+            if next_state != state:
+                push(behind, write, 1)
+                head = pop(ahead)
+                position += move
+                state = next_state
+                steps += 1
+                continue
+
+            # self loop: the machine walks over the whole run of equal symbols in front of the head
+            if ahead:
+                run = ahead[-1][1] if ahead[-1][0] == head else 0
+                count = run + 1
+            elif head == tape.blank:
+                # sweeping over the blank tape forever
+                if limit is None:
+                    machine.loop = {"kind": "translated", "start": steps, "period": 1, "shift": move}
+                    status = RunResult.LOOPED
+                    break
+                run = count = limit - steps
+            else:
+                run = 0
+                count = 1
+            if limit is not None:
+                count = min(count, limit - steps)
+
+            push(behind, write, count)
+            if count <= run:
+                # the head stops inside the run
+                if ahead:
+                    ahead[-1][1] -= count
+                    if not ahead[-1][1]:
+                        ahead.pop()
+            else:
+                if run:
+                    ahead.pop()
+                head = pop(ahead)
+            position += move * count
+            steps += count
+            self.sweeps += 1
+            self.swept_steps += count
+
+        tape.head = head
+        tape.position = position
+        machine.tape = tape.to_tape(machine.tape.fresh())
+        machine.head_position = position
+        machine.state_code = state
+        machine.current_state = program.states[state]
+        machine.steps = steps
+        return status
+
+
+class MacroEngine:
+    """Executes a compiled Turing machine as a macro machine on blocks of block_size cells.
+    Every block of cells is interned as one block symbol. The first time the head enters a block in
+    some state at some offset (0 from the left, block_size - 1 from the right), the base machine is
+    simulated until the head leaves the block and the result
+    (state, block, offset) -> (exit state, new block, exit offset, steps, status)
+    is cached, later visits cost a single dictionary hit. The cache holds at most cache_size entries,
+    the least recently used one is evicted first. The table of interned blocks is bounded as well:
+    when it grows beyond max_blocks, the blocks that are not on the tape are forgotten together with
+    the cached transitions that refer to them.
+    Arguments:
+        block_size:     number of cells per block (k)
+        cache_size:     maximum number of cached block transitions
+        max_blocks:     bound of the interned block table (default: cache_size)"""
+
+    MOVED = 0
+    HALTED = 1
+    REJECTED = 2
+    LOOPED = 3
+
+    def __init__(self, block_size=4, cache_size=65536, max_blocks=None):
+        self.block_size = block_size
+        self.cache_size = cache_size
+        self.max_blocks = cache_size if max_blocks is None else max_blocks
+        self.program = None
+        self.reset_cache()
+
+    def reset_cache(self):
+        self.cache = OrderedDict()
+        self.blocks = []
+        self.block_id = {}
+        self.block_limit = self.max_blocks
+        self.compactions = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.macro_steps = 0
+
+    def stats(self):
+        """Return the cache statistics (dict), useful to tune the block size per machine"""
+        lookups = self.hits + self.misses
+        return {"block_size": self.block_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "cached": len(self.cache),
+                "blocks": len(self.blocks),
+                "compactions": self.compactions,
+                "macro_steps": self.macro_steps}
+
+    def _intern_block(self, cells):
+        cells = tuple(cells)
+        if cells not in self.block_id:
+            self.block_id[cells] = len(self.blocks)
+            self.blocks.append(cells)
+        return self.block_id[cells]
+
+    def _compact(self, block_cells):
+        """Keep only the blocks on the tape (block_cells, renumbered in place) and the blank block,
+        and the cached transitions between them"""
+        live = set(block_cells)
+        live.discard(0)
+        translate = {0: 0}
+        blocks = [self.blocks[0]]
+        for block in sorted(live):
+            translate[block] = len(blocks)
+            blocks.append(self.blocks[block])
+        for i, block in enumerate(block_cells):
+            block_cells[i] = translate[block]
+        n_states, k = self.program.n_states, self.block_size
+        cache = OrderedDict()
+        for key, (state, block, offset, steps, status) in self.cache.items():
+            rest, key_offset = divmod(key, k)
+            key_block, key_state = divmod(rest, n_states)
+            if key_block in translate and block in translate:
+                cache[(translate[key_block] * n_states + key_state) * k + key_offset] = \
+                    (state, translate[block], offset, steps, status)
+        self.cache = cache
+        self.blocks = blocks
+        self.block_id = {cells: i for i, cells in enumerate(blocks)}
+        # a tape with many different blocks must not trigger a compaction on every miss
+        self.block_limit = max(self.max_blocks, 2 * len(blocks))
+        self.compactions += 1
+
+    def _simulate(self, state, block, offset, max_steps):
+        """Run the base machine inside one block, returns (state, block, offset, steps, status)"""
+        program = self.program
+        next_states, writes, moves, halting = program.next_state, program.write, program.move, program.halting
+        n_states, k = program.n_states, self.block_size
+        cells = list(self.blocks[block])
+        # a block has only finitely many configurations, staying longer means the machine loops
+        configurations = n_states * k * len(program.symbols) ** k
+        steps = 0
+        status = self.MOVED
+        while 0 <= offset < k:
+            if halting[state]:
+                status = self.HALTED
+                break
+            if steps >= max_steps:
+                break
+            i = cells[offset] * n_states + state
+            next_state = next_states[i]
+            if next_state < 0:
+                status = self.REJECTED
+                break
+            cells[offset] = writes[i]
+            offset += moves[i]
+            state = next_state
+            steps += 1
+            if steps > configurations:
+                status = self.LOOPED
+                break
+        return state, self._intern_block(cells), offset, steps, status
+
+    def execute(self, machine, max_steps=None, deadline=None):
+        """Run the machine until it halts, no transition applies, max_steps steps were made or the
+        time.monotonic() deadline passed. Returns the RunResult status."""
+        program = machine.program
+        if program is not self.program:
+            self.program = program
+            self.reset_cache()
+        k = self.block_size
+        n_states = program.n_states
+        halting = program.halting
+        blank = program.blank
+        self._intern_block([blank] * k)     # the all blank block gets the id 0
+
+        # split the tape into blocks, block b holds the cells b*k ... b*k + k - 1
+        lo, hi = machine.tape.span()
+        first = min(lo, machine.head_position) // k
+        last = max(hi, machine.head_position + 1) // k + 1
+        cells = machine.tape.to_list(first * k, last * k)
+        tape = Tape(0, 'I', 0)
+        tape.load([self._intern_block(cells[i:i + k]) for i in range(0, len(cells), k)], first)
+
+        block_cells = tape.cells
+        origin = tape.origin
+        size = len(block_cells)
+        block_index, offset = divmod(machine.head_position, k)
+        pos = block_index + origin
+        state = machine.state_code
+        steps = machine.steps
+        limit = None if max_steps is None else steps + max_steps
+        cache = self.cache
+        status = self.MOVED
+        machine.loop = None
+
+        while not halting[state]:
+            if limit is not None and steps >= limit:
+                break
+            if deadline is not None and not self.macro_steps & 0xFFF and time.monotonic() > deadline:
+                break
+            key = (block_cells[pos] * n_states + state) * k + offset
+            result = cache.get(key)
+            if result is None:
+                self.misses += 1
+                result = self._simulate(state, block_cells[pos], offset, float('inf'))
+                cache[key] = result
+                if len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self.hits += 1
+                cache.move_to_end(key)
+            if limit is not None and steps + result[3] > limit:
+                # the cached block transition would overshoot the step budget
+                result = self._simulate(state, block_cells[pos], offset, limit - steps)
+            state, block_cells[pos], offset, block_steps, status = result
+            if len(self.blocks) > self.block_limit:
+                self._compact(block_cells)
+                cache = self.cache
+            steps += block_steps
+            self.macro_steps += 1
+            if status != self.MOVED or 0 <= offset < k:
+                break
+            if offset < 0:
+                pos -= 1
+                offset = k - 1
+            else:
+                pos += 1
+                offset = 0
+            if pos < 0 or pos == size:
+                tape.reserve(pos - origin)
+                pos += tape.origin - origin
+                origin = tape.origin
+                size = len(block_cells)
+
+        if status == self.REJECTED:
+            print("-------- Rejected --------")
+        if status == self.LOOPED:
+            # the base machine never leaves the block
+            machine.loop = {"kind": "cycle", "start": None, "period": None, "shift": 0}
+
+        # expand the blocks back to the base tape
+        left, right = tape.bounds()
+        base = machine.tape.fresh()
+        base.load([code for block in tape.to_list(left, right) for code in self.blocks[block]], left * k)
+        machine.tape = base
+        machine.head_position = (pos - origin) * k + offset
+        machine.state_code = state
+        machine.current_state = program.states[state]
+        machine.steps = steps
+        if halting[state]:
+            return RunResult.HALTED
+        if status == self.REJECTED:
+            return RunResult.REJECTED
+        if status == self.LOOPED:
+            return RunResult.LOOPED
+        return RunResult.BUDGET
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:21:48 2026
+
+@author: gelenag
+
+Reading and writing machine definitions.
+Two text formats are read line by line: the plain format of Programs/*.txt (one transition
+"state read next_state write direction" per line) and the header format of TMs/*.txt
+(#states:, #symbols:, #initial_state:, #accept_states:, #initial_tape: lines followed by
+#transition_table: and the transitions). Large generated machines can be written to a
+binary file of integer rows that is memory-mapped when it is read.
+"""
+import json
+import numpy as np
+
+HEADER_KEYS = ("states", "symbols", "initial_state", "accept_states", "initial_tape")
+DIRECTIONS = ("L", "R", "*")    # * marks the last move into a halting state, it is run as L
+BINARY_MAGIC = b"UNNTM\x01\r\n"
+
+
+def is_binary(path):
+    """Return True if path holds a machine in the binary format"""
+    with open(path, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def _parse_transition(line, path, lineno):
+    fields = line.split()
+    if len(fields) != 5:
+        raise Exception("{}:{}: expected 'state read next_state write direction', got {!r}".format(
+            path, lineno, line.rstrip("\r\n")))
+    if fields[4] not in DIRECTIONS:
+        raise Exception("{}:{}: unknown direction {!r}, expected one of {}".format(
+            path, lineno, fields[4], " ".join(DIRECTIONS)))
+    return fields
+
+
+def read_machine(path):
+    """Parse a text machine definition line by line.
+    Returns (header, transitions): header is a dict with the keys of HEADER_KEYS that are present (empty
+    for the plain format), transitions a dict (state, read symbol) -> (next state, write symbol, direction)."""
+    header = {}
+    transitions = {}
+    in_table = False
+    with open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            if line.startswith("#"):
+                key, _, value = line.strip()[1:].partition(":")
+                if key == "transition_table":
+                    in_table = True
+                elif key in HEADER_KEYS and not in_table:
+                    header[key] = value.split()
+                else:
+                    raise Exception("{}:{}: unknown header line {!r}".format(path, lineno, line.strip()))
+                continue
+            if header and not in_table:
+                raise Exception("{}:{}: transition before #transition_table:".format(path, lineno))
+            s_pre, read, s_post, write, direction = _parse_transition(line, path, lineno)
+            if (s_pre, read) in transitions and transitions[(s_pre, read)] != (s_post, write, direction):
+                raise Exception("{}:{}: second transition for state {} reading {}".format(path, lineno, s_pre, read))
+            transitions[(s_pre, read)] = (s_post, write, direction)
+    return header, transitions
+
+
+def read_configuration(path):
+    """Parse a machine in the header format, returns (states, symbols, initial_state, accept_states,
+    initial_tape, transitions) with the transitions as a list of 5-tuples"""
+    header, transitions = read_machine(path)
+    missing = [key for key in HEADER_KEYS if key not in header]
+    if missing:
+        raise Exception("{}: missing header line(s) {}".format(path, ", ".join("#" + key + ":" for key in missing)))
+    for key in ("initial_state", "initial_tape"):
+        if len(header[key]) != 1:
+            raise Exception("{}: #{}: needs exactly one value".format(path, key))
+    states = header["states"]
+    for state in header["initial_state"] + header["accept_states"]:
+        if state not in states:
+            raise Exception("{}: state {} is not listed in #states:".format(path, state))
+    rows = [(s_pre, read) + right for (s_pre, read), right in transitions.items()]
+    return states, header["symbols"], header["initial_state"][0], header["accept_states"], header["initial_tape"][0], rows
+
+
+def write_binary(path, header, rows):
+    """Write a machine in the binary format.
+    Arguments:
+        header:     JSON serializable dict (names of the states, symbols, ...)
+        rows:       integer array of shape (n, 5), one row per transition"""
+    rows = np.ascontiguousarray(rows, dtype=np.int32).reshape(-1, 5)
+    header = dict(header, n_transitions=len(rows))
+    text = json.dumps(header).encode()
+    text += b" " * (-(len(BINARY_MAGIC) + 8 + len(text)) % 8)     # align the rows to 8 bytes
+    with open(path, "wb") as f:
+        f.write(BINARY_MAGIC)
+        f.write(len(text).to_bytes(8, "little"))
+        f.write(text)
+        f.write(rows.tobytes())
+
+
+def read_binary(path):
+    """Read a machine in the binary format, returns (header, rows).
+    rows is a read only memory map of the file, nothing is parsed or copied."""
+    with open(path, "rb") as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise Exception("{}: not a binary machine file".format(path))
+        size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(size))
+    offset = len(BINARY_MAGIC) + 8 + size
+    n = header["n_transitions"]
+    if not n:
+        return header, np.zeros((0, 5), dtype=np.int32)
+    rows = np.memmap(path, dtype=np.int32, mode="r", offset=offset, shape=(n, 5))
+    return header, rows
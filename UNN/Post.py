@@ -6,8 +6,16 @@ Created on Sat Aug 24 13:59:34 2024
 @author: gelenag
 """
 import re
+from collections import deque
+from itertools import islice
+from contextlib import nullcontext
+import numpy as np
 from pathlib import Path
-from UNN.Turing import TuringMachineConfiguration
+from UNN.Turing import TuringMachineConfiguration, RunResult
+from UNN.Profile import TagProfile
+from UNN.Trace import Trace
+from UNN.Checkpoint import Checkpoint
+from UNN.BlockEncoding import bits_from_string, bits_to_int
 
 def read_file(path):
     reading = Path(path).read_text()
@@ -36,50 +44,621 @@ class System:
 
         
 class PostCanonicalSystem(System):
+    VARIABLE = re.compile(r'(\(\$\d+\))')
+    
     def __init__(self, alphabet, production):
         super().__init__(alphabet, production)
 
-    def generate_variables_and_regex_pattern(self, production_lhs):
-        pattern = r'\(\$\d+\)'
-        variables = re.findall(pattern, production_lhs)
-        
-        regex_pattern = (production_lhs + '.')[:-1]    # to copy!
-        for v in variables:
-            regex_pattern = regex_pattern.replace(v, '(.*)')
-        
-        return variables, regex_pattern
-    
-    def generate_output(self, values, production_rhs):
-        op = (production_rhs + '.')[:-1]    # to copy!
-        for k, v in values.items():
-            op = op.replace(k, v)
-        return op
-            
-    
-    def match_variables_to_values(self, input_string, production_lhs):
-        variables, regex_pattern = self.generate_variables_and_regex_pattern(production_lhs)
-        
-        match = re.match(regex_pattern, input_string)
-        
-        values = {}
-        
-        if match:
-            for i, v in enumerate(variables):
-                values[v] = match.group(1+i)
-        return values
+    def parse_production(self):
+        super().parse_production()
+        self.compiled_productions = [self.compile_production(lhs, rhs)
+                                     for lhs, rhs in zip(self.production_lhs, self.production_rhs)]
+
+    def compile_production(self, production_lhs, production_rhs):
+        """Compile a production once into (pattern, template, tail, production_rhs).
+        Every variable ($i) of the left side becomes a (.*) group of the pattern, a repeated variable
+        a back reference, and the literals are matched as they are. The right side is cut into a
+        template of (literal, group index) pieces followed by the literal tail."""
+        groups = {}
+        parts = self.VARIABLE.split(production_lhs)
+        regex_pattern = re.escape(parts[0])
+        for variable, literal in zip(parts[1::2], parts[2::2]):
+            if variable in groups:
+                regex_pattern += '\\{}'.format(groups[variable] + 1)
+            else:
+                groups[variable] = len(groups)
+                regex_pattern += '(.*)'
+            regex_pattern += re.escape(literal)
+
+        template = []
+        literal = ''
+        parts = self.VARIABLE.split(production_rhs)
+        for text, variable in zip(parts[0::2], parts[1::2] + ['']):
+            literal += text
+            if variable in groups:
+                template.append((literal, groups[variable]))
+                literal = ''
+            else:
+                literal += variable    # variables that do not appear on the left side stay as they are
+        return re.compile(regex_pattern), template, literal, production_rhs
+
+    @staticmethod
+    def apply_production(compiled_production, input_string):
+        """Apply a compiled production to the beginning of input_string.
+        If the left side does not match, the right side is returned with its variables unfilled."""
+        pattern, template, tail, production_rhs = compiled_production
+        match = pattern.match(input_string)
+        if match is None:
+            return production_rhs
+        values = match.groups()
+        return ''.join([literal + values[group] for literal, group in template]) + tail
 
     def forward(self, input_string):
-        output = (input_string+'.')[:-1]
-        for i in range(len(self.production_lhs)):
-            values = self.match_variables_to_values(output, self.production_lhs[i])
-            output = self.generate_output(values, self.production_rhs[i])
+        output = input_string
+        for compiled_production in self.compiled_productions:
+            output = self.apply_production(compiled_production, output)
         return output
 
+    def matches(self, production_index, word):
+        """Generator over every way the left side of a production matches the whole word.
+        Yields the tuple of variable values in the order of the template's group indices."""
+        parts = self.VARIABLE.split(self.production_lhs[production_index])
+        literals, variables = parts[0::2], parts[1::2]
+        if not word.startswith(literals[0]) or not word.endswith(literals[-1]):
+            return
+        if not variables:
+            if word == literals[0]:
+                yield ()
+            return
+        end = len(word) - len(literals[-1])
+        if end < len(literals[0]):
+            return
+
+        def extend(i, position, values, bound):
+            # bind the variable i starting at position, it must be followed by literals[i + 1]
+            variable, literal = variables[i], literals[i + 1]
+            last = i == len(variables) - 1
+            if variable in bound:
+                value = values[bound[variable]]
+                ends = [position + len(value)] if word.startswith(value, position) else []
+            elif last:
+                ends = [end] if position <= end else []
+            elif literal:
+                ends = []
+                j = word.find(literal, position, end)
+                while j != -1:
+                    ends.append(j)
+                    j = word.find(literal, j + 1, end)
+            else:
+                ends = range(position, end + 1)
+            for stop in ends:
+                if stop > end or last and stop != end:
+                    continue
+                if not last and not word.startswith(literal, stop):
+                    continue
+                if variable in bound:
+                    new_values, new_bound = values, bound
+                else:
+                    new_values = values + (word[position:stop],)
+                    new_bound = {**bound, variable: len(values)}
+                if last:
+                    yield new_values
+                else:
+                    yield from extend(i + 1, stop + len(literal), new_values, new_bound)
+
+        yield from extend(0, len(literals[0]), (), {})
+
+    def successors(self, word):
+        """Return the set of words derivable from word in one step, applying every production at
+        every possible match of its left side"""
+        words = set()
+        for index, (_, template, tail, _) in enumerate(self.compiled_productions):
+            for values in self.matches(index, word):
+                words.add(''.join([literal + values[group] for literal, group in template]) + tail)
+        return words
+
+
+class TagEngine:
+    """Queue based 2-tag engine on interned integer symbols.
+    The word is a deque of symbol codes and the productions are a list indexed by symbol code, so a
+    step costs O(production length) no matter how long the word is.
+    Arguments:
+        production_rules:   dict symbol -> list of appended symbols
+        halting_symbol:     the system halts when this symbol is read (None: only on words < 2)"""
+
+    def __init__(self, production_rules, halting_symbol):
+        self.symbols = []
+        self.symbol_code = {}
+        self.productions = []
+        for symbol, appended in production_rules.items():
+            self.intern(symbol)
+            for a in appended:
+                self.intern(a)
+        for symbol, appended in production_rules.items():
+            self.productions[self.symbol_code[symbol]] = tuple(self.symbol_code[a] for a in appended)
+        self.halting = -1 if halting_symbol is None else self.intern(halting_symbol)
+        self.word = deque()
+        self.steps = 0
+
+    def intern(self, symbol):
+        if symbol not in self.symbol_code:
+            self.symbol_code[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.productions.append(None)
+        return self.symbol_code[symbol]
+
+    def load(self, word):
+        """Replace the current word (sequence of symbols)"""
+        self.word = deque(self.intern(symbol) for symbol in word)
+
+    def get_word(self):
+        """Return the current word as a list of symbols"""
+        symbols = self.symbols
+        return [symbols[code] for code in self.word]
+
+    def prefix(self, n):
+        """Return the first n symbols of the current word (list)"""
+        symbols = self.symbols
+        return [symbols[code] for code in islice(self.word, n)]
+
+    def runs(self):
+        """Return the current word as a list of (symbols, count) segments, built in one pass:
+        equal neighbouring pairs are merged, an odd last symbol is a segment of its own"""
+        word = self.get_word()
+        runs = []
+        for i in range(0, len(word) - 1, 2):
+            pair = (word[i], word[i + 1])
+            if runs and runs[-1][0] == pair:
+                runs[-1][1] += 1
+            else:
+                runs.append([pair, 1])
+        if len(word) % 2:
+            runs.append([(word[-1],), 1])
+        return [(pattern, count) for pattern, count in runs]
+
+    def length(self):
+        return len(self.word)
+
+    def first(self):
+        """Return the first symbol of the word (None for an empty word)"""
+        return self.symbols[self.word[0]] if len(self.word) else None
+
+    def halted(self):
+        return len(self.word) < 2 or self.word[0] == self.halting
+
+    def _missing(self, code):
+        raise Exception("No production for the tag symbol {}".format(self.symbols[code]))
+
+    def step(self):
+        word = self.word
+        production = self.productions[word[0]]
+        if production is None:
+            self._missing(word[0])
+        word.popleft()
+        word.popleft()
+        word.extend(production)
+        self.steps += 1
+
+    def run(self, max_steps=None, profile=None):
+        """Step until the system halts or max_steps steps were made, returns the number of steps.
+        With a UNN.Profile.TagProfile the applications of every production and the word lengths are counted."""
+        if profile is not None:
+            return self._run_profiled(max_steps, profile)
+        word = self.word
+        popleft, extend = word.popleft, word.extend
+        productions, halting = self.productions, self.halting
+        steps = 0
+        limit = -1 if max_steps is None else max_steps
+        while steps != limit and len(word) >= 2:
+            first = word[0]
+            if first == halting:
+                break
+            production = productions[first]
+            if production is None:
+                self.steps += steps
+                self._missing(first)
+            popleft()
+            popleft()
+            extend(production)
+            steps += 1
+        self.steps += steps
+        return steps
+
+    def _run_profiled(self, max_steps, profile):
+        word = self.word
+        popleft, extend = word.popleft, word.extend
+        productions, halting = self.productions, self.halting
+        hits = profile.hits
+        shortest = longest = len(word)
+        steps = 0
+        limit = -1 if max_steps is None else max_steps
+        try:
+            while steps != limit and len(word) >= 2:
+                first = word[0]
+                if first == halting:
+                    break
+                production = productions[first]
+                if production is None:
+                    self._missing(first)
+                hits[first] += 1
+                popleft()
+                popleft()
+                extend(production)
+                steps += 1
+                n = len(word)
+                if n > longest:
+                    longest = n
+                elif n < shortest:
+                    shortest = n
+        finally:
+            self.steps += steps
+            profile.observe(shortest)
+            profile.observe(longest)
+            profile.finish(steps, len(word))
+        return steps
+
+
+class GenerationTagEngine(TagEngine):
+    """2-tag engine that processes a whole generation at once with NumPy.
+    All symbols read in one generation (every other symbol of the current word) are known before
+    any symbol appended in that generation is read, so they are taken with one strided slice, the
+    production lengths are gathered, and the appended block is built with a prefix sum and one
+    concatenation. The generation is cut short exactly at the halting symbol or the step budget.
+    Short words are stepped symbol by symbol, where the NumPy overhead does not pay off."""
+    SHORT_WORD = 64
+
+    def load(self, word):
+        codes = [self.intern(symbol) for symbol in word]
+        
+        # flat production table: productions[c] is flat[offset[c]:offset[c] + length[c]]
+        lengths = [-1 if p is None else len(p) for p in self.productions]
+        self.production_length = np.array(lengths, dtype=np.int64)
+        self.production_offset = np.concatenate(([0], np.cumsum(np.maximum(self.production_length, 0))[:-1]))
+        self.production_flat = np.array([c for p in self.productions if p is not None for c in p], dtype=np.int64)
+        self.word = np.array(codes, dtype=np.int64)
+
+    def get_word(self):
+        symbols = self.symbols
+        return [symbols[code] for code in self.word.tolist()]
+
+    def prefix(self, n):
+        symbols = self.symbols
+        return [symbols[code] for code in self.word[:n].tolist()]
+
+    def step(self):
+        # one unconditional step like TagEngine.step, also on the halting symbol and on short words
+        word = self.word
+        first = int(word[0])
+        length = self.production_length[first]
+        if length < 0:
+            self._missing(first)
+        if len(word) < 2:
+            raise IndexError("A step needs a word of at least two symbols")
+        offset = self.production_offset[first]
+        self.word = np.concatenate((word[2:], self.production_flat[offset:offset + length]))
+        self.steps += 1
+
+    def _run_short(self, limit, profile):
+        # plain stepping on a list while the word is short
+        word = self.word.tolist()
+        productions, halting = self.productions, self.halting
+        steps = 0
+        while steps != limit and 2 <= len(word) < self.SHORT_WORD and word[0] != halting:
+            production = productions[word[0]]
+            if production is None:
+                self.word = np.array(word, dtype=np.int64)
+                self.steps += steps
+                self._missing(word[0])
+            if profile is not None:
+                profile.hits[word[0]] += 1
+            word = word[2:] + list(production)
+            steps += 1
+            if profile is not None:
+                profile.observe(len(word))
+        self.word = np.array(word, dtype=np.int64)
+        return steps
+
+    def run(self, max_steps=None, profile=None):
+        """Step until the system halts or max_steps steps were made, returns the number of steps.
+        With a UNN.Profile.TagProfile the applications of every production and the word lengths are counted."""
+        if profile is None:
+            return self._run(max_steps, None)
+        start = self.steps
+        try:
+            return self._run(max_steps, profile)
+        finally:
+            profile.finish(self.steps - start, len(self.word))
+
+    def _run(self, max_steps, profile):
+        lengths, offsets, flat = self.production_length, self.production_offset, self.production_flat
+        halting = self.halting
+        steps = 0
+        while len(self.word) >= 2 and steps != max_steps:
+            if self.word[0] == halting:
+                break
+            if len(self.word) < self.SHORT_WORD:
+                steps += self._run_short(-1 if max_steps is None else max_steps - steps, profile)
+                continue
+            word = self.word
+            
+            # one generation reads every other symbol of the current word
+            g = len(word) // 2
+            if max_steps is not None:
+                g = min(g, max_steps - steps)
+            reads = word[0:2 * g:2]
+            stop = np.flatnonzero((reads == halting) | (lengths[reads] < 0))
+            if len(stop):
+                g = int(stop[0])
+                reads = reads[:g]
+            
+            n = lengths[reads]
+            ends = np.cumsum(n)
+            total = int(ends[-1]) if g else 0
+            index = np.arange(total) + np.repeat(offsets[reads] - (ends - n), n)
+            self.word = np.concatenate((word[2 * g:], flat[index]))
+            steps += g
+            if profile is not None and g:
+                profile.add_hits(np.bincount(reads, minlength=len(profile.hits)))
+                # length of the word after every step of the generation
+                sizes = len(word) - 2 * np.arange(1, g + 1) + ends
+                profile.observe(int(sizes.min()))
+                profile.observe(int(sizes.max()))
+            
+            if len(stop) and self.word[0] != halting:
+                self.steps += steps
+                self._missing(self.word[0])
+        self.steps += steps
+        return steps
+
+
+class RunLengthTagEngine(TagEngine):
+    """2-tag engine on run-length encoded words.
+    The word is a deque of [pattern, count] segments (pattern: tuple of symbol codes repeated count
+    times), patterns are reduced to their primitive root and equal neighbours are merged, so words
+    like [A x] [a x]^m [B x] [b x]^n take four segments whatever m and n are. A segment at the front
+    is consumed as a whole: reading every other symbol of count repetitions appends the repetition
+    of the concatenated productions count times, which is again one segment. Only segments that
+    do not line up with the pairs are stepped symbol by symbol."""
+
+    def __init__(self, production_rules, halting_symbol):
+        super().__init__(production_rules, halting_symbol)
+        self.word = deque()
+        self.size = 0
+        self._roots = {}
+        self._units = {}
+
+    def load(self, word):
+        """Replace the current word (sequence of symbols), equal neighbouring pairs are merged"""
+        codes = [self.intern(symbol) for symbol in word]
+        runs = [((codes[i], codes[i + 1]), 1) for i in range(0, len(codes) - 1, 2)]
+        if len(codes) % 2:
+            runs.append(((codes[-1],), 1))
+        self._load_codes(runs)
+
+    def load_runs(self, runs):
+        """Replace the current word by a sequence of (symbols, count) segments"""
+        self._load_codes([(tuple(self.intern(symbol) for symbol in pattern), count) for pattern, count in runs])
+
+    def _load_codes(self, runs):
+        self.word = deque()
+        self.size = 0
+        for pattern, count in runs:
+            self._append(pattern, count)
+
+    def runs(self):
+        """Return the current word as a list of (symbols, count) segments"""
+        symbols = self.symbols
+        return [(tuple(symbols[code] for code in pattern), count) for pattern, count in self.word]
+
+    def get_word(self):
+        return [symbol for pattern, count in self.runs() for _ in range(count) for symbol in pattern]
+
+    def prefix(self, n):
+        symbols = self.symbols
+        codes = []
+        for pattern, count in self.word:
+            if len(codes) >= n:
+                break
+            codes.extend(pattern * min(count, n // len(pattern) + 1))
+        return [symbols[code] for code in codes[:n]]
+
+    def length(self):
+        return self.size
+
+    def first(self):
+        return self.symbols[self.word[0][0][0]] if self.size else None
+
+    def halted(self):
+        return self.size < 2 or self.word[0][0][0] == self.halting
+
+    def _root(self, pattern):
+        """Return (root, k) with pattern == root * k and root as short as possible"""
+        if pattern not in self._roots:
+            n = len(pattern)
+            for period in range(1, n + 1):
+                if n % period == 0 and pattern[:period] * (n // period) == pattern:
+                    self._roots[pattern] = (pattern[:period], n // period)
+                    break
+        return self._roots[pattern]
+
+    def _append(self, pattern, count):
+        if not pattern or not count:
+            return
+        self.size += len(pattern) * count
+        root, k = self._root(pattern)
+        word = self.word
+        if word and word[-1][0] == root:
+            word[-1][1] += count * k
+        else:
+            word.append([root, count * k])
+
+    def _unit(self, unit):
+        """Steps and appended symbols for consuming one repetition of an even length unit,
+        None if a halting symbol or a symbol without production is read after the first one"""
+        if unit not in self._units:
+            appended = []
+            for i in range(0, len(unit), 2):
+                production = self.productions[unit[i]]
+                if production is None or (i and unit[i] == self.halting):
+                    appended = None
+                    break
+                appended.extend(production)
+            self._units[unit] = None if appended is None else (len(unit) // 2, tuple(appended))
+        return self._units[unit]
+
+    def _pop_symbol(self):
+        word = self.word
+        pattern, count = word[0]
+        if count > 1:
+            word[0][1] = count - 1
+            word.appendleft([pattern, 1])
+        if len(pattern) > 1:
+            word[0] = [pattern[1:], 1]
+        else:
+            word.popleft()
+        self.size -= 1
+        return pattern[0]
+
+    def step(self):
+        # one unconditional step like TagEngine.step, also on the halting symbol
+        first = self.word[0][0][0]
+        if self.productions[first] is None:
+            self._missing(first)
+        if self.size < 2:
+            raise IndexError("A step needs a word of at least two symbols")
+        self._pop_symbol()
+        self._pop_symbol()
+        self._append(self.productions[first], 1)
+        self.steps += 1
+
+    def run(self, max_steps=None, profile=None):
+        """Step until the system halts or max_steps steps were made, returns the number of steps.
+        With a UNN.Profile.TagProfile the applications of every production are counted, the word
+        lengths are taken at every consumed segment."""
+        if profile is None:
+            return self._run(max_steps, None)
+        start = self.steps
+        try:
+            return self._run(max_steps, profile)
+        finally:
+            profile.finish(self.steps - start, self.size)
+
+    def _run(self, max_steps, profile):
+        word = self.word
+        steps = 0
+        while self.size >= 2 and steps != max_steps:
+            pattern, count = word[0]
+            if pattern[0] == self.halting:
+                break
+            if self.productions[pattern[0]] is None:
+                self.steps += steps
+                self._missing(pattern[0])
+            
+            # x (y x)^c is the same word as (x y)^c x, rotate a single front piece into the
+            # following segment so that the pairs line up with its repetitions again
+            if count == 1 and len(word) > 1:
+                following, repeat = word[1]
+                k = len(pattern)
+                if k < len(following) and following[-k:] == pattern:
+                    word.popleft()
+                    word[0] = [pattern + following[:-k], repeat]
+                    word.insert(1, [pattern, 1])
+                    continue
+            
+            # consume whole repetitions of the front segment at once
+            if len(pattern) % 2:
+                unit, repetitions = pattern * 2, count // 2
+            else:
+                unit, repetitions = pattern, count
+            info = self._unit(unit) if repetitions else None
+            if info is not None:
+                per, appended = info
+                if max_steps is not None:
+                    repetitions = min(repetitions, (max_steps - steps) // per)
+                if repetitions:
+                    left = count - repetitions * len(unit) // len(pattern)
+                    if left:
+                        word[0][1] = left
+                    else:
+                        word.popleft()
+                    self.size -= len(unit) * repetitions
+                    self._append(appended, repetitions)
+                    steps += per * repetitions
+                    if profile is not None:
+                        for code in unit[0::2]:
+                            profile.hits[code] += repetitions
+                        profile.observe(self.size)
+                    continue
+            
+            # single step on the symbols at the front
+            first = self._pop_symbol()
+            self._pop_symbol()
+            self._append(self.productions[first], 1)
+            steps += 1
+            if profile is not None:
+                profile.hits[first] += 1
+                profile.observe(self.size)
+        self.steps += steps
+        return steps
+
+
+class TagSnapshot:
+    """Cheap snapshot of a running TwoTagSystem: step count, word length, first symbol and status
+    are copied, the word is only joined when word() is called. The word is not copied, so it can
+    only be read as long as the system has not been advanced any further."""
+
+    def __init__(self, system, status):
+        self.system = system
+        self.status = status
+        self.steps = system.steps
+        engine = system.engine
+        self.length = engine.length()
+        self.first = engine.first()
+        self._engine = engine
+        self._joined = None
+
+    def word(self, separator=''):
+        if self._joined is None:
+            if self.system.engine is not self._engine or self.system.steps != self.steps:
+                raise Exception("The tag system was advanced after the snapshot, its word is no longer available")
+            self._joined = separator.join(self._engine.get_word())
+        return self._joined
+
+    def __repr__(self):
+        return "TagSnapshot(steps={}, length={}, first={!r}, status={!r})".format(self.steps, self.length, self.first, self.status)
+
 
 class TwoTagSystem(System):
-    def __init__(self, alphabet=None, production=None, verbose=False):
+    """2-tag system. With vectorized=True the word is processed a generation at a time with NumPy
+    (GenerationTagEngine), which pays off for long words. With run_length=True the word is kept as
+    repeated segments (RunLengthTagEngine), so words compiled from Turing machines never have to be
+    materialized."""
+    def __init__(self, alphabet=None, production=None, verbose=False, vectorized=False, run_length=False):
+        self.vectorized = vectorized
+        self.run_length = run_length
+        self.engine = None
+        self.production_rules = {}
+        self.halting_symbol = None
         super().__init__(alphabet, production, verbose)
         self.steps = 0
+    
+    @property
+    def current_word(self):
+        """The current word as a list of symbols, the word itself lives in the TagEngine"""
+        return self.engine.get_word() if self.engine is not None else []
+    
+    @current_word.setter
+    def current_word(self, word):
+        self._new_engine()
+        self.engine.load(word)
+    
+    def _new_engine(self):
+        if self.run_length:
+            self.engine = RunLengthTagEngine(self.production_rules, self.halting_symbol)
+        elif self.vectorized:
+            self.engine = GenerationTagEngine(self.production_rules, self.halting_symbol)
+        else:
+            self.engine = TagEngine(self.production_rules, self.halting_symbol)
         
     def parse_string(self, input_string):
         pattern = '|'.join(re.escape(tag) for tag in self.alphabet)
@@ -99,74 +678,63 @@ class TwoTagSystem(System):
         for i, p in enumerate(self.production):
             m = self.parse_string(p)
             self.parsed_production.append(m)
-            if '*' in m[1]:
+            # '*' is not part of the alphabet, look for it in the production itself
+            if '*' in p.split('->')[1]:
                 self.halt_prod_symbol = m[0][0]
+        
+        # direct symbol -> appended symbols lookup
+        self.production_rules = {}
+        for lhs, rhs in self.parsed_production:
+            self.production_rules[lhs[0]] = [symbol for symbol in rhs if symbol != "_"]
+        self.halting_symbol = self.halt_prod_symbol
             
     def apply_2_tag(self, parsed_input):
-        # prod_id = self.alphabet.index(parsed_input[0])
-        for i, c in enumerate(self.parsed_production):
-            if c[0][0] == parsed_input[0]:
-                current_prod = c
-                continue
-        
-   
-        halt = False
-        
-        # remove first two
-        parsed_input.pop(0)
-        parsed_input.pop(0)
-        # apply production by prod_id
-        tobe_append = [i for i in current_prod[1]]
-        if "_" in tobe_append:
-            tobe_append.remove("_")
+        """Apply one step to a word given as a list of symbols, returns (halt, word)"""
+        # remove first two and apply the production of the first one
+        tobe_append = self.production_rules[parsed_input[0]]
+        del parsed_input[:2]
         parsed_input += tobe_append
        
         op = parsed_input
-        
-        if op[0] == self.halt_prod_symbol or len(op) < 2:
-            halt = True
+        halt = len(op) < 2 or op[0] == self.halt_prod_symbol
         
         return halt, op
         
         
-    def forward(self, input_string):
-        parsed_input = self.parse_string(input_string)
-        halt = False
-        while not halt:
-            if self.verbose:
-                printstr = ''.join(parsed_input) + " -> "
-            halt, parsed_input = self.apply_2_tag(parsed_input)
-            if self.verbose:
-                printstr += ''.join(parsed_input)
-            print(printstr)
+    def forward(self, input_string, trace=None):
+        """Run the system on input_string until it halts and return the final word.
+        Every step is written to trace (UNN.Trace.Trace), verbose systems trace the whole word to stdout."""
+        self.load_word(input_string)
+        engine = self.engine
+        if engine.length() < 2:
+            return ''.join(self.current_word)
         
-        return ''.join(parsed_input)
+        # the first production is always applied, then the system runs until it halts
+        if self.verbose or trace is not None:
+            trace = Trace() if trace is None else trace
+            trace.begin(self)
+            try:
+                while True:
+                    if trace.sampled():
+                        before = trace.word(engine)
+                        engine.step()
+                        trace.write(before + " -> " + trace.word(engine))
+                    else:
+                        engine.step()
+                    if engine.halted():
+                        break
+            finally:
+                trace.end(self)
+        else:
+            engine.step()
+            engine.run()
+        self.steps = engine.steps
+        
+        return ''.join(self.current_word)
 
 
     def load_turing_machine(self, machine_path):
-        definition = read_file(machine_path)
-        transitions = []
-        lines = definition.splitlines()
-        for ln_id, ln in enumerate(lines):
-            if '#states:' in ln:
-                states = ln.split(" ")[1:]
-            if '#symbols:' in ln:
-                symbols = ln.split(" ")[1:]
-            if '#initial_state:' in ln:
-                initial_state = ln.split(" ")[1] 
-            if "#accept_states:" in ln:
-                accept_states = ln.split(" ")[1:] 
-            if "#initial_tape:" in ln:
-                initial_tape = ln.split(" ")[1] 
-                
-            if '#transition_table' in ln:
-                for i in range(ln_id+1, len(lines)):
-                    transitions.append(lines[i].strip().split(" "))
-                break
-        
-        # tm config : states, alphabet, tape_alphabet, transitions, blank_symbol, start_state, accept_states
-        self.machine = TuringMachineConfiguration(states, symbols, None, transitions, '_', initial_state, accept_states, initial_tape)
-            
+        self.machine = TuringMachineConfiguration.load(machine_path)
         return self.machine
     
     @staticmethod
@@ -264,7 +832,30 @@ class TwoTagSystem(System):
 
         return final_production_rules
     
-    def from_turing_machine(self, machine_path):
+    def from_turing_machine(self, machine_path, cache=None):
+        """Compile the Turing machine of a TMs/ file to this two tag system and load its start word.
+        With a CompileCache the binarized machine, the production rules and the start word are
+        loaded from the cache when the file was compiled before."""
+        if cache is None:
+            compiled = self.compile_turing_machine(machine_path)
+        else:
+            compiled = cache.get_or_build("tag", read_file(machine_path),
+                                          lambda: self.compile_turing_machine(machine_path))
+        self.machine, self.production_rules, start_runs = compiled
+        self.halting_symbol = "#"
+        self._new_engine()
+        if self.run_length:
+            self.engine.load_runs(start_runs)
+        else:
+            self.engine.load([symbol for pattern, count in start_runs for _ in range(count) for symbol in pattern])
+        self.steps = 0
+        
+        self.get_word_as_tm_tape()
+        
+        return self
+    
+    def compile_turing_machine(self, machine_path):
+        """Return (binarized machine, production rules, start word as (symbols, count) segments)"""
         machine = self.load_turing_machine(machine_path).convert_to_binary()
     
         #%% Convert formalism
@@ -289,9 +880,7 @@ class TwoTagSystem(System):
         
         # Express the tm tape (which only has 0s and 1s) as two binary numbers, m and n (left and right of the head)
         tape_m = 0
-        tape_n = 0
-        for i, symbol in enumerate(machine.tape):
-            tape_n += int(symbol) * 2 ** i
+        tape_n = bits_to_int(bits_from_string(''.join(machine.tape)))
 
         # A special unique start state (uss) needs to be prepended since the Turing machine's original start state
         # was split into two states and we must begin with a single start state
@@ -305,7 +894,7 @@ class TwoTagSystem(System):
         # The upper case A x and B x only occur once and act as separators between the left and right hand side
         # Each adapted state 's' will receive their own A and B variants, named a_'s' and b_'s'.
         # In this instance, 's' is the unique start state uss. The remaining a_'s' and b_'s' will be defined later.
-        start_word = ["A_" + uss, "x"] + ["a_" + uss, "x"] * tape_m + ["B_" + uss, "x"] + ["b_" + uss, "x"] * tape_n
+        start_runs = [(("A_" + uss, "x"), 1), (("a_" + uss, "x"), tape_m), (("B_" + uss, "x"), 1), (("b_" + uss, "x"), tape_n)]
 
         production_rules = {}
 
@@ -318,48 +907,58 @@ class TwoTagSystem(System):
                 assert key not in production_rules
                 production_rules[key] = value
 
-        self.production_rules = production_rules
-        self.current_word = start_word
-        self.halting_symbol = "#"
-        self.steps = 0
-        
-        self.get_word_as_tm_tape()
-        
-        return self
+        return machine, production_rules, start_runs
     
-    def get_word_as_tm_tape(self):
-        """Return the two tag system's current word in the form of the original binary TM's tape"""
-
-        assert self.current_word[0] == "#" or self.current_word[0].startswith("A")
-        assert self.current_word[1] == "x"
-
+    def get_tm_tape_counts(self):
+        """Return (m, n), the numbers of "a x" and "b x" pairs in the current word.
+        The word is walked once segment by segment, so run-length words are counted in time
+        proportional to their number of segments and never expanded."""
         # the word should now look like this:
         # - a single "A x"
         # - one or more "a x"
         # - a single "B x"
         # - one or more "b x"
         # A x and B x act as separators
+        pairs = []
+        for pattern, count in self.engine.runs():
+            if len(pattern) % 2:
+                assert count % 2 == 0
+                pattern, count = pattern * 2, count // 2
+            if len(pattern) == 2:
+                pairs.append((pattern, count))
+            else:
+                # longer patterns give one run per pair: the first period on its own, then the
+                # remaining count - 1 periods, which keeps the checks on the order of the pairs
+                period = [(pattern[i], pattern[i + 1]) for i in range(0, len(pattern), 2)]
+                pairs.extend((pair, 1) for pair in period)
+                if count > 1:
+                    pairs.extend((pair, count - 1) for pair in period)
+        assert pairs
 
-        word = self.current_word[2:]  # cut off the initial "A x"
-        m = 0
-        n = 0
-
-        # count all "a x" until "B x" is reached
-        while not word[0].startswith("B"):
-            assert word[0].startswith("a") and word[1] == "x"
-            m += 1
-            assert len(word) % 2 == 0
-            word = word[2:]
-
-        assert word[0].startswith("B") and word[1] == "x"
-        word = word[2:]  # cut off the "B x"
+        (first, x), count = pairs[0]
+        assert (first == "#" or first.startswith("A")) and x == "x"
+        pairs[0] = ((first, x), count - 1)  # cut off the initial "A x"
+        m = n = 0
+        seen_b = False
+        for (symbol, x), count in pairs:
+            if not count:
+                continue
+            assert x == "x"
+            if symbol.startswith("B") and not seen_b:
+                assert count == 1
+                seen_b = True  # cut off the "B x"
+            elif not seen_b:
+                assert symbol.startswith("a")
+                m += count
+            else:
+                assert symbol.startswith("b")
+                n += count
+        assert seen_b
+        return m, n
 
-        # count all "b x" until the end
-        while word:
-            assert word[0].startswith("b") and word[1] == "x"
-            n += 1
-            assert len(word) % 2 == 0
-            word = word[2:]
+    def get_word_as_tm_tape(self):
+        """Return the two tag system's current word in the form of the original binary TM's tape"""
+        m, n = self.get_tm_tape_counts()
 
         # convert numbers to binary strings, with the right string reversed
         left = bin(m)[2:] if m > 0 else ""
@@ -367,31 +966,93 @@ class TwoTagSystem(System):
         right = "".join((reversed(right)))
         return left + "^" + right  # mark the head position with a ^
     
-    def step(self):
-        first_symbol = self.current_word[0]
-        self.current_word = self.current_word[2:] + self.production_rules[first_symbol]
-        self.steps += 1
-        
-    def run(self):   
-        print("Initial Tape:")
+    def print_tm_tape(self):
+        """Print the current word decoded to the tape of the original (non-binarized) TM"""
         decoded_tape = self.get_word_as_tm_tape()
         self.machine.head_position = decoded_tape.index('^')
         self.machine.tape = list(decoded_tape.replace('^', ''))
         decoded_output = self.machine.decode_binarized_tape()
         print(''.join(decoded_output).replace('_',''))
+    
+    def load_word(self, input_string):
+        """Start the system given by its productions on a word over the alphabet"""
+        self.current_word = self.parse_string(input_string)
+        self.steps = 0
+        return self
+    
+    def halted(self):
+        return self.engine.halted()
+    
+    def step(self):
+        self.engine.step()
+        self.steps += 1
+    
+    def run_for(self, n_steps):
+        """Advance the current word by at most n_steps steps and return a RunResult.
+        The status is BUDGET if the system can be resumed by calling run_for() again."""
+        start = self.engine.steps
+        try:
+            self.engine.run(n_steps)
+        finally:
+            self.steps += self.engine.steps - start
+        status = RunResult.HALTED if self.halted() else RunResult.BUDGET
+        return RunResult(status, self.steps, self.engine.first())
+    
+    def snapshots(self, every=1):
+        """Generator that advances the current word every steps at a time and yields a TagSnapshot
+        after each chunk, until the system halts. Closing the generator cancels the run."""
+        while True:
+            result = self.run_for(every)
+            yield TagSnapshot(self, result.status)
+            if result.status != RunResult.BUDGET:
+                return
         
-        # print(decoded_tape)
-        while self.current_word[0] != self.halting_symbol and len(self.current_word) >= 2:
-            self.step()
-
-            
-        print("Final Result:")
+    def checkpoint(self, path=None):
+        """Return a UNN.Checkpoint.Checkpoint of the current word, written to path if given"""
+        checkpoint = Checkpoint.of_tag_system(self)
+        if path is not None:
+            checkpoint.save(path)
+        return checkpoint
+    
+    def restore(self, checkpoint):
+        """Continue from a Checkpoint (or the path of a saved one) taken from a system with the same productions"""
+        if not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint.load(checkpoint)
+        return checkpoint.restore_tag_system(self)
+    
+    def fork(self, checkpoint=None):
+        """Return an independent system with the same productions, continued from checkpoint
+        (default: the current word)"""
+        if checkpoint is None:
+            checkpoint = self.checkpoint()
+        elif not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint.load(checkpoint)
+        return checkpoint.fork(self)
+    
+    def run_checkpointed(self, path, every, max_steps=None):
+        """Advance the current word every steps at a time and save a checkpoint to path after each
+        chunk, until the system halts or max_steps more steps were made. Returns the last RunResult."""
+        limit = None if max_steps is None else self.steps + max_steps
+        while True:
+            n_steps = every if limit is None else min(every, limit - self.steps)
+            result = self.run_for(n_steps)
+            self.checkpoint(path)
+            if result.status != RunResult.BUDGET or (limit is not None and self.steps >= limit):
+                return result
         
-        decoded_tape = self.get_word_as_tm_tape()
-        # print(decoded_tape)
+    def run(self, profile=False):
+        """Run the compiled machine, with profile=True the UNN.Profile.TagProfile of the run is returned"""
+        profile = TagProfile(self.engine) if profile else None
+        phase = profile.phase if profile is not None else lambda name: nullcontext()
         
-        self.machine.head_position = decoded_tape.index('^')
-        self.machine.tape = list(decoded_tape.replace('^', ''))
-        decoded_output = self.machine.decode_binarized_tape()
-        print(''.join(decoded_output).replace('_',''))
+        print("Initial Tape:")
+        with phase("decode"):
+            self.print_tm_tape()
         
+        with phase("run"):
+            self.steps += self.engine.run(profile=profile)
+            
+        print("Final Result:")
+        with phase("decode"):
+            self.print_tm_tape()
+        return profile
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:10:37 2026
+
+@author: gelenag
+
+Execution profiles: hit counts per transition or tag production, head and tape statistics, and
+the time spent in each phase of a run
+"""
+import json
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+
+class _Profile(ABC):
+    # phase timing and export shared by the profiles, subclasses provide rows() and as_dict()
+
+    def __init__(self):
+        self.phases = {}
+        self.steps = 0
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager adding the wall clock time of the block to the phase name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    @abstractmethod
+    def rows(self):
+        pass
+
+    def table(self, top=None):
+        """Return the hit counts as a text table, the hottest first (top: number of rows)"""
+        all_rows = self.rows()
+        total = sum(row[-1] for row in all_rows) or 1
+        rows = all_rows[:top]
+        header = self.COLUMNS + ("hits", "share")
+        widths = [max([len(str(row[k])) for row in rows] + [len(header[k])]) for k in range(len(header) - 1)]
+        lines = ["  ".join(h.ljust(w) for h, w in zip(header, widths)) + "  share"]
+        for row in rows:
+            cells = [str(value).ljust(w) for value, w in zip(row, widths)]
+            lines.append("  ".join(cells) + "  {:6.2%}".format(row[-1] / total))
+        for name, seconds in self.phases.items():
+            lines.append("{}: {:.6f}s".format(name, seconds))
+        return "\n".join(lines)
+
+    @abstractmethod
+    def as_dict(self):
+        pass
+
+    def to_json(self, path=None):
+        """Return the profile as JSON text, written to path if given"""
+        text = json.dumps(self.as_dict(), indent=1)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+
+class Profile(_Profile):
+    """Profile of a TuringMachine run, filled by TuringMachine.run(profile=True).
+    hits is indexed like the transition tables of the CompiledProgram (symbol code * n_states +
+    state code). The head excursion is kept relative to the first input cell, the tape growth as
+    the non-blank span and the number of allocated cells before and after the run."""
+    COLUMNS = ("state", "read", "next", "write", "move")
+
+    def __init__(self, program):
+        super().__init__()
+        self.program = program
+        self.hits = [0] * len(program.next_state)
+        self.head_min = None
+        self.head_max = None
+        self.span_before = self.span_after = None
+        self.allocated_before = self.allocated_after = 0
+
+    def rows(self):
+        """Return (state, read, next state, write, move, hits) of every transition that was used,
+        the hottest first"""
+        program = self.program
+        n_states = program.n_states
+        rows = []
+        for i, hits in enumerate(self.hits):
+            if hits:
+                symbol, state = divmod(i, n_states)
+                rows.append((program.states[state], program.symbols[symbol], program.states[program.next_state[i]],
+                             program.symbols[program.write[i]], "R" if program.move[i] > 0 else "L", hits))
+        rows.sort(key=lambda row: -row[-1])
+        return rows
+
+    def as_dict(self):
+        return {"steps": self.steps,
+                "transitions": [dict(zip(self.COLUMNS + ("hits",), row)) for row in self.rows()],
+                "head_min": self.head_min,
+                "head_max": self.head_max,
+                "span_before": self.span_before,
+                "span_after": self.span_after,
+                "allocated_before": self.allocated_before,
+                "allocated_after": self.allocated_after,
+                "phases": self.phases}
+
+
+class TagProfile(_Profile):
+    """Profile of a 2-tag run, filled by the tag engines when a profile is passed to run().
+    hits is indexed by the symbol codes of the engine, hits[c] counts the applications of the
+    production of symbol c."""
+    COLUMNS = ("symbol", "production")
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        self.hits = [0] * len(engine.symbols)
+        self.length_before = self.length_min = self.length_max = self.length_after = engine.length()
+
+    def observe(self, length):
+        """Take a word length into account"""
+        if length < self.length_min:
+            self.length_min = length
+        elif length > self.length_max:
+            self.length_max = length
+
+    def add_hits(self, counts):
+        """Add an array of hit counts indexed by symbol code"""
+        hits = self.hits
+        for code, count in enumerate(counts.tolist()):
+            hits[code] += count
+
+    def finish(self, steps, length):
+        """Called by the engine at the end of run()"""
+        self.steps += steps
+        self.length_after = length
+        self.observe(length)
+
+    def rows(self):
+        """Return (symbol, production, hits) of every production that was applied, the hottest first"""
+        symbols = self.engine.symbols
+        productions = self.engine.productions
+        rows = [(symbols[code], ' '.join(symbols[c] for c in productions[code]), hits)
+                for code, hits in enumerate(self.hits) if hits]
+        rows.sort(key=lambda row: -row[-1])
+        return rows
+
+    def as_dict(self):
+        return {"steps": self.steps,
+                "productions": [dict(zip(self.COLUMNS + ("hits",), row)) for row in self.rows()],
+                "length_before": self.length_before,
+                "length_min": self.length_min,
+                "length_max": self.length_max,
+                "length_after": self.length_after,
+                "phases": self.phases}
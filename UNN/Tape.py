@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:41:27 2026
+
+@author: gelenag
+
+Tape storage for the integer coded Turing machines
+"""
+import mmap
+import tempfile
+from array import array
+from collections import OrderedDict
+from itertools import groupby
+import numpy as np
+from UNN.BlockEncoding import block_values
+
+
+class Tape:
+    """Tape of symbol codes with O(1) random access and geometric growth in both directions.
+    The cells are kept in a bytearray (or an array for alphabets with more than 256 symbols),
+    origin is the index of the tape position 0 inside the buffer. Positions outside of the
+    allocated region read as blank.
+    Arguments:
+        blank:      code of the blank symbol
+        typecode:   'B' for a bytearray, any other array typecode for wider symbol codes
+        capacity:   initial number of allocated cells"""
+
+    def __init__(self, blank=0, typecode='B', capacity=128):
+        self.blank = blank
+        self.typecode = typecode
+        self.cells = self._blanks(capacity)
+        self.origin = capacity // 2
+
+    @classmethod
+    def for_alphabet(cls, n_symbols, blank=0, capacity=128):
+        """Create a tape whose cells are wide enough for n_symbols symbol codes"""
+        typecode = 'B' if n_symbols <= 256 else 'I'
+        return cls(blank, typecode, capacity)
+
+    def fresh(self):
+        """Return an empty tape of the same kind"""
+        return Tape(self.blank, self.typecode)
+
+    def _blanks(self, n):
+        if self.typecode == 'B':
+            return bytearray([self.blank]) * n
+        return array(self.typecode, [self.blank]) * n
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, position):
+        i = position + self.origin
+        if 0 <= i < len(self.cells):
+            return self.cells[i]
+        return self.blank
+
+    def __setitem__(self, position, code):
+        self.reserve(position)
+        self.cells[position + self.origin] = code
+
+    def reserve(self, position):
+        """Make sure the cell at position is allocated. The buffer is at least doubled on every
+        growth, so growing cell by cell costs amortized O(1). The cells object is resized in
+        place, references to it stay valid but origin may change."""
+        i = position + self.origin
+        size = len(self.cells)
+        if i < 0:
+            n = max(size, -i)
+            self.cells[0:0] = self._blanks(n)
+            self.origin += n
+        elif i >= size:
+            self.cells.extend(self._blanks(max(size, i - size + 1)))
+
+    def window(self, position):
+        """Return (cells, origin) with the allocated buffer holding position, the cell of position is
+        cells[position + origin]. The execution loops work on the buffer directly and ask for a new
+        window when the head leaves it."""
+        self.reserve(position)
+        return self.cells, self.origin
+
+    def bounds(self):
+        """Return the allocated region as logical positions (left, right), right exclusive"""
+        return -self.origin, len(self.cells) - self.origin
+
+    def span(self):
+        """Return the smallest region (left, right) holding all non-blank cells, right exclusive.
+        An all blank tape returns (0, 0)."""
+        cells, blank = self.cells, self.blank
+        if self.typecode == 'B':
+            pad = bytes([blank])
+            left = len(cells) - len(cells.lstrip(pad))
+            right = len(cells.rstrip(pad))
+        else:
+            left = 0
+            right = len(cells)
+            while left < right and cells[left] == blank:
+                left += 1
+            while right > left and cells[right - 1] == blank:
+                right -= 1
+        if left >= right:
+            return 0, 0
+        return left - self.origin, right - self.origin
+
+    def load(self, codes, position=0):
+        """Write a sequence of symbol codes to the tape starting at position"""
+        codes = list(codes)
+        if not codes:
+            return
+        self.reserve(position)
+        self.reserve(position + len(codes) - 1)
+        i = position + self.origin
+        self.cells[i:i + len(codes)] = self._from_codes(codes)
+
+    def _from_codes(self, codes):
+        if self.typecode == 'B':
+            return bytes(codes)
+        return array(self.typecode, codes)
+
+    def to_list(self, left=None, right=None):
+        """Return the codes between the logical positions left and right (right exclusive),
+        cells outside of the allocated region are returned as blanks"""
+        lo, hi = self.bounds()
+        left = lo if left is None else left
+        right = hi if right is None else right
+        if right <= left:
+            return []
+        prefix = [self.blank] * max(0, min(lo, right) - left)
+        suffix = [self.blank] * max(0, right - max(hi, left))
+        i = max(left, lo) + self.origin
+        j = min(right, hi) + self.origin
+        return prefix + list(self.cells[i:j]) + suffix
+
+    def read(self, left, right):
+        """Return the codes between left and right (right exclusive) as a bytearray (an array for
+        wide codes)"""
+        lo, hi = self.bounds()
+        if lo <= left <= right <= hi:
+            return self.cells[left + self.origin:right + self.origin]
+        return self._from_codes(self.to_list(left, right))
+
+    def clear(self):
+        self.cells[:] = self._blanks(len(self.cells))
+
+    def copy(self):
+        tape = Tape(self.blank, self.typecode, 0)
+        tape.cells = self.cells[:]
+        tape.origin = self.origin
+        return tape
+
+    def span_bytes(self):
+        """Return (left, raw) with the non-blank span of the cells as bytes starting at position left"""
+        left, right = self.span()
+        return left, bytes(self.cells[left + self.origin:right + self.origin])
+
+    @classmethod
+    def from_span_bytes(cls, left, raw, blank=0, typecode='B'):
+        """Create a tape from the result of span_bytes(), the cells are not copied one by one"""
+        tape = cls(blank, typecode, 0)
+        if typecode == 'B':
+            tape.cells = bytearray(raw)
+        else:
+            tape.cells = array(typecode)
+            tape.cells.frombytes(raw)
+        tape.origin = -left
+        return tape
+
+
+class PagedTape:
+    """Sparse tape of symbol codes split into pages of page_size cells. Only pages that were touched
+    are allocated (bytearrays kept by page number), pages that were never touched read as blank.
+    With max_resident, the least recently used pages beyond that number are spilled to a memory
+    mapped temporary file and read back when they are touched again, so the resident memory stays
+    bounded however far the head wanders. Pages that are all blank are dropped instead of spilled.
+    Arguments:
+        blank:          code of the blank symbol
+        page_size:      number of cells per page
+        max_resident:   number of pages kept in memory (None: no limit)
+        spill_dir:      directory of the spill file (default: the system temporary directory)"""
+    typecode = 'B'
+
+    def __init__(self, blank=0, page_size=4096, max_resident=None, spill_dir=None):
+        if max_resident is not None and max_resident < 2:
+            raise Exception("A paged tape needs at least 2 resident pages")
+        self.blank = blank
+        self.page_size = page_size
+        self.max_resident = max_resident
+        self.spill_dir = spill_dir
+        self.pages = OrderedDict()      # resident pages, the most recently used last
+        self.spilled = {}               # page number -> slot in the spill file
+        self.free_slots = []
+        self.n_slots = 0
+        self._file = None
+        self._map = None
+        self._blank_page = bytes([blank]) * page_size
+
+    @classmethod
+    def for_alphabet(cls, n_symbols, blank=0, **options):
+        """Create a paged tape for n_symbols symbol codes (at most 256, the pages are bytearrays)"""
+        if n_symbols > 256:
+            raise Exception("A paged tape holds at most 256 symbols, the machine has {}".format(n_symbols))
+        return cls(blank, **options)
+
+    def fresh(self):
+        """Return an empty tape with the same page options"""
+        return PagedTape(self.blank, self.page_size, self.max_resident, self.spill_dir)
+
+    def _page(self, number):
+        # the resident page number, allocated or read back from the spill file if necessary
+        page = self.pages.get(number)
+        if page is not None:
+            self.pages.move_to_end(number)
+            return page
+        slot = self.spilled.pop(number, None)
+        if slot is None:
+            page = bytearray(self._blank_page)
+        else:
+            offset = slot * self.page_size
+            page = bytearray(self._map[offset:offset + self.page_size])
+            self.free_slots.append(slot)
+        self.pages[number] = page
+        if self.max_resident is not None and len(self.pages) > self.max_resident:
+            self._evict()
+        return page
+
+    def _evict(self):
+        number, page = self.pages.popitem(last=False)
+        if page == self._blank_page:
+            return
+        if not self.free_slots:
+            self._grow()
+        slot = self.free_slots.pop()
+        offset = slot * self.page_size
+        self._map[offset:offset + self.page_size] = page
+        self.spilled[number] = slot
+
+    def _grow(self):
+        # the spill file is at least doubled, the new slots are used lowest first
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self.spill_dir)
+        n_slots = max(16, 2 * self.n_slots)
+        self._file.truncate(n_slots * self.page_size)
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), n_slots * self.page_size)
+        self.free_slots.extend(range(n_slots - 1, self.n_slots - 1, -1))
+        self.n_slots = n_slots
+
+    def _peek(self, number):
+        # the cells of an allocated page without making it resident
+        page = self.pages.get(number)
+        if page is not None:
+            return page
+        offset = self.spilled[number] * self.page_size
+        return self._map[offset:offset + self.page_size]
+
+    def _numbers(self):
+        return sorted([*self.pages, *self.spilled])
+
+    def __len__(self):
+        return (len(self.pages) + len(self.spilled)) * self.page_size
+
+    def __getitem__(self, position):
+        number, offset = divmod(position, self.page_size)
+        page = self.pages.get(number)
+        if page is not None:
+            return page[offset]
+        if number in self.spilled:
+            return self._map[self.spilled[number] * self.page_size + offset]
+        return self.blank
+
+    def __setitem__(self, position, code):
+        number, offset = divmod(position, self.page_size)
+        self._page(number)[offset] = code
+
+    def reserve(self, position):
+        """Make sure the page holding position is resident"""
+        self._page(position // self.page_size)
+
+    def window(self, position):
+        """Return (page, origin) with the page holding position, the cell of position is
+        page[position + origin]"""
+        number = position // self.page_size
+        return self._page(number), -number * self.page_size
+
+    def bounds(self):
+        """Return the region covered by the allocated pages (left, right), right exclusive"""
+        numbers = self._numbers()
+        if not numbers:
+            return 0, 0
+        return numbers[0] * self.page_size, (numbers[-1] + 1) * self.page_size
+
+    def span(self):
+        """Return the smallest region (left, right) holding all non-blank cells, right exclusive.
+        An all blank tape returns (0, 0)."""
+        pad = bytes([self.blank])
+        numbers = self._numbers()
+        for number in numbers:
+            cells = self._peek(number)
+            stripped = len(cells.lstrip(pad))
+            if stripped:
+                left = number * self.page_size + len(cells) - stripped
+                break
+        else:
+            return 0, 0
+        for number in reversed(numbers):
+            right = len(self._peek(number).rstrip(pad))
+            if right:
+                return left, number * self.page_size + right
+
+    def read(self, left, right):
+        """Return the codes between left and right (right exclusive) as a bytearray"""
+        if right <= left:
+            return bytearray()
+        cells = bytearray([self.blank]) * (right - left)
+        size = self.page_size
+        for number in [*self.pages, *self.spilled]:
+            start = number * size
+            lo, hi = max(left, start), min(right, start + size)
+            if lo < hi:
+                cells[lo - left:hi - left] = self._peek(number)[lo - start:hi - start]
+        return cells
+
+    def to_list(self, left=None, right=None):
+        """Return the codes between the logical positions left and right (right exclusive),
+        by default the region of the allocated pages"""
+        lo, hi = self.bounds()
+        return list(self.read(lo if left is None else left, hi if right is None else right))
+
+    def load(self, codes, position=0):
+        """Write a sequence of symbol codes to the tape starting at position"""
+        codes = bytes(codes)
+        size = self.page_size
+        i = 0
+        while i < len(codes):
+            number, offset = divmod(position + i, size)
+            n = min(size - offset, len(codes) - i)
+            self._page(number)[offset:offset + n] = codes[i:i + n]
+            i += n
+
+    def clear(self):
+        self.pages.clear()
+        self.spilled.clear()
+        self.free_slots = list(range(self.n_slots - 1, -1, -1))
+
+    def copy(self):
+        tape = self.fresh()
+        for number in self._numbers():
+            tape._page(number)[:] = self._peek(number)
+        return tape
+
+    def span_bytes(self):
+        """Return (left, raw) with the non-blank span of the cells as bytes starting at position left"""
+        left, right = self.span()
+        return left, bytes(self.read(left, right))
+
+    def close(self):
+        """Release the spill file"""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+
+class BitTape:
+    """Bit-packed tape for machines that only write the codes 0 and 1 (binarized machines): every
+    cell takes one bit of a bytearray (cell i of the buffer is bit i % 8 of byte i // 8), origin is
+    the bit index of the tape position 0 and the buffer grows in both directions like a Tape.
+    The execution loops work on an unpacked window of window_size cells (bytearray of codes)
+    around the head, which is the authoritative copy of its cells until it is packed back when the
+    head leaves it or the whole tape is read.
+    Arguments:
+        blank:          code of the blank symbol (0 or 1)
+        window_size:    number of cells of the unpacked window (multiple of 8, at least 16)"""
+    typecode = 'B'
+
+    def __init__(self, blank=0, window_size=1 << 12):
+        if blank not in (0, 1) or window_size % 8 or window_size < 16:
+            raise Exception("A bit tape needs the blank 0 or 1 and a window size of at least 16 that is a multiple of 8")
+        self.blank = blank
+        self.window_size = window_size
+        self._fill = 0xFF if blank else 0
+        self.bits = bytearray([self._fill]) * 16
+        self.origin = 64
+        self.cells = bytearray()        # the unpacked window
+        self.start = 0                  # position of the first cell of the window
+
+    @classmethod
+    def for_alphabet(cls, n_symbols, blank=0, **options):
+        """Create a bit tape, the machine may only write the codes 0 and 1 whatever n_symbols is
+        (binarized machines keep the symbols of the original machine in their alphabet)"""
+        return cls(blank, **options)
+
+    def fresh(self):
+        """Return an empty tape with the same window size"""
+        return BitTape(self.blank, self.window_size)
+
+    def __len__(self):
+        return 8 * len(self.bits)
+
+    def reserve(self, position):
+        """Make sure the cell at position is allocated, the buffer is at least doubled on growth and
+        origin stays a multiple of 8"""
+        i = position + self.origin
+        size = len(self.bits)
+        if i < 0:
+            n = max(size, (-i + 7) // 8)
+            self.bits[0:0] = bytearray([self._fill]) * n
+            self.origin += 8 * n
+        elif i >= 8 * size:
+            self.bits.extend(bytearray([self._fill]) * max(size, i // 8 - size + 1))
+
+    def _unpack(self, left, right):
+        # codes of the allocated cells between the byte aligned positions left and right
+        i = (left + self.origin) // 8
+        j = (right + self.origin) // 8
+        return np.unpackbits(np.frombuffer(self.bits, np.uint8, j - i, i), bitorder='little')
+
+    def _pack(self, left, codes):
+        # store an array of codes at the allocated byte aligned position left
+        i = (left + self.origin) // 8
+        packed = np.packbits(codes, bitorder='little')
+        self.bits[i:i + len(packed)] = packed.tobytes()
+
+    def flush(self):
+        """Pack the window back into the buffer"""
+        if self.cells:
+            self._pack(self.start, np.frombuffer(self.cells, np.uint8))
+
+    def window(self, position):
+        """Return (cells, origin) with the unpacked window holding position, the cell of position
+        is cells[position + origin]. A new window is centered on position."""
+        if not self.start <= position < self.start + len(self.cells):
+            self.flush()
+            start = position - self.window_size // 2
+            start -= (start + self.origin) % 8
+            self.reserve(start)
+            self.reserve(start + self.window_size - 1)
+            self.cells = bytearray(self._unpack(start, start + self.window_size).tobytes())
+            self.start = start
+        return self.cells, -self.start
+
+    def __getitem__(self, position):
+        if self.start <= position < self.start + len(self.cells):
+            return self.cells[position - self.start]
+        i = position + self.origin
+        if 0 <= i < 8 * len(self.bits):
+            return self.bits[i >> 3] >> (i & 7) & 1
+        return self.blank
+
+    def __setitem__(self, position, code):
+        if self.start <= position < self.start + len(self.cells):
+            self.cells[position - self.start] = code
+            return
+        self.reserve(position)
+        i = position + self.origin
+        if code:
+            self.bits[i >> 3] |= 1 << (i & 7)
+        else:
+            self.bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+    def bounds(self):
+        """Return the allocated region as logical positions (left, right), right exclusive"""
+        return -self.origin, 8 * len(self.bits) - self.origin
+
+    def span(self):
+        """Return the smallest region (left, right) holding all non-blank cells, right exclusive.
+        An all blank tape returns (0, 0)."""
+        self.flush()
+        bits, pad = self.bits, bytes([self._fill])
+        first = len(bits) - len(bits.lstrip(pad))
+        if first == len(bits):
+            return 0, 0
+        last = len(bits.rstrip(pad)) - 1
+        blank = self.blank
+        low = next(k for k in range(8) if (bits[first] >> k & 1) != blank)
+        high = next(k for k in range(7, -1, -1) if (bits[last] >> k & 1) != blank)
+        return 8 * first + low - self.origin, 8 * last + high + 1 - self.origin
+
+    def read(self, left, right):
+        """Return the codes between left and right (right exclusive) as a bytearray"""
+        if right <= left:
+            return bytearray()
+        self.flush()
+        lo, hi = self.bounds()
+        cells = bytearray([self.blank]) * (right - left)
+        a, b = max(left, lo), min(right, hi)
+        if a < b:
+            # whole bytes are unpacked, lo and hi are byte aligned
+            a8 = a - (a - lo) % 8
+            b8 = b + (hi - b) % 8
+            cells[a - left:b - left] = self._unpack(a8, b8)[a - a8:b - a8].tobytes()
+        return cells
+
+    def to_list(self, left=None, right=None):
+        """Return the codes between the logical positions left and right (right exclusive),
+        by default the allocated region"""
+        lo, hi = self.bounds()
+        return list(self.read(lo if left is None else left, hi if right is None else right))
+
+    def fields(self, left, right, depth):
+        """Return the values (numpy array) of the depth bit wide fields between left and right,
+        the first cell of a field is its most significant bit"""
+        return block_values(np.frombuffer(self.read(left, right), np.uint8), depth)
+
+    def load(self, codes, position=0):
+        """Write a sequence of symbol codes (0 and 1) to the tape starting at position"""
+        codes = np.frombuffer(bytes(codes), np.uint8)
+        if not len(codes):
+            return
+        if codes.max() > 1:
+            raise Exception("A bit tape only holds the codes 0 and 1")
+        self.flush()
+        right = position + len(codes)
+        self.reserve(position)
+        self.reserve(right - 1)
+        lo, hi = self.bounds()
+        a8 = position - (position - lo) % 8
+        b8 = right + (hi - right) % 8
+        cells = self._unpack(a8, b8)
+        cells[position - a8:right - a8] = codes
+        self._pack(a8, cells)
+        if self.cells:
+            # the window is refreshed in place, the execution loops may hold it
+            self.cells[:] = self._unpack(self.start, self.start + len(self.cells)).tobytes()
+
+    def clear(self):
+        self.bits[:] = bytearray([self._fill]) * len(self.bits)
+        self.cells[:] = bytearray([self.blank]) * len(self.cells)
+
+    def copy(self):
+        self.flush()
+        tape = self.fresh()
+        tape.bits = self.bits[:]
+        tape.origin = self.origin
+        return tape
+
+    def span_bytes(self):
+        """Return (left, raw) with the non-blank span of the cells as bytes (one byte per cell)
+        starting at position left"""
+        left, right = self.span()
+        return left, bytes(self.read(left, right))
+
+
+class RunLengthTape:
+    """Run-length encoded tape around the head.
+    left and right are stacks of [symbol code, count] runs, the top of a stack (the end of the list)
+    is the run next to the head. Neighbouring runs on a stack never share a symbol and the infinite
+    blank margins are implicit, so the memory is proportional to the number of runs.
+    Arguments:
+        blank:      code of the blank symbol"""
+
+    def __init__(self, blank=0):
+        self.blank = blank
+        self.left = []
+        self.right = []
+        self.head = blank       # code of the symbol under the head
+        self.position = 0       # logical position of the head
+
+    @classmethod
+    def from_tape(cls, tape, position):
+        """Run-length encode a Tape or PagedTape with the head at position"""
+        rl = cls(tape.blank)
+        left, right = tape.span()
+        left, right = min(left, position), max(right, position + 1)
+        cells = tape.read(left, right)
+        i = position - left
+        rl.head = cells[i]
+        rl.position = position
+        rl._fill(rl.left, cells[:i])
+        rl._fill(rl.right, cells[i + 1:][::-1])
+        return rl
+
+    def _fill(self, stack, cells):
+        # cells are ordered from the far end towards the head
+        for code, group in groupby(cells):
+            self.push(stack, code, sum(1 for _ in group))
+
+    def to_tape(self, tape):
+        """Expand the runs into an empty Tape or PagedTape and return it. The runs of blanks are
+        skipped on a PagedTape, so its pages stay implicit."""
+        runs = self.left + [[self.head, 1]] + self.right[::-1]
+        start = self.position - sum(count for _, count in self.left)
+        if isinstance(tape, Tape):
+            tape.cells = tape._blanks(0)
+            cells = tape.cells
+            for code, count in runs:
+                cells.extend(tape._from_codes([code]) * count)
+            tape.origin = -start
+            return tape
+        position = start
+        for code, count in runs:
+            if code != self.blank:
+                tape.load(bytes([code]) * count, position)
+            position += count
+        return tape
+
+    def push(self, stack, code, count):
+        """Put count cells of code on top of a stack"""
+        if stack and stack[-1][0] == code:
+            stack[-1][1] += count
+        elif stack or code != self.blank:
+            stack.append([code, count])
+
+    def pop(self, stack):
+        """Take the cell next to the head off a stack and return its code"""
+        if not stack:
+            return self.blank
+        run = stack[-1]
+        run[1] -= 1
+        if not run[1]:
+            stack.pop()
+        return run[0]
+
+    def __len__(self):
+        return len(self.left) + len(self.right) + 1
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:02:51 2026
+
+@author: gelenag
+
+Tracing of Turing machine and tag system runs into buffered sinks: text lines with the whole
+tape or a window around the head, sampled every k-th step, or binary deltas that replay() turns
+back into tapes
+"""
+import json
+import sys
+from array import array
+from collections import deque
+from UNN.Tape import Tape
+
+
+class StreamSink:
+    """Collects trace lines and writes them to a stream in blocks.
+    Arguments:
+        stream:         text stream (default: sys.stdout at the time of writing)
+        buffer_lines:   number of lines kept before they are written"""
+
+    def __init__(self, stream=None, buffer_lines=4096):
+        self.stream = stream
+        self.buffer_lines = buffer_lines
+        self.lines = []
+
+    def write(self, line):
+        self.lines.append(line)
+        if len(self.lines) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        if self.lines:
+            stream = self.stream or sys.stdout
+            stream.write("\n".join(self.lines) + "\n")
+            self.lines.clear()
+
+    def close(self):
+        self.flush()
+
+
+class FileSink(StreamSink):
+    """Writes the trace lines to a text file"""
+
+    def __init__(self, path, buffer_lines=4096):
+        super().__init__(open(path, "w"), buffer_lines)
+
+    def close(self):
+        self.flush()
+        self.stream.close()
+
+
+class RingSink:
+    """Keeps the last capacity trace lines in memory"""
+
+    def __init__(self, capacity=1000):
+        self.ring = deque(maxlen=capacity)
+
+    def write(self, line):
+        self.ring.append(line)
+
+    def lines(self):
+        return list(self.ring)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Trace:
+    """Text trace of a run. A Turing machine writes "tape state" lines like print_tape(), with a
+    window only the cells within window of the head are shown (the head cell in brackets) and the
+    line starts with the step number. A tag system writes "word -> next word" lines, with a window
+    only the first window symbols of the words are shown.
+    Arguments:
+        sink:       StreamSink, FileSink or RingSink (default: a StreamSink on stdout)
+        window:     radius around the head (Turing machines) or prefix length (tag systems)
+        every:      trace only every k-th step"""
+
+    def __init__(self, sink=None, window=None, every=1):
+        self.sink = StreamSink() if sink is None else sink
+        self.window = window
+        self.every = every
+        self.count = 0
+
+    def begin(self, machine):
+        self.count = 0
+
+    def sampled(self):
+        """True if the coming step is traced"""
+        count = self.count
+        self.count += 1
+        return count % self.every == 0
+
+    def write(self, line):
+        self.sink.write(line)
+
+    def configuration(self, machine):
+        """Text of the configuration of a TuringMachine before a step"""
+        if self.window is None:
+            tape_str = ''.join(machine.get_tape()).strip(machine.blank_symbol)
+            return f"{tape_str} {machine.current_state}"
+        head, radius = machine.head_position, self.window
+        left = ''.join(machine.get_tape(head - radius, head))
+        right = ''.join(machine.get_tape(head + 1, head + radius + 1))
+        return "{} {}[{}]{} {}".format(machine.steps, left, machine.get_tape(head, head + 1)[0], right, machine.current_state)
+
+    def word(self, engine):
+        """Text of the word of a tag engine"""
+        if self.window is None:
+            return ''.join(engine.get_word())
+        text = ''.join(engine.prefix(self.window))
+        return text + "..." if engine.length() > self.window else text
+
+    def delta(self, state, head, written):
+        """Called after every step of a Turing machine with the new state code, the new head
+        position and the symbol code written at the old one"""
+        pass
+
+    def end(self, machine):
+        self.sink.flush()
+
+    def close(self):
+        self.sink.close()
+
+
+class DeltaTrace(Trace):
+    """Binary trace of a Turing machine run: a JSON header with the symbols, states and the tape at
+    the start, followed by one (state, head, written symbol) record of int32 per step. The
+    file is much smaller than a text trace and replay() rebuilds every tape from it.
+    Arguments:
+        path:           file to write
+        buffer_steps:   number of steps kept before they are written"""
+    MAGIC = b"UNNTRACE\x01\n"
+
+    def __init__(self, path, buffer_steps=1 << 16):
+        super().__init__(sink=None)
+        self.path = path
+        self.buffer_steps = buffer_steps
+        self.records = array('i')
+        self.file = None
+
+    def begin(self, machine):
+        if not hasattr(machine, "head_position"):
+            raise Exception("DeltaTrace records Turing machines only, not {}".format(type(machine).__name__))
+        if self.file is not None:
+            self.close()
+        left, right = machine.tape.span()
+        left, right = min(left, machine.head_position), max(right, machine.head_position + 1)
+        program = machine.program
+        header = {"symbols": program.symbols,
+                  "states": program.states,
+                  "blank": program.blank,
+                  "left": left,
+                  "tape": machine.tape.to_list(left, right),
+                  "head": machine.head_position,
+                  "state": machine.state_code,
+                  "steps": machine.steps}
+        text = json.dumps(header).encode()
+        self.file = open(self.path, "wb")
+        self.file.write(self.MAGIC + len(text).to_bytes(8, "little") + text)
+
+    def sampled(self):
+        return False
+
+    def delta(self, state, head, written):
+        records = self.records
+        records.append(state)
+        records.append(head)
+        records.append(written)
+        if len(records) >= 3 * self.buffer_steps:
+            self.flush()
+
+    def flush(self):
+        if self.records:
+            self.records.tofile(self.file)
+            self.records = array('i')
+
+    def end(self, machine):
+        self.flush()
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+
+def replay(path, every=1):
+    """Generator over the configurations stored in a DeltaTrace file, every k-th step and the last.
+    Yields (step, state, head, tape) with the tape as a string stripped of blanks."""
+    with open(path, "rb") as f:
+        if f.read(len(DeltaTrace.MAGIC)) != DeltaTrace.MAGIC:
+            raise Exception("{}: not a trace file".format(path))
+        size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(size))
+        records = array('i')
+        records.frombytes(f.read())
+
+    symbols, states = header["symbols"], header["states"]
+    tape = Tape.for_alphabet(len(symbols), header["blank"])
+    tape.load(header["tape"], header["left"])
+    blank = symbols[header["blank"]]
+
+    def configuration():
+        decoded = ''.join(symbols[code] for code in tape.to_list(*tape.span())).strip(blank)
+        return step, states[state], head, decoded
+
+    step, state, head = header["steps"], header["state"], header["head"]
+    n = len(records) // 3
+    yield configuration()
+    for k in range(0, 3 * n, 3):
+        # the symbol is written where the head was before the step
+        tape[head] = records[k + 2]
+        state, head = records[k], records[k + 1]
+        step += 1
+        if not (step - header["steps"]) % every or k == 3 * (n - 1):
+            yield configuration()
@@ -6,9 +6,18 @@ Created on Thu Aug 22 11:22:10 2024
 @author: gelenag
 """
 import math
+import re
+import time
+from contextlib import nullcontext
 import numpy as np
-from collections import deque
 from pathlib import Path
+from functools import partial
+from UNN.Tape import Tape, PagedTape, BitTape
+from UNN.Profile import Profile
+from UNN.Trace import Trace
+from UNN.Checkpoint import Checkpoint
+from UNN.BlockEncoding import encode_blocks, decode_blocks, bits_to_string
+from UNN.Loader import read_machine, read_configuration, is_binary, read_binary, write_binary
 
 def read_file(path):
     reading = Path(path).read_text()
@@ -33,21 +42,39 @@ class TuringMachineConfiguration:
         self.tape = initial_tape
         self.head_position = 0
     
+    @classmethod
+    def load(cls, machine_path, blank_symbol='_'):
+        """Load a machine in the header format of TMs/*.txt"""
+        states, symbols, initial_state, accept_states, initial_tape, transitions = read_configuration(machine_path)
+        # tm config : states, alphabet, tape_alphabet, transitions, blank_symbol, start_state, accept_states
+        return cls(states, symbols, None, transitions, blank_symbol, initial_state, accept_states, initial_tape)
+    
+    def fingerprint(self):
+        """Text that identifies the program of the machine (used as key by UNN.Cache.CompileCache)"""
+        return repr((sorted((k, tuple(v)) for k, v in self.transitions.items()),
+                     self.blank_symbol, self.start_state, self.accept_states))
+    
     @staticmethod
     def _to_binary(number, bit_depth):
         """Convert a number to its binary representation with fixed bit depth"""
-        binary = str(bin(number))[2:]
-        while len(binary) < bit_depth:
-            binary = "0" + binary
-        return binary
+        return format(number, '0{}b'.format(bit_depth))
     
-    def convert_to_binary(self):
+    def convert_to_binary(self, cache=None):
         """Convert the Turing machine to a binary Turing machine with only two symbols.
         This is done by encoding each symbol in binary using a fixed-width encoding.
         This is necessary as the resulting TM will not be able to distinguish between a meaningful blank
         and one of the infinite blanks at the start and end of the tape. So instead, each transition of
         the original TM will be converted to a set of transitions that reads and writes one
-        fixed-length encoded block and then moves the head to the next or previous block."""
+        fixed-length encoded block and then moves the head to the next or previous block.
+        Returns a new BinaryTuringMachineConfiguration, this configuration is left unchanged.
+        With a CompileCache the converted machine is loaded from the cache when possible."""
+        if cache is not None:
+            binary = cache.get_or_build("binary", self.fingerprint(), self.convert_to_binary,
+                                        tape="".join(self.tape), head_position=self.head_position)
+            if isinstance(binary, BinaryTuringMachineConfiguration) and binary.original is None:
+                binary.original = self
+            return binary
+        
         # collect all symbols in the transitions (left and right side)
         alphabet = [symbol for _, symbol in self.transitions.keys()]
         alphabet += [symbol for _, symbol, _ in self.transitions.values()]
@@ -57,157 +84,113 @@ class TuringMachineConfiguration:
 
         if len(alphabet) == 2:
             print("Conversion to 2-symbol TM skipped: Was already 2-symbol")
-            return
+            return self
 
         symbol_to_idx_lookup = {symbol: i for i, symbol in enumerate(alphabet)}  # give each symbol a unique number
         alphabet_size = len(alphabet)
         bit_depth = int(math.ceil(math.log(alphabet_size)/math.log(2)))
-
-        new_transitions = {}
-        new_stop_states = []
+        codes = [self._to_binary(i, bit_depth) for i in range(alphabet_size)]
 
         original_states = sorted(set(state for state, _ in self.transitions.keys()))  # list of states
+        target_states = set(state for state, _, _ in self.transitions.values())
+        defined_symbols = {}
+        for state, _ in self.transitions.keys():
+            defined_symbols[state] = defined_symbols.get(state, 0) + 1
+
+        # the binary TM needs this many transitions to encode a single transition of the original TM
+        binary_read_transition_count = 2 ** (bit_depth+1) - 2
+        
+        # every original state gets a block of consecutive integer ids for its binary states "state_i":
+        # the reading tree, then backtrack, write, backtrack and move for each defined symbol.
+        # States without transitions only have "state_0".
+        block_states = original_states + sorted(target_states.difference(original_states))
+        block_sizes = []
+        offset = {}
+        n_states = 0
+        for state in block_states:
+            offset[state] = n_states
+            if state in defined_symbols:
+                block_sizes.append(binary_read_transition_count + 1 + defined_symbols[state] * (4 * bit_depth - 1))
+            else:
+                block_sizes.append(1)
+            n_states += block_sizes[-1]
+
+        binary_transitions = []     # (source id, read bit, target id, written bit, direction)
+        accept_states = []
 
         # for each source state of the original Turing machine (left side of the transition)
         for original_source_state in original_states:
+            base = offset[original_source_state]
             source_id = 0
             target_id = 1
 
-            # the binary TM needs this many transitions to encode a single transition of the original TM
-            binary_read_transition_count = 2 ** (bit_depth+1) - 2
-
-            # encode reading operation
-            for _ in range(binary_read_transition_count//2):  # divide by 2. We handle reading 0 and 1 in one iteration
-
-                # generate two transitions for reading each bit of the current origin state
-
-                binary_source_state = original_source_state + "_" + str(source_id)
-                binary_target_state = original_source_state + "_" + str(target_id)
-                new_transitions[(binary_source_state, "0")] = (binary_target_state, "0", "R")
-
-                target_id += 1
-
-                binary_source_state = original_source_state + "_" + str(source_id)
-                binary_target_state = original_source_state + "_" + str(target_id)
-                new_transitions[(binary_source_state, "1")] = (binary_target_state, "1", "R")
-
-                target_id += 1
+            # encode reading operation, one tree node reads a 0 or a 1
+            for _ in range(binary_read_transition_count//2):
+                binary_transitions.append((base + source_id, "0", base + target_id, "0", "R"))
+                binary_transitions.append((base + source_id, "1", base + target_id + 1, "1", "R"))
+                target_id += 2
                 source_id += 1
 
             # encode write, move and state change for each read result
 
             # for each symbol that exists on the left side of a transition
             for symbol_idx, symbol in enumerate(alphabet):
-                transition_left_side = (original_source_state, symbol)
-                if transition_left_side in self.transitions:
-
-                    transition_right_side = self.transitions[transition_left_side]
-                    original_target_state, original_target_symbol, direction = transition_right_side
-
-                    # convert original TM symbol to binary
-                    original_target_symbol_idx = symbol_to_idx_lookup[original_target_symbol]
-                    original_target_symbol_idx_binary = self._to_binary(original_target_symbol_idx, bit_depth)
-
-                    # after reading a binary encoded symbol, we need to backtrack to the beginning of the binary symbol
-                    symbol_encoding = 2 ** bit_depth - 2 + symbol_idx + 1  # offset +1 from the initial state
-                    source_id = symbol_encoding
-
-                    # for each bit, move the head left without changing anything (backtrack after reading)
-                    for _ in range(bit_depth):
-                        binary_source_state = original_source_state + "_" + str(source_id)
-                        binary_target_state = original_source_state + "_" + str(target_id)
-                        new_transitions[(binary_source_state, "0")] = (binary_target_state, "0", "L")
-                        new_transitions[(binary_source_state, "1")] = (binary_target_state, "1", "L")
-                        source_id = target_id
-                        target_id += 1
-
-                    # write each bit of the target symbol (encode writing operation)
-                    for i in range(bit_depth):
-                        write_symbol = original_target_symbol_idx_binary[i]
-                        binary_source_state = original_source_state + "_" + str(source_id)
-                        binary_target_state = original_source_state + "_" + str(target_id)
-                        new_transitions[(binary_source_state, "0")] = (binary_target_state, write_symbol, "R")
-                        new_transitions[(binary_source_state, "1")] = (binary_target_state, write_symbol, "R")
-                        source_id = target_id
-                        target_id += 1
-
-                    # for each bit, move the head left without changing anything (backtrack after writing)
-                    for _ in range(bit_depth):
-                        binary_source_state = original_source_state + "_" + str(source_id)
-                        binary_target_state = original_source_state + "_" + str(target_id)
-                        new_transitions[(binary_source_state, "0")] = (binary_target_state, "0", "L")
-                        new_transitions[(binary_source_state, "1")] = (binary_target_state, "1", "L")
-                        source_id = target_id
-                        target_id += 1
-
-                    # for each bit, move the head left or right without changing anything (encode head movement)
-                    for _ in range(bit_depth-1):  # end one early to allow special transition of final state
-                        binary_source_state = original_source_state + "_" + str(source_id)
-                        binary_target_state = original_source_state + "_" + str(target_id)
-                        new_transitions[(binary_source_state, "0")] = (binary_target_state, "0", direction)
-                        new_transitions[(binary_source_state, "1")] = (binary_target_state, "1", direction)
-                        source_id = target_id
-                        target_id += 1
-
-                    # move by the missing bit without changing anything (encode the state change)
-                    binary_target_state = original_target_state + "_" + str(0)
-                    if original_target_state in self.accept_states:
-                        new_stop_states.append(binary_target_state)
-                    binary_source_state = original_source_state + "_" + str(source_id)
-                    new_transitions[(binary_source_state, "0")] = (binary_target_state, "0", direction)
-                    new_transitions[(binary_source_state, "1")] = (binary_target_state, "1", direction)
+                transition_right_side = self.transitions.get((original_source_state, symbol))
+                if transition_right_side is None:
+                    continue
+                original_target_state, original_target_symbol, direction = transition_right_side
 
-        # encode the tape to binary
-        new_tape = ""
-        for symbol in self.tape:
-            new_tape += self._to_binary(symbol_to_idx_lookup[symbol], bit_depth)
-        new_tape = list(new_tape)
-        head_position = self.head_position * bit_depth
+                # after reading a binary encoded symbol, we need to backtrack to the beginning of the binary symbol
+                source_id = 2 ** bit_depth - 2 + symbol_idx + 1  # offset +1 from the initial state
 
-        # overwrite members, the old definition will be lost
-        self.has_been_binarized = True
-        self.binarized_bit_depth = bit_depth
-        self.binarized_symbol_lookup = alphabet
-        self.pre_binarize_blank = self.blank_symbol
+                # backtrack after reading, write each bit of the target symbol, backtrack after writing and
+                # move the head by all but the last bit (None: the read bit is written back)
+                steps = [(None, "L")] * bit_depth
+                steps += [(bit, "R") for bit in codes[symbol_to_idx_lookup[original_target_symbol]]]
+                steps += [(None, "L")] * bit_depth
+                steps += [(None, direction)] * (bit_depth - 1)
+                for write_symbol, move in steps:
+                    for bit in "01":
+                        binary_transitions.append((base + source_id, bit, base + target_id,
+                                                   bit if write_symbol is None else write_symbol, move))
+                    source_id = target_id
+                    target_id += 1
 
-        self.transitions = new_transitions
-        self.accept_states = new_stop_states
-        self.head_position = head_position
-        self.tape = new_tape
-        self.blank_symbol = "0"
-        self.start_state = self.start_state + "_" + str(0)
-        self.current_state = self.start_state
-    
-        states = [state for state, _ in self.transitions.keys()]
-        states += [state for state, _, _ in self.transitions.values()]
-        states = sorted(set(states))
-        
-        self.states = states
-    
-        return self
+                # move by the missing bit without changing anything (encode the state change)
+                if original_target_state in self.accept_states and original_target_state not in accept_states:
+                    accept_states.append(original_target_state)
+                for bit in "01":
+                    binary_transitions.append((base + source_id, bit, offset[original_target_state], bit, direction))
+
+        # encode the tape to binary
+        new_tape = list(bits_to_string(encode_blocks(self.tape, alphabet, bit_depth)))
+
+        return BinaryTuringMachineConfiguration(self, block_states, block_sizes, binary_transitions,
+                                                [state + "_0" for state in accept_states], bit_depth, alphabet,
+                                                new_tape, self.head_position * bit_depth)
     
-    def decode_binarized_tape(self):
-        """Decodes the binarized tape back to the original alphabet"""
+    def decode_binarized_tape(self, tape=None, head_position=None):
+        """Decodes the binarized tape back to the original alphabet.
+        A UNN.Tape.BitTape (with the head at head_position) is decoded instead of self.tape if given,
+        its fields are extracted with vectorized bit operations."""
         assert self.has_been_binarized
 
-        output = []
+        if tape is not None:
+            depth = self.binarized_bit_depth
+            left, right = tape.span()
+            if left == right:
+                left = right = head_position
+            # the fields are aligned to the head
+            left -= (left - head_position) % depth
+            right += (head_position - right) % depth
+            lookup = self.binarized_symbol_lookup
+            return [lookup[code] for code in tape.fields(left, right, depth).tolist()]
+
         tape_string = "".join(self.tape)
-        tape_index = self.head_position
-
-        # fill the beginning and end of the tape with 0 to align the bit fields
-        while tape_index % self.binarized_bit_depth != 0:
-            tape_string = "0" + tape_string
-            tape_index += 1
-        while len(tape_string) % self.binarized_bit_depth != 0:
-            tape_string += "0"
-
-        # convert each bit field to its corresponding original TM symbol
-        while len(tape_string) >= self.binarized_bit_depth:
-            symbol = tape_string[0:self.binarized_bit_depth]
-            tape_string = tape_string[self.binarized_bit_depth:]
-            symbol_idx = int(symbol, 2)
-            output.append(self.binarized_symbol_lookup[symbol_idx])
-        return output
+        depth = self.binarized_bit_depth
+
+        # fill the beginning and end of the tape with 0 to align the bit fields to the head
+        return decode_blocks(tape_string, self.binarized_symbol_lookup, depth, -self.head_position % depth)
     
     # def convert_to_binary(self):
     #     """Convert the Turing machine to a binary Turing machine with only two symbols.
@@ -348,6 +331,444 @@ class TuringMachineConfiguration:
     #     self.alphabet = ["0", "1"]
     #     return self
         
+
+class BinaryTuringMachineConfiguration(TuringMachineConfiguration):
+    """Two-symbol machine made by TuringMachineConfiguration.convert_to_binary().
+    The transitions are kept as integer tuples over consecutive state ids, one block of ids per
+    original state. The string state names ("q0_3"), the transitions dict and the list of states are
+    only built when they are first used. All members that do not change (alphabet, tape_alphabet, ...)
+    are shared with the original configuration, which stays available as original.
+    Arguments:
+        original:           the TuringMachineConfiguration that was converted
+        block_states:       original state of every block of binary states
+        block_sizes:        number of binary states in every block
+        binary_transitions: list of (source id, read bit, target id, written bit, direction)
+        accept_states:      names of the binary accept states
+        bit_depth:          number of bits per original symbol
+        symbol_lookup:      original symbols by code, the blank first
+        tape, head_position: binary tape (list of "0" and "1") and head position"""
+
+    def __init__(self, original, block_states, block_sizes, binary_transitions, accept_states, bit_depth,
+                 symbol_lookup, tape, head_position):
+        for key, value in original.__dict__.items():
+            if key not in ("transitions", "states", "_transitions", "_states", "_state_names"):
+                setattr(self, key, value)
+        self.original = original
+        self.original_fingerprint = original.fingerprint()
+        self.block_states = block_states
+        self.block_sizes = block_sizes
+        self._binary_transitions = binary_transitions
+        self._packed = None
+        
+        self.has_been_binarized = True
+        self.binarized_bit_depth = bit_depth
+        self.binarized_symbol_lookup = symbol_lookup
+        self.pre_binarize_blank = original.blank_symbol
+
+        self.accept_states = accept_states
+        self.head_position = head_position
+        self.tape = tape
+        self.blank_symbol = "0"
+        self.start_state = original.start_state + "_" + str(0)
+        self.current_state = self.start_state
+
+        self._state_names = None
+        self._transitions = None
+        self._states = None
+        
+    def __getstate__(self):
+        # the lazily built members and the original machine are not stored, the binary transitions
+        # are stored as integer rows (the directions as codes into a list)
+        state = dict(self.__dict__)
+        state.update(original=None, _state_names=None, _transitions=None, _states=None,
+                     _binary_transitions=None, _packed=self._pack())
+        return state
+
+    def _pack(self):
+        if self._packed is None:
+            directions = sorted(set(direction for _, _, _, _, direction in self._binary_transitions))
+            direction_code = {direction: i for i, direction in enumerate(directions)}
+            rows = np.array([(source, read == "1", target, write == "1", direction_code[direction])
+                             for source, read, target, write, direction in self._binary_transitions],
+                            dtype=np.int32).reshape(-1, 5)
+            self._packed = (directions, rows)
+        return self._packed
+
+    @property
+    def binary_transitions(self):
+        """list of (source id, read bit, target id, written bit, direction)"""
+        if self._binary_transitions is None:
+            directions, rows = self._packed
+            source, read, target, write, direction = rows.T.tolist()
+            bits = ("0", "1")
+            self._binary_transitions = list(zip(source, map(bits.__getitem__, read), target,
+                                                map(bits.__getitem__, write), map(directions.__getitem__, direction)))
+        return self._binary_transitions
+
+    def fingerprint(self):
+        return repr(("binary", self.original_fingerprint))
+
+    @property
+    def state_names(self):
+        """Names of the binary states by id"""
+        if self._state_names is None:
+            self._state_names = [state + "_" + str(i) for state, size in zip(self.block_states, self.block_sizes)
+                                 for i in range(size)]
+        return self._state_names
+
+    @property
+    def transitions(self):
+        if self._transitions is None:
+            names = self.state_names
+            self._transitions = {(names[source], read): (names[target], write, direction)
+                                 for source, read, target, write, direction in self.binary_transitions}
+        return self._transitions
+
+    @property
+    def states(self):
+        if self._states is None:
+            names = self.state_names
+            ids = set(source for source, _, _, _, _ in self.binary_transitions)
+            ids.update(target for _, _, target, _, _ in self.binary_transitions)
+            self._states = sorted(names[i] for i in ids)
+        return self._states
+
+
+class CompiledProgram:
+    """Integer coded form of a Turing machine program.
+    States and symbols are interned as small integers (the blank symbol always gets the code 0) and
+    the transitions are stored in flat lists indexed by symbol_code * n_states + state_code, so the
+    simulation loop only ever works on integers. A missing transition has the next state -1.
+    Arguments:
+        transitions:    dict (state, read symbol) -> (next state, write symbol, direction)
+        blank_symbol:   the blank symbol of the tape
+        start_state:    the start state
+        accept_states:  list of the accepting (halting) states
+        states:         optional list of states, fixes the order of the state codes
+        symbols:        optional list of symbols, fixes the order of the symbol codes"""
+
+    def __init__(self, transitions, blank_symbol, start_state, accept_states, states=None, symbols=None):
+        if isinstance(accept_states, str):
+            accept_states = [accept_states]
+
+        self._transitions = dict(transitions)
+        self._rows = None
+        self._directions = None
+        self.blank_symbol = blank_symbol
+        self.start_state = start_state
+        self.accept_states = list(accept_states)
+
+        self.symbols = []
+        self.symbol_code = {}
+        self.states = []
+        self.state_code = {}
+
+        # intern every symbol and state that can ever be seen by the machine
+        for symbol in [blank_symbol] + list(symbols or []):
+            self._intern(symbol, self.symbols, self.symbol_code)
+        for state in list(states or []) + [start_state] + self.accept_states:
+            self._intern(state, self.states, self.state_code)
+        for (s_pre, read), (s_post, write, _) in self.transitions.items():
+            self._intern(s_pre, self.states, self.state_code)
+            self._intern(s_post, self.states, self.state_code)
+            self._intern(read, self.symbols, self.symbol_code)
+            self._intern(write, self.symbols, self.symbol_code)
+
+        self.n_states = len(self.states)
+        self.start = self.state_code[start_state]
+        self.blank = 0
+        self.halting = [state in self.accept_states for state in self.states]
+
+        self._build_tables()
+
+    def _build_tables(self):
+        self.next_state = []
+        self.write = []
+        self.move = []
+        for _ in self.symbols:
+            self._extend_tables()
+        symbol_code, state_code, n_states = self.symbol_code, self.state_code, self.n_states
+        next_state, write_table, move = self.next_state, self.write, self.move
+        for (s_pre, read), (s_post, write, direction) in self.transitions.items():
+            i = symbol_code[read] * n_states + state_code[s_pre]
+            next_state[i] = state_code[s_post]
+            write_table[i] = symbol_code[write]
+            move[i] = 1 if direction == 'R' else -1
+
+    @property
+    def transitions(self):
+        """dict (state, read symbol) -> (next state, write symbol, direction), built from the integer
+        rows when the program was loaded from a file or a cache"""
+        if self._transitions is None:
+            states, symbols, directions = self.states, self.symbols, self._directions
+            s_pre, read, s_post, write, direction = np.asarray(self._rows).T.tolist()
+            self._transitions = dict(zip(zip(map(states.__getitem__, s_pre), map(symbols.__getitem__, read)),
+                                         zip(map(states.__getitem__, s_post), map(symbols.__getitem__, write),
+                                             map(directions.__getitem__, direction))))
+        return self._transitions
+
+    def rows(self):
+        """Return (rows, directions): the transitions as an int32 array of (state, read, next state,
+        write, direction) codes, the direction codes index the list directions"""
+        if self._rows is None:
+            directions = sorted(set(direction for _, _, direction in self._transitions.values()))
+            direction_code = {direction: i for i, direction in enumerate(directions)}
+            state_code, symbol_code = self.state_code, self.symbol_code
+            rows = [(state_code[s_pre], symbol_code[read], state_code[s_post], symbol_code[write], direction_code[direction])
+                    for (s_pre, read), (s_post, write, direction) in self._transitions.items()]
+            self._rows = np.array(rows, dtype=np.int32).reshape(-1, 5)
+            self._directions = directions
+        return self._rows, self._directions
+
+    def __getstate__(self):
+        # the flat tables and the transitions are stored as integer arrays, a cached program is
+        # restored without building anything
+        rows, directions = self.rows()
+        state = dict(self.__dict__)
+        state.update(next_state=np.array(self.next_state, dtype=np.int32),
+                     write=np.array(self.write, dtype=np.int32),
+                     move=np.array(self.move, dtype=np.int8),
+                     _transitions=None, _rows=np.array(rows), _directions=directions)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.next_state = self.next_state.tolist()
+        self.write = self.write.tolist()
+        self.move = self.move.tolist()
+
+    def save(self, path):
+        """Write the program in the binary format of UNN.Loader (integer rows, memory-mapped on load)"""
+        rows, directions = self.rows()
+        header = {"states": self.states, "symbols": self.symbols, "directions": directions,
+                  "blank_symbol": self.blank_symbol, "start_state": self.start_state,
+                  "accept_states": self.accept_states}
+        write_binary(path, header, rows)
+
+    @classmethod
+    def load(cls, path):
+        """Read a program written by save(), the tables are filled from the memory-mapped rows"""
+        header, rows = read_binary(path)
+        program = cls.__new__(cls)
+        program.blank_symbol = header["blank_symbol"]
+        program.start_state = header["start_state"]
+        program.accept_states = header["accept_states"]
+        program.symbols = header["symbols"]
+        program.symbol_code = {symbol: i for i, symbol in enumerate(program.symbols)}
+        program.states = header["states"]
+        program.state_code = {state: i for i, state in enumerate(program.states)}
+        program.n_states = n_states = len(program.states)
+        program.start = program.state_code[program.start_state]
+        program.blank = 0
+        program.halting = [state in program.accept_states for state in program.states]
+
+        directions = header["directions"]
+        program._transitions = None
+        program._rows = rows
+        program._directions = directions
+        rows = np.asarray(rows, dtype=np.int64)
+        size = len(program.symbols) * n_states
+        index = rows[:, 1] * n_states + rows[:, 0]
+        moves = np.array([1 if direction == 'R' else -1 for direction in directions], dtype=np.int64)
+        tables = np.zeros((3, size), dtype=np.int64)
+        tables[0] = -1
+        tables[0, index] = rows[:, 2]
+        tables[1, index] = rows[:, 3]
+        tables[2, index] = moves[rows[:, 4]]
+        program.next_state, program.write, program.move = tables.tolist()
+        return program
+
+    def set_entry(self, start_state, accept_states):
+        """Start in start_state and halt in accept_states instead of the states the program was
+        compiled with, start_state must be a state of the program"""
+        if isinstance(accept_states, str):
+            accept_states = [accept_states]
+        if start_state not in self.state_code:
+            raise Exception("The program has no state {}".format(start_state))
+        self.start_state = start_state
+        self.start = self.state_code[start_state]
+        self.accept_states = list(accept_states)
+        self.halting = [state in self.accept_states for state in self.states]
+
+    @staticmethod
+    def _intern(item, items, codes):
+        if item not in codes:
+            codes[item] = len(items)
+            items.append(item)
+        return codes[item]
+
+    def _extend_tables(self):
+        # one block of n_states entries per symbol, all without a transition
+        self.next_state.extend([-1] * self.n_states)
+        self.write.extend([0] * self.n_states)
+        self.move.extend([0] * self.n_states)
+
+    def intern_symbol(self, symbol):
+        """Return the code of a symbol, symbols seen for the first time (e.g. in an input string)
+        get a new code without any transitions."""
+        if symbol not in self.symbol_code:
+            self._intern(symbol, self.symbols, self.symbol_code)
+            self._extend_tables()
+        return self.symbol_code[symbol]
+
+    def encode(self, symbols):
+        """Convert a sequence of symbols to a list of symbol codes"""
+        return [self.intern_symbol(symbol) for symbol in symbols]
+
+    def decode(self, codes):
+        """Convert a sequence of symbol codes back to a list of symbols"""
+        symbols = self.symbols
+        return [symbols[code] for code in codes]
+
+
+class RunResult:
+    """Outcome of TuringMachine.run(). The result is true if the machine halted in an accept state.
+    status is one of HALTED, REJECTED (no transition applies), BUDGET (max_steps or max_time
+    exhausted) and LOOPED (the cycle detector proved the run can never halt), loop describes
+    the detected cycle and profile holds the UNN.Profile.Profile of a profiled run."""
+    HALTED = 'halted'
+    REJECTED = 'rejected'
+    BUDGET = 'budget'
+    LOOPED = 'looped'
+
+    def __init__(self, status, steps, state, loop=None, profile=None):
+        self.status = status
+        self.steps = steps
+        self.state = state
+        self.loop = loop
+        self.profile = profile
+
+    def __bool__(self):
+        return self.status == self.HALTED
+
+    def __repr__(self):
+        return "RunResult(status={!r}, steps={}, state={!r})".format(self.status, self.steps, self.state)
+
+
+class CycleDetector:
+    """Proves that a run never halts while keeping only a constant number of saved configurations.
+    Exact cycles: configurations are fingerprinted as (state, head, rolling hash of the tape) and
+    compared with one saved configuration that is replaced at doubling intervals (Brent).
+    Translated cycles: every time the head visits a cell beyond everything seen so far on the right
+    (left), the state and the tape window covered since a saved record visit are compared with it;
+    a repeated window means the machine drifts forever. Saved records are replaced at doubling
+    numbers of record visits."""
+    MODULUS = (1 << 61) - 1
+    BASE = 1000003
+
+    def __init__(self, tape, head, state, step):
+        self.loop = None
+        self.fingerprint = self.hash_tape(tape)
+        self.saved = (step, state, head, self.fingerprint, tape.copy())
+        self.power = 1
+
+        lo, hi = tape.span()
+        self.right_record = max(head, hi - 1)
+        self.left_record = min(head, lo) if hi > lo else head
+        self.right = self.left = None
+        self.right_power = self.left_power = 1
+        self.right_events = self.left_events = 0
+        self.right_low = self.left_high = head
+
+    @classmethod
+    def hash_tape(cls, tape):
+        """Rolling hash sum(code * BASE**position), blank cells (code 0) do not contribute"""
+        lo, hi = tape.span()
+        h = 0
+        for position, code in zip(range(lo, hi), tape.read(lo, hi)):
+            if code:
+                h = (h + code * pow(cls.BASE, position, cls.MODULUS)) % cls.MODULUS
+        return h
+
+    @staticmethod
+    def _same_tape(a, b):
+        span = a.span()
+        return span == b.span() and a.to_list(*span) == b.to_list(*span)
+
+    def observe(self, step, state, head, fingerprint, tape):
+        """Check the configuration after a step, returns True if the run is proven to never halt"""
+        saved_step, saved_state, saved_head, saved_fingerprint, saved_tape = self.saved
+        if fingerprint == saved_fingerprint and state == saved_state and head == saved_head \
+                and self._same_tape(tape, saved_tape):
+            self.loop = {"kind": "cycle", "start": saved_step, "period": step - saved_step, "shift": 0}
+            return True
+        if step - saved_step >= self.power:
+            self.saved = (step, state, head, fingerprint, tape.copy())
+            self.power *= 2
+
+        if head < self.right_low:
+            self.right_low = head
+        if head > self.left_high:
+            self.left_high = head
+
+        if head > self.right_record:
+            self.right_record = head
+            if self.right is not None and self.right[1] == state:
+                anchor_step, _, anchor_head, anchor_tape = self.right
+                shift = head - anchor_head
+                low = self.right_low
+                if tape.to_list(low + shift, head + 1) == anchor_tape.to_list(low, anchor_head + 1):
+                    self.loop = {"kind": "translated", "start": anchor_step, "period": step - anchor_step, "shift": shift}
+                    return True
+            self.right_events += 1
+            if self.right is None or self.right_events >= self.right_power:
+                self.right = (step, state, head, tape.copy())
+                self.right_power *= 2
+                self.right_events = 0
+                self.right_low = head
+
+        elif head < self.left_record:
+            self.left_record = head
+            if self.left is not None and self.left[1] == state:
+                anchor_step, _, anchor_head, anchor_tape = self.left
+                shift = head - anchor_head
+                high = self.left_high
+                if tape.to_list(head, high + shift + 1) == anchor_tape.to_list(anchor_head, high + 1):
+                    self.loop = {"kind": "translated", "start": anchor_step, "period": step - anchor_step, "shift": shift}
+                    return True
+            self.left_events += 1
+            if self.left is None or self.left_events >= self.left_power:
+                self.left = (step, state, head, tape.copy())
+                self.left_power *= 2
+                self.left_events = 0
+                self.left_high = head
+        return False
+
+
+class Snapshot:
+    """Cheap snapshot of a running TuringMachine: state, head, step count and status are copied,
+    the tape is only decoded when tape() or window() is called. The tape is not copied, so it can
+    only be read as long as the machine has not been advanced any further."""
+
+    def __init__(self, machine, status):
+        self.machine = machine
+        self.status = status
+        self.state = machine.current_state
+        self.head = machine.head_position
+        self.steps = machine.steps
+        self._tape = machine.tape
+        self._decoded = None
+
+    def _check(self):
+        if self.machine.tape is not self._tape or self.machine.steps != self.steps:
+            raise Exception("The machine was advanced after the snapshot, its tape is no longer available")
+
+    def tape(self):
+        """Return the non-blank part of the tape as a string"""
+        if self._decoded is None:
+            self._check()
+            self._decoded = ''.join(self.machine.get_tape(*self._tape.span()))
+        return self._decoded
+
+    def window(self, radius):
+        """Return the 2 * radius + 1 cells around the head as a string"""
+        self._check()
+        return ''.join(self.machine.get_tape(self.head - radius, self.head + radius + 1))
+
+    def __repr__(self):
+        return "Snapshot(state={!r}, head={}, steps={}, status={!r})".format(self.state, self.head, self.steps, self.status)
+
+
 class TuringMachine:
     def __init__(self, states=None, alphabet=None, tape_alphabet=None, start_state=None, accept_states=None, blank_symbol='_', verbose=False):
         self.states = list(states) if states is not None else None
@@ -370,147 +791,610 @@ class TuringMachine:
         self.machine_from_config = False
         self.machine_binarized = False
         
-        # Use deque for the tape to allow easy expansion in both directions
-        self.tape = deque()
+        # The tape holds symbol codes and grows in both directions, the head position is relative
+        # to the first cell of the input
+        self.tape = Tape()
+        self.tape_factory = Tape.for_alphabet
         self.head_position = 0
         self.current_state = start_state
+        self.state_code = None
+        self.steps = 0
+        self.loop = None
         
         self.verbose = verbose
     
-    def load_program(self, program_path):
-        program = read_file(program_path)
-        self.transition_table = np.full((len(self.states), len(self.alphabet)), None, dtype=object)
-        for line in program.splitlines():
-            if len(line):
-                s_pre, read, s_post, write, direction = line.split(' ')
-                self.transition_table[self.state_index[s_pre], self.symbol_index[read]] = (s_post, write, direction)
+    def compile(self, transitions):
+        """Intern states and symbols and build the integer transition tables used by step() and run()"""
+        self.program = self._new_program(transitions, self.states)
+        self.machine_has_program = True
+        return self.program
+    
+    def _new_program(self, transitions, states):
+        return CompiledProgram(transitions, self.blank_symbol, self.start_state, self.accept_states,
+                               states=states, symbols=self.alphabet)
+    
+    def _compile_cached(self, cache, source, build, **options):
+        # compile through a CompileCache, build() returns the CompiledProgram and is only called on a miss
+        self.program = cache.get_or_build(
+            "program", source, build,
+            blank_symbol=self.blank_symbol, start_state=self.start_state, accept_states=self.accept_states,
+            **options)
         self.machine_has_program = True
+        return self.program
+    
+    @property
+    def transitions(self):
+        """The transitions dict (state, read symbol) -> (next state, write symbol, direction) of the program"""
+        return self.program.transitions
+    
+    def load_program(self, program_path, cache=None):
+        """Load a program file (text or the binary format written by save_program()).
+        With a CompileCache a text program compiled before is not parsed again."""
+        if is_binary(program_path):
+            self.program = CompiledProgram.load(program_path)
+            self.machine_has_program = True
+            for name in ("start_state", "accept_states", "blank_symbol"):
+                if getattr(self, name) is None:
+                    setattr(self, name, getattr(self.program, name))
+            # the states given to the constructor win over the ones saved with the program, as
+            # they do for a text program
+            self.program.set_entry(self.start_state, self.accept_states)
+        elif cache is None:
+            self.compile(read_machine(program_path)[1])
+        else:
+            self._compile_cached(cache, read_file(program_path),
+                                 lambda: self._new_program(read_machine(program_path)[1], self.states),
+                                 states=self.states, alphabet=self.alphabet)
         self.reset('')
     
-    def load_configuration(self, config):
+    def save_program(self, program_path):
+        """Write the compiled program in the binary format, load_program() memory-maps it"""
+        if not self.machine_has_program:
+            raise Exception("No program loaded")
+        self.program.save(program_path)
+    
+    def load_configuration(self, config, cache=None):
        self.config = config
-       self.states = config.states
        self.alphabet = config.alphabet
+       if getattr(config, 'has_been_binarized', False):
+           # the configuration shares the alphabet of the original machine, the binary machine
+           # reads and writes only the blank 0 (code 0) and 1 (code 1)
+           self.alphabet = [config.blank_symbol, '1']
        if config.blank_symbol not in self.alphabet:
            self.alphabet = [config.blank_symbol] + self.alphabet
        self.tape_alphabet = self.alphabet
        self.blank_symbol = config.blank_symbol
        self.start_state = config.start_state
        self.accept_states = config.accept_states
-       self.transitions = {}
-       
-       for t in config.transitions:
-           self.transitions[(t[0], t[1])] = t[2:]
        
-       self.tape = config.tape
-       self.head_position = 0
-       
-       self.machine_has_program = True
        self.machine_from_config = True
        
-       if config.has_been_binarized:
+       if getattr(config, 'has_been_binarized', False):
            self.machine_binarized = True
+           # the binary machine only writes 0 and 1, one bit per cell
+           self.tape_factory = BitTape.for_alphabet
        
-       self.state_index = {state: i for i, state in enumerate(self.states)}
-       self.symbol_index = {symbol: i for i, symbol in enumerate(self.alphabet)}
+       if cache is None:
+           self.states = config.states
+           self.compile(config.transitions)
+       else:
+           # the fingerprint stands for the states and the transitions, a hit builds neither
+           self._compile_cached(cache, config.fingerprint(),
+                                lambda: self._new_program(config.transitions, config.states),
+                                alphabet=self.alphabet)
+           self.states = self.program.states
        
-       self.transition_table = np.full((len(self.states), len(self.alphabet)), None, dtype=object)
-       for k, v in config.transitions.items():
-            (s_pre, read), (s_post, write, direction) = k, v
-            self.transition_table[self.state_index[s_pre], self.symbol_index[read]] = (s_post, write, direction)
-       self.machine_has_program = True
-       self.reset("".join(self.tape))
+       self.state_index = self.program.state_code if cache is not None else {state: i for i, state in enumerate(self.states)}
+       self.symbol_index = {symbol: i for i, symbol in enumerate(self.alphabet)}
+       self.reset(config.tape)
        
     
+    def use_paged_tape(self, page_size=4096, max_resident=None, spill_dir=None):
+        """Keep the tape in a UNN.Tape.PagedTape from now on: only the pages the head touched are
+        allocated and with max_resident the cold pages are spilled to a memory mapped file (see
+        PagedTape for the arguments). The current tape is converted."""
+        self.tape_factory = partial(PagedTape.for_alphabet, page_size=page_size, max_resident=max_resident,
+                                    spill_dir=spill_dir)
+        if self.machine_has_program:
+            tape = self.tape_factory(len(self.program.symbols), self.program.blank)
+            left, right = self.tape.span()
+            tape.load(self.tape.read(left, right), left)
+            self.tape = tape
+        return self
+    
     def reset(self, input_string):
-        self.tape.clear()
-        self.tape.extend([self.blank_symbol] * 100)  # Initialize with some blanks to simulate infinite tape
-        self.head_position = len(self.tape) // 2
+        codes = self.program.encode(input_string)
+        self.tape = self.tape_factory(len(self.program.symbols), self.program.blank)
+        self.tape.load(codes)
+        self.head_position = 0
+        self.state_code = self.program.start
         self.current_state = self.start_state
-        for i, char in enumerate(input_string):
-            self.tape[self.head_position + i] = char
+        self.steps = 0
     
     def step(self):
         if not self.machine_has_program:
             raise Exception("No program loaded")
         
-        current_symbol = self.tape[self.head_position]
-        state_idx = self.state_index[self.current_state]
-        symbol_idx = self.symbol_index[current_symbol]
+        program = self.program
+        i = self.tape[self.head_position] * program.n_states + self.state_code
         
-        transition = self.transition_table[state_idx, symbol_idx]
-        if transition is None:
+        next_state = program.next_state[i]
+        if next_state < 0:
             print("-------- Rejected --------")
             return False  # Halts if no valid transition
-
-        next_state, write_symbol, move_direction = transition
         
-        self.tape[self.head_position] = write_symbol
-        if move_direction == 'R':
-            self.head_position += 1
-            if self.head_position >= len(self.tape):
-                self.tape.append(self.blank_symbol)
-        else:  # 'L'
-            if self.head_position <= 0:
-                self.tape.appendleft(self.blank_symbol)
-                self.head_position += 1
-            self.head_position -= 1
+        self.tape[self.head_position] = program.write[i]
+        self.head_position += program.move[i]
         
-        self.current_state = next_state
+        self.state_code = next_state
+        self.current_state = program.states[next_state]
+        self.steps += 1
         return True
+    
+    def _execute(self):
+        """Run the integer coded machine until it halts or no transition applies.
+        Returns the RunResult status."""
+        program = self.program
+        next_states, writes, moves, halting = program.next_state, program.write, program.move, program.halting
+        n_states = program.n_states
+        tape = self.tape
+        
+        # work on the raw cells, pos is the physical index of the head inside the buffer (the page of
+        # a PagedTape)
+        cells, origin = tape.window(self.head_position)
+        size = len(cells)
+        pos = self.head_position + origin
+        state = self.state_code
+        steps = self.steps
+        
+        while not halting[state]:
+            i = cells[pos] * n_states + state
+            next_state = next_states[i]
+            if next_state < 0:
+                print("-------- Rejected --------")
+                break
+            cells[pos] = writes[i]
+            pos += moves[i]
+            if pos < 0 or pos == size:
+                cells, window_origin = tape.window(pos - origin)
+                pos += window_origin - origin
+                origin = window_origin
+                size = len(cells)
+            state = next_state
+            steps += 1
+        
+        self.head_position = pos - origin
+        self.state_code = state
+        self.current_state = program.states[state]
+        self.steps = steps
+        return RunResult.HALTED if halting[state] else RunResult.REJECTED
+    
+    def _execute_checked(self, max_steps=None, deadline=None, detect_cycles=False):
+        """Same as _execute() but stops after max_steps steps, at the time.monotonic() deadline or
+        when the cycle detector proves that the run never halts. Returns the RunResult status."""
+        program = self.program
+        next_states, writes, moves, halting = program.next_state, program.write, program.move, program.halting
+        n_states = program.n_states
+        tape = self.tape
+        
+        cells, origin = tape.window(self.head_position)
+        size = len(cells)
+        pos = self.head_position + origin
+        state = self.state_code
+        steps = self.steps
+        limit = None if max_steps is None else steps + max_steps
+        
+        detector = None
+        if detect_cycles:
+            detector = CycleDetector(tape, self.head_position, state, steps)
+            modulus, base = CycleDetector.MODULUS, CycleDetector.BASE
+            inverse = pow(base, -1, modulus)
+            fingerprint = detector.fingerprint
+            weight = pow(base, self.head_position, modulus)
+        self.loop = None
+        
+        while True:
+            if halting[state]:
+                status = RunResult.HALTED
+                break
+            if limit is not None and steps >= limit:
+                status = RunResult.BUDGET
+                break
+            if deadline is not None and not steps & 0xFFF and time.monotonic() > deadline:
+                status = RunResult.BUDGET
+                break
+            i = cells[pos] * n_states + state
+            next_state = next_states[i]
+            if next_state < 0:
+                print("-------- Rejected --------")
+                status = RunResult.REJECTED
+                break
+            write = writes[i]
+            move = moves[i]
+            if detector is not None and write != cells[pos]:
+                fingerprint = (fingerprint + (write - cells[pos]) * weight) % modulus
+            cells[pos] = write
+            pos += move
+            if pos < 0 or pos == size:
+                cells, window_origin = tape.window(pos - origin)
+                pos += window_origin - origin
+                origin = window_origin
+                size = len(cells)
+            state = next_state
+            steps += 1
+            if detector is not None:
+                weight = weight * (base if move > 0 else inverse) % modulus
+                if detector.observe(steps, state, pos - origin, fingerprint, tape):
+                    self.loop = detector.loop
+                    status = RunResult.LOOPED
+                    break
+        
+        self.head_position = pos - origin
+        self.state_code = state
+        self.current_state = program.states[state]
+        self.steps = steps
+        return status
+    
+    def _execute_profiled(self, profile, max_steps=None, deadline=None):
+        """Same as _execute_checked() without cycle detection, counting the hits of every transition
+        and the head excursion into profile. Returns the RunResult status."""
+        program = self.program
+        next_states, writes, moves, halting = program.next_state, program.write, program.move, program.halting
+        n_states = program.n_states
+        tape = self.tape
+        hits = profile.hits
+        
+        cells, origin = tape.window(self.head_position)
+        size = len(cells)
+        pos = self.head_position + origin
+        low = high = pos
+        state = self.state_code
+        steps = start = self.steps
+        limit = None if max_steps is None else steps + max_steps
+        
+        while True:
+            if halting[state]:
+                status = RunResult.HALTED
+                break
+            if limit is not None and steps >= limit:
+                status = RunResult.BUDGET
+                break
+            if deadline is not None and not steps & 0xFFF and time.monotonic() > deadline:
+                status = RunResult.BUDGET
+                break
+            i = cells[pos] * n_states + state
+            next_state = next_states[i]
+            if next_state < 0:
+                print("-------- Rejected --------")
+                status = RunResult.REJECTED
+                break
+            hits[i] += 1
+            cells[pos] = writes[i]
+            pos += moves[i]
+            if pos < low:
+                low = pos
+            elif pos > high:
+                high = pos
+            if pos < 0 or pos == size:
+                cells, window_origin = tape.window(pos - origin)
+                shift = window_origin - origin
+                pos += shift
+                low += shift
+                high += shift
+                origin = window_origin
+                size = len(cells)
+            state = next_state
+            steps += 1
+        
+        low, high = low - origin, high - origin
+        profile.head_min = low if profile.head_min is None else min(profile.head_min, low)
+        profile.head_max = high if profile.head_max is None else max(profile.head_max, high)
+        profile.steps += steps - start
+        self.head_position = pos - origin
+        self.state_code = state
+        self.current_state = program.states[state]
+        self.steps = steps
+        return status
+    
+    def _execute_traced(self, trace, max_steps=None, deadline=None):
+        """Step the machine and write every step to trace. Returns the RunResult status."""
+        program = self.program
+        next_states, writes, moves, halting = program.next_state, program.write, program.move, program.halting
+        n_states = program.n_states
+        tape = self.tape
+        limit = None if max_steps is None else self.steps + max_steps
+        trace.begin(self)
+        try:
+            while True:
+                if halting[self.state_code]:
+                    return RunResult.HALTED
+                if limit is not None and self.steps >= limit:
+                    return RunResult.BUDGET
+                if deadline is not None and not self.steps & 0xFFF and time.monotonic() > deadline:
+                    return RunResult.BUDGET
+                if trace.sampled():
+                    trace.write(trace.configuration(self))
+                i = tape[self.head_position] * n_states + self.state_code
+                next_state = next_states[i]
+                if next_state < 0:
+                    # the lines traced so far come first
+                    trace.end(self)
+                    print("-------- Rejected --------")
+                    return RunResult.REJECTED
+                tape[self.head_position] = writes[i]
+                self.head_position += moves[i]
+                self.state_code = next_state
+                self.current_state = program.states[next_state]
+                self.steps += 1
+                trace.delta(next_state, self.head_position, writes[i])
+        finally:
+            trace.end(self)
+    
+    def run_for(self, n_steps, engine=None):
+        """Advance the machine from its current configuration by at most n_steps steps and return a
+        RunResult. The status is BUDGET if the machine can be resumed by calling run_for() again."""
+        if not self.machine_has_program:
+            raise Exception("No program loaded")
+        if engine is not None:
+            status = engine.execute(self, n_steps)
+        else:
+            status = self._execute_checked(n_steps)
+        return RunResult(status, self.steps, self.current_state, self.loop)
+    
+    def snapshots(self, input_string=None, every=1, engine=None):
+        """Generator that advances the machine every steps at a time and yields a Snapshot after
+        each chunk, until the machine halts or no transition applies. Long runs can be interleaved,
+        watched and cancelled (by closing the generator) without threads.
+        If input_string is given the machine is reset to it first."""
+        if input_string is not None:
+            self.reset(input_string)
+        while True:
+            result = self.run_for(every, engine)
+            yield Snapshot(self, result.status)
+            if result.status != RunResult.BUDGET:
+                return
+    
+    def checkpoint(self, path=None):
+        """Return a UNN.Checkpoint.Checkpoint of the current configuration, written to path if given"""
+        checkpoint = Checkpoint.of_machine(self)
+        if path is not None:
+            checkpoint.save(path)
+        return checkpoint
+    
+    def restore(self, checkpoint):
+        """Continue from a Checkpoint (or the path of a saved one) taken from a machine with the same program"""
+        if not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint.load(checkpoint)
+        return checkpoint.restore_machine(self)
+    
+    def fork(self, checkpoint=None):
+        """Return an independent machine sharing the compiled program, continued from checkpoint
+        (default: the current configuration)"""
+        if checkpoint is None:
+            checkpoint = self.checkpoint()
+        elif not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint.load(checkpoint)
+        return checkpoint.fork(self)
+    
+    def run_checkpointed(self, path, every, max_steps=None, engine=None):
+        """Advance the machine every steps at a time and save a checkpoint to path after each chunk,
+        until it halts, no transition applies or max_steps more steps were made. A killed run is
+        resumed with restore(path). Returns the RunResult of the last chunk."""
+        limit = None if max_steps is None else self.steps + max_steps
+        while True:
+            n_steps = every if limit is None else min(every, limit - self.steps)
+            result = self.run_for(n_steps, engine)
+            self.checkpoint(path)
+            if result.status != RunResult.BUDGET or (limit is not None and self.steps >= limit):
+                return result
+    
+    def get_tape(self, left=None, right=None):
+        """Return the tape between the positions left and right decoded to the machine's symbols (list).
+        By default the whole allocated tape is returned."""
+        return self.program.decode(self.tape.to_list(left, right))
 
     def print_tape(self):
-        tape_str = ''.join(self.tape).strip(self.blank_symbol)
+        tape_str = ''.join(self.get_tape()).strip(self.blank_symbol)
         print(f"{tape_str} {self.current_state}")
 
-    def run(self, input_string=None):
+    def print_decoded_tape(self):
+        if self.machine_binarized and isinstance(self.tape, BitTape):
+            # the configuration knows the block encoding and reads the fields from the bits
+            decoded = self.config.decode_binarized_tape(self.tape, self.head_position)
+            print(''.join(decoded).replace('_',''))
+        elif self.machine_binarized:
+            # hand the decoded tape over to the configuration, which knows the block encoding
+            left, right = self.tape.bounds()
+            self.config.tape = self.get_tape(left, right)
+            self.config.head_position = self.head_position - left
+            decoded = self.config.decode_binarized_tape()
+            print(''.join(decoded).replace('_',''))
+        else:
+            self.print_tape()
+
+    def run(self, input_string=None, engine=None, max_steps=None, max_time=None, detect_cycles=False, profile=False,
+            trace=None):
+        """Run the machine until it halts and return a RunResult (true if the machine halted).
+        Arguments:
+            input_string:   the input, ignored for machines loaded from a configuration
+            engine:         optional execution engine from UNN.Engines (e.g. RunLengthEngine()),
+                            by default the compiled integer loop is used
+            max_steps:      stop with the status BUDGET after this many steps
+            max_time:       stop with the status BUDGET after this many seconds (wall clock)
+            detect_cycles:  stop with the status LOOPED as soon as the run is proven to repeat a
+                            configuration, or to drift in a translated cycle (compiled loop only)
+            profile:        count the hits of every transition, the head excursion, the tape growth
+                            and the time per phase into result.profile (compiled loop only)
+            trace:          UNN.Trace.Trace or DeltaTrace the steps are written to, verbose machines
+                            trace the whole tape to stdout by default"""
         if self.machine_has_program:
             
+            if profile:
+                if engine is not None or self.verbose or detect_cycles or trace is not None:
+                    raise Exception("Profiling is only available for the compiled engine without tracing and cycle detection")
+                profile = Profile(self.program)
+                phase = profile.phase
+            else:
+                profile = None
+                phase = lambda name: nullcontext()
+            
             if not self.machine_from_config:
-                self.reset(input_string)
+                with phase("reset"):
+                    self.reset(input_string)
             
-            while self.current_state not in self.accept_states:
-                if self.verbose:
-                    self.print_tape()
-                    
-                if not self.step():
-                    break
+            deadline = None if max_time is None else time.monotonic() + max_time
+            self.loop = None
+            if detect_cycles and (engine is not None or self.verbose or trace is not None):
+                raise Exception("Cycle detection is only available for the compiled engine without tracing")
+            
+            if profile is not None:
+                profile.span_before = self.tape.span()
+                profile.allocated_before = len(self.tape)
+                with profile.phase("execute"):
+                    status = self._execute_profiled(profile, max_steps, deadline)
+                profile.span_after = self.tape.span()
+                profile.allocated_after = len(self.tape)
+            elif self.verbose or trace is not None:
+                if engine is not None:
+                    raise Exception("Tracing is only available for the compiled engine")
+                status = self._execute_traced(Trace() if trace is None else trace, max_steps, deadline)
+            elif engine is not None:
+                status = engine.execute(self, max_steps, deadline)
+            elif max_steps is not None or deadline is not None or detect_cycles:
+                status = self._execute_checked(max_steps, deadline, detect_cycles)
+            else:
+                status = self._execute()
+            result = RunResult(status, self.steps, self.current_state, self.loop, profile)
             
-            if self.current_state in self.accept_states:
+            if status == RunResult.HALTED:
                 print("-------- Halt! --------")
                 print("-------- Decoded Tape! --------")
-                if self.machine_binarized:
-                    decoded = self.config.decode_binarized_tape()
-                    print(''.join(decoded).replace('_',''))
-                else:
-                    self.print_tape()
-                return True
-            else:
-                return False
+                with phase("output"):
+                    self.print_decoded_tape()
+            elif status == RunResult.BUDGET:
+                print("-------- Out of budget --------")
+            elif status == RunResult.LOOPED:
+                print("-------- Non-halting --------")
+            return result
         
         else:
             raise Exception("The Turing machine cannot create state transitions. You had to load a program. Please use .load_program() method.")
             
             
+            
+            
 #%% Minsky's Small Universal Turing Machine 4 symbols, 7 states
 class Minsky47UniversalTuringMachine(TuringMachine):
-    def __init__(self):
+    """Minsky's small universal Turing machine (TMs/Minsky4Sym7St.txt), it simulates any 2-tag system.
+    The tag letters a_1 ... a_m with a production get the numbers N_1 = 1, N_k+1 = N_k + n_k + 2
+    (n_k: length of the production of a_k), the halting letter gets N = 0.
+    Tape layout, left to right: the productions, a blank cell and the tag word.
+      - a letter of the word with the number N is written as 2^N 3
+      - the production a_k -> b_1 ... b_n is written as 1 1 c(b_n) ... c(b_1) left of the N_k-th 1
+        counted from the right end of the productions, with c(b) = 0 1 0^N(b)
+      - the productions end with a 1 right of the one of a_1
+    The machine starts in Q0 on the first letter of the word. It erases the 2s of the first letter
+    while it moves a pointer over the 1s of the productions, appends the production found there,
+    deletes the second letter and starts over. Reading the halting letter makes it stop in H.
+    The word must not become shorter than two letters before the halting letter is read."""
+    def __init__(self, verbose=False):
         
-        super().__init__(states=['Q0', 'Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q6'],
+        super().__init__(states=['Q0', 'Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q6', 'H'],
                          alphabet=['0', '1', '2', '3'], 
-                         tape_alphabet=['0', '1', 'b', 'c'], 
-                         start_state='Q1', 
-                         accept_states='Q1', 
-                         blank_symbol='0')
-        
-        N1 = 1
-        # Nk+1 = Nk + mk + 1 
+                         tape_alphabet=['0', '1', '2', '3'], 
+                         start_state='Q0', 
+                         accept_states=['H'], 
+                         blank_symbol='0',
+                         verbose=verbose)
         
+        self.tag_system = None
         self.load_program('TMs/Minsky4Sym7St.txt')
         
     def load_two_tag_system(self, system):
-        pass
+        """Encode the productions of a TwoTagSystem, the letter numbers N_k are computed once here.
+        Arguments:
+            system: a TwoTagSystem with a halting symbol"""
+        rules = system.production_rules
+        halting = system.halting_symbol
+        if halting is None:
+            raise Exception("The universal machine needs a tag system with a halting symbol")
+        letters = [symbol for symbol in rules if symbol != halting]
+        
+        self.letter_number = {halting: 0}
+        number = 1
+        for symbol in letters:
+            self.letter_number[symbol] = number
+            number += len(rules[symbol]) + 2
+        self.number_letter = {n: symbol for symbol, n in self.letter_number.items()}
+        self.letter_pattern = re.compile('|'.join(re.escape(symbol) for symbol in
+                                                  sorted(self.letter_number, key=len, reverse=True)))
+        
+        for symbol in letters:
+            for appended in rules[symbol]:
+                if appended not in self.letter_number:
+                    raise Exception("No production for the tag symbol {}".format(appended))
+        
+        # built from the right end: the 1 of a_1, then every production read from right to left
+        program = ['1']
+        for symbol in letters:
+            for appended in rules[symbol]:
+                program.append('0' * self.letter_number[appended] + '10')
+            program.append('11')
+        codes = self.program.encode(''.join(program)[::-1])
+        self.tag_program = codes
+        self.tag_system = system
+        return codes
+    
+    def encode_tag_word(self, word):
+        """Return the tape symbols (str) of a tag word (sequence of symbols)"""
+        number = self.letter_number
+        try:
+            return ''.join('2' * number[symbol] + '3' for symbol in word)
+        except KeyError as e:
+            raise Exception("No production for the tag symbol {}".format(e.args[0]))
+    
+    def reset(self, input_string):
+        if self.tag_system is None:
+            return super().reset(input_string)
+        if isinstance(input_string, str):
+            input_string = self.letter_pattern.findall(input_string)
+        super().reset(self.encode_tag_word(input_string))
+        # one blank cell between the productions and the word
+        self.tape.load(self.tag_program, -1 - len(self.tag_program))
+    
+    def get_tag_word(self):
+        """Decode the tag word from the tape (list of symbols). The word is complete when the machine
+        halted or before it was started."""
+        if self.tag_system is None:
+            raise Exception("No tag system loaded. Please use .load_two_tag_system() method.")
+        code = self.program.symbol_code
+        _, right = self.tape.span()
+        cells = bytes(self.tape.to_list(0, max(right, 0))).lstrip(bytes([code['0']]))
+        word = []
+        if self.current_state in self.accept_states:
+            # the halting letter (a single 3) was overwritten by a 2 when it was read
+            word.append(self.number_letter[0])
+            cells = cells[1:]
+        number_letter = self.number_letter
+        for piece in cells.split(bytes([code['3']]))[:-1]:
+            word.append(number_letter[len(piece)])
+        return word
+    
+    def print_decoded_tape(self):
+        if self.tag_system is None:
+            return super().print_decoded_tape()
+        print(''.join(self.get_tag_word()))
     
-    def run(self, input_string):
-        pass
-    
\ No newline at end of file
+    def run(self, input_string=None, engine=None, max_steps=None, max_time=None, detect_cycles=False, profile=False,
+            trace=None):
+        """Simulate the loaded tag system on a tag word (string or list of symbols, by default the
+        current word of the system) and return a RunResult. The sweeps over the letters are skipped
+        by a RunLengthEngine unless another engine is given."""
+        if self.tag_system is None:
+            raise Exception("No tag system loaded. Please use .load_two_tag_system() method.")
+        if input_string is None:
+            input_string = self.tag_system.current_word
+        if engine is None and not (self.verbose or detect_cycles or profile or trace is not None):
+            from UNN.Engines import RunLengthEngine     # UNN.Engines imports this module
+            engine = RunLengthEngine()
+        return super().run(input_string, engine, max_steps, max_time, detect_cycles, profile, trace)
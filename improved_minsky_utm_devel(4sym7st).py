@@ -28,4 +28,15 @@ from UNN.Turing import Minsky47UniversalTuringMachine
 utm = Minsky47UniversalTuringMachine()
 
 compiled_machine = TwoTagSystem().from_turing_machine('TMs/toggle_bit_TM.txt')
-compiled_machine.run()
\ No newline at end of file
+compiled_machine.run()
+
+#%% a small tag system run directly and on the universal machine
+tag = TwoTagSystem(alphabet=['a', 'b', 'c', 'H'],
+                   production=["a -> bH", "b -> ca", "c -> acb", "H -> *"])
+direct = tag.forward('aabc')
+print("direct:", direct)
+
+utm.load_two_tag_system(tag)
+result = utm.run('aabc')
+print("UTM steps:", result.steps)
+print("same word:", ''.join(utm.get_tag_word()) == direct)
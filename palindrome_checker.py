@@ -19,4 +19,21 @@ accept_states = ['q8']
 tm = TuringMachine(states, alphabet, tape_alphabet, start_state, accept_states, verbose=True)
 tm.load_program('Programs/palindrome_checker.txt')
 
-tm.run(input_string)
\ No newline at end of file
+tm.run(input_string)
+
+#%% Trace only a window around the head, every 10th step, into an in-memory ring
+import os, tempfile
+from UNN.Trace import Trace, DeltaTrace, RingSink, replay
+
+tm.verbose = False
+ring = RingSink(capacity=5)
+tm.run(input_string * 4, trace=Trace(ring, window=4, every=10))
+print("\n".join(ring.lines()))
+
+#%% Binary delta trace, the tapes are rebuilt offline
+path = os.path.join(tempfile.gettempdir(), 'palindrome_trace.bin')
+trace = DeltaTrace(path)
+tm.run(input_string, trace=trace)
+trace.close()
+for step, state, head, tape in replay(path, every=7):
+    print(step, state, head, tape)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:40:19 2026
+
+@author: gelenag
+
+Example: Hofstadter's MIU system as a Post canonical system, which words are derivable from MI
+"""
+
+from UNN.Post import PostCanonicalSystem
+from UNN.Derivation import DerivationSearch
+
+miu = PostCanonicalSystem(alphabet=['M', 'I', 'U'],
+                          production=["($1)I -> ($1)IU",
+                                      "M($1) -> M($1)($1)",
+                                      "($1)III($2) -> ($1)U($2)",
+                                      "($1)UU($2) -> ($1)($2)"])
+
+search = DerivationSearch(miu, max_length=12)
+depth = search.search('MI', target='MUIIU', max_steps=8)
+print("MUIIU derived in {} steps:".format(depth))
+print(" -> ".join(search.derivation('MUIIU')))
+print(search.stats())
+
+#%% MU is not derivable (the number of I's is never a multiple of 3), the search only runs out
+search = DerivationSearch(miu, max_length=12, processes=2)
+print("MU found:", search.search('MI', target='MU', max_steps=10))
+print(search.stats())
+
+#%% Best-first: expand the words with the length closest to the target first
+search = DerivationSearch(miu, max_length=16, bloom_bits=1 << 20)
+depth = search.search('MI', target='MIIIIIIIIU', heuristic=lambda word: abs(len(word) - 10))
+print("MIIIIIIIIU derived in {} steps".format(depth))
+print(search.stats())
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:02:41 2026
+
+@author: gelenag
+
+Shared fixtures of the tests: the example machines are looked up next to the package
+"""
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def root():
+    return ROOT
+
+
+@pytest.fixture
+def abc_machine(tmp_path):
+    """Machine over a b c that rotates every letter of its input and returns to the first cell"""
+    path = tmp_path / "abc.txt"
+    path.write_text("#states: q0 q1 H\n"
+                    "#symbols: a b c _\n"
+                    "#initial_state: q0\n"
+                    "#accept_states: H\n"
+                    "#initial_tape: abcab\n"
+                    "\n"
+                    "#transition_table:\n"
+                    "q0 a q0 b R\n"
+                    "q0 b q0 c R\n"
+                    "q0 c q0 a R\n"
+                    "q0 _ q1 _ L\n"
+                    "q1 a q1 a L\n"
+                    "q1 b q1 b L\n"
+                    "q1 c q1 c L\n"
+                    "q1 _ H _ R\n")
+    return path
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:20:13 2026
+
+@author: gelenag
+
+Batch runner: the results of the worker processes are the results of single runs, in job order
+"""
+import json
+import pytest
+from UNN.Batch import BatchRunner, main
+from UNN.Turing import TuringMachine
+
+
+def _jobs(root):
+    palindrome = {"machine": str(root / 'Programs/palindrome_checker.txt'), "start_state": 'q0', "accept_states": ['q8']}
+    words = ['abba', 'ab', '', 'abaaba', 'bbbaabbb', 'abab']
+    jobs = [dict(palindrome, input=word, id=i) for i, word in enumerate(words)]
+    jobs.append({"machine": str(root / 'TMs/binary_addition.txt')})
+    jobs.append(dict(palindrome, input='ab' * 20, max_steps=10))
+    return jobs
+
+
+def _single(job):
+    tm = TuringMachine(start_state=job["start_state"], accept_states=job["accept_states"])
+    tm.load_program(job["machine"])
+    tm.reset(job["input"])
+    result = tm.run_for(job.get("max_steps", 10 ** 8))
+    return result.status, tm.steps, tm.current_state, tm.head_position
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_runner_matches_single_runs(root, processes):
+    jobs = _jobs(root)
+    results = list(BatchRunner(processes, chunk_size=3).run(jobs))
+    assert [result["job"] for result in results] == list(range(len(jobs)))
+    for job, result in zip(jobs, results):
+        assert result.get("id") == job.get("id")
+        if "start_state" in job:
+            assert (result["status"], result["steps"], result["state"], result["head"]) == _single(job)
+    # the header format runs on its initial tape
+    assert results[6]["status"] == 'halted' and results[6]["input"] == '1101_101'
+    assert results[7]["status"] == 'budget' and results[7]["steps"] == 10
+
+
+def test_runner_compiles_every_machine_once(root):
+    runner = BatchRunner(1)
+    list(runner.run(_jobs(root)))
+    assert len(runner.machines) == 2
+
+
+def test_command_line(root, tmp_path):
+    jobs = tmp_path / "jobs.jsonl"
+    jobs.write_text("\n".join(json.dumps(job) for job in _jobs(root)) + "\n")
+    output = tmp_path / "results.jsonl"
+    main([str(jobs), "-o", str(output), "-p", "1", "--max-steps", "1000"])
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(results) == len(_jobs(root))
+    assert results[0]["status"] == 'halted' and results[1]["status"] == 'rejected'
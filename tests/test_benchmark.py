@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:41:55 2026
+
+@author: gelenag
+
+Benchmark suite: the engines of a case make the same steps and compare() reports regressions
+"""
+import json
+import pytest
+from UNN.Benchmark import run_suite, compare, main
+
+
+@pytest.mark.parametrize("case", ["tm-palindrome", "tag-direct"])
+def test_engines_of_a_case_make_the_same_steps(case):
+    results = run_suite(repeat=1, memory=False, select=case)["results"]
+    assert len(results) > 1 and all(result["case"] == case for result in results)
+    for size in set(result["size"] for result in results):
+        assert len(set(result["steps"] for result in results if result["size"] == size)) == 1
+
+
+def _result(**changes):
+    result = {"case": "tm", "engine": "compiled", "size": 10, "steps": 100, "compile_time": 0.1,
+              "run_time": 1.0, "steps_per_sec": 100.0, "peak_memory": 1000}
+    result.update(changes)
+    return {"results": [result]}
+
+
+def test_compare():
+    baseline = _result()
+    assert compare(baseline, _result(steps_per_sec=95.0)) == []
+    assert compare(baseline, _result(case="other", steps_per_sec=1.0)) == []
+    assert len(compare(baseline, _result(steps_per_sec=80.0))) == 1
+    assert len(compare(baseline, _result(steps=99))) == 1
+    assert len(compare(baseline, _result(peak_memory=2000, compile_time=0.5))) == 2
+    assert compare(baseline, _result(steps_per_sec=80.0), threshold=0.3) == []
+
+
+def test_save_and_compare(tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+    main(["--case", "minsky", "--repeat", "1", "--no-memory", "--save", str(path)])
+    assert json.loads(path.read_text())["results"][0]["case"] == "minsky-utm"
+    baseline = json.loads(path.read_text())
+    baseline["results"][0]["steps"] += 1
+    path.write_text(json.dumps(baseline))
+    with pytest.raises(SystemExit):
+        main(["--case", "minsky", "--repeat", "1", "--no-memory", "--compare", str(path), "--threshold", "100"])
+    assert "REGRESSION" in capsys.readouterr().out
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:05:13 2026
+
+@author: gelenag
+
+Binarized machines on the bit-packed tape
+"""
+import copy
+from UNN.Tape import BitTape
+from UNN.Turing import TuringMachineConfiguration, TuringMachine, RunResult
+
+
+def test_binarized_machine_over_letters(abc_machine, capsys):
+    config = TuringMachineConfiguration.load(str(abc_machine))
+    tm = TuringMachine()
+    tm.load_configuration(config.convert_to_binary())
+    assert tm.program.symbols == ['0', '1']
+    assert isinstance(tm.tape, BitTape)
+    assert tm.run().status == RunResult.HALTED
+    assert capsys.readouterr().out.splitlines()[-1] == "bcabc"
+
+
+def test_binarized_matches_original(root, capsys):
+    config = TuringMachineConfiguration.load(str(root / 'TMs/binary_addition.txt'))
+    original = TuringMachine()
+    original.load_configuration(config)
+    original.run()
+    expected = capsys.readouterr().out.splitlines()[-1]
+    binary = TuringMachine()
+    binary.load_configuration(config.convert_to_binary())
+    binary.run()
+    assert capsys.readouterr().out.splitlines()[-1] == expected.split()[0] == "10010"
+
+
+def test_bit_tape_matches_decoded_list(abc_machine):
+    config = TuringMachineConfiguration.load(str(abc_machine))
+    binary = config.convert_to_binary()
+    tm = TuringMachine()
+    tm.load_configuration(binary)
+    tm._execute()
+    left, right = tm.tape.span()
+    binary.tape = tm.get_tape(left, right)
+    binary.head_position = tm.head_position - left
+    from_list = binary.decode_binarized_tape()
+    from_bits = binary.decode_binarized_tape(tm.tape, tm.head_position)
+    assert ''.join(from_list).strip('_') == ''.join(from_bits).strip('_') == "bcabc"
+
+
+def test_convert_to_binary_leaves_the_configuration(root):
+    config = TuringMachineConfiguration.load(str(root / 'TMs/binary_addition.txt'))
+    before = copy.deepcopy((config.transitions, config.tape, config.head_position, config.states, config.alphabet))
+    first = config.convert_to_binary()
+    second = config.convert_to_binary()
+    assert (config.transitions, config.tape, config.head_position, config.states, config.alphabet) == before
+    assert first is not config and first.binary_transitions == second.binary_transitions
+    assert all(read in ('0', '1') and write in ('0', '1') for _, read, _, write, _ in first.binary_transitions)
+    assert len(first.transitions) == len(first.binary_transitions)
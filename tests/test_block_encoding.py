@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:10:44 2026
+
+@author: gelenag
+
+Block encoding: symbols survive the round trip through fixed-width binary blocks
+"""
+import random
+import numpy as np
+import pytest
+from UNN.BlockEncoding import (symbol_codes, encode_blocks, block_values, decode_blocks, bits_from_string,
+                               bits_to_string, bits_to_int)
+
+
+def _naive_encode(symbols, alphabet, bit_depth):
+    return ''.join(format(alphabet.index(symbol), '0{}b'.format(bit_depth)) for symbol in symbols)
+
+
+@pytest.mark.parametrize("alphabet, bit_depth", [(['_', 'a', 'b', 'c'], 2), (['_', '1', '0'], 3),
+                                                  (['_', 'ab', 'c'], 2), ([str(i) for i in range(300)], 9)])
+def test_round_trip(alphabet, bit_depth):
+    symbols = [random.Random(bit_depth).choice(alphabet) for _ in range(500)]
+    bits = encode_blocks(symbols, alphabet, bit_depth)
+    assert bits_to_string(bits) == _naive_encode(symbols, alphabet, bit_depth)
+    assert decode_blocks(bits, alphabet, bit_depth) == symbols
+    assert block_values(bits, bit_depth).tolist() == [alphabet.index(symbol) for symbol in symbols]
+
+
+def test_symbol_codes_of_strings():
+    assert symbol_codes('abca', ['_', 'a', 'b', 'c']).tolist() == [1, 2, 3, 1]
+    assert symbol_codes('', ['_', 'a']).tolist() == []
+    with pytest.raises(Exception, match="'x' is not in the alphabet"):
+        symbol_codes('abx', ['_', 'a', 'b'])
+
+
+def test_decode_with_offset_and_padding():
+    # one blank bit in front aligns the blocks, the last block is padded with blanks
+    assert decode_blocks('1101', ['_', 'a', 'b', 'c'], 2, offset=1) == ['a', 'b', 'b']
+    with pytest.raises(Exception, match="no symbol"):
+        decode_blocks('11', ['_', 'a', 'b'], 2)
+
+
+def test_bit_strings():
+    bits = bits_from_string('0110')
+    assert bits.dtype == np.uint8 and bits.tolist() == [0, 1, 1, 0]
+    assert bits_to_string(bits) == '0110'
+    assert bits_to_int(bits_from_string('011')) == 6
+    assert bits_to_int(bits_from_string('1' * 70)) == 2 ** 70 - 1
+    with pytest.raises(Exception, match="Only '0' and '1'"):
+        bits_from_string('012')
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:05:47 2026
+
+@author: gelenag
+
+Step and time budgets, cycle detection and the resumable run_for() / snapshots() API
+"""
+import pytest
+from UNN.Turing import TuringMachine, RunResult
+
+# writes an a and swings back and forth over it forever
+STILL = "q0 _ q1 a R\nq1 _ q0 _ L\nq0 a q1 a R\n"
+# walks right forever writing a b a b ...
+DRIFT = "q0 _ q1 a R\nq1 _ q0 b R\n"
+
+
+def _looping(tmp_path, program):
+    path = tmp_path / "loop.txt"
+    path.write_text(program)
+    tm = TuringMachine(start_state='q0', accept_states=['H'])
+    tm.load_program(str(path))
+    return tm
+
+
+def _palindrome(root):
+    tm = TuringMachine(start_state='q0', accept_states=['q8'])
+    tm.load_program(str(root / 'Programs/palindrome_checker.txt'))
+    return tm
+
+
+@pytest.mark.parametrize("program, kind", [(STILL, "cycle"), (DRIFT, "translated")])
+def test_cycle_detection(tmp_path, program, kind):
+    result = _looping(tmp_path, program).run('', detect_cycles=True)
+    assert result.status == RunResult.LOOPED and not result
+    assert result.loop["kind"] == kind
+
+
+@pytest.mark.parametrize("program", [STILL, DRIFT])
+def test_budgets_stop_looping_machines(tmp_path, program):
+    tm = _looping(tmp_path, program)
+    result = tm.run('', max_steps=1000)
+    assert result.status == RunResult.BUDGET and result.steps == 1000
+    assert tm.run('', max_time=0.01).status == RunResult.BUDGET
+
+
+def test_checks_do_not_change_halting_runs(root):
+    plain = _palindrome(root).run('abbaabba')
+    for options in ({"detect_cycles": True}, {"max_steps": 10 ** 6}, {"max_time": 60}):
+        assert repr(_palindrome(root).run('abbaabba', **options)) == repr(plain)
+
+def test_run_for_resumes(root):
+    reference = _palindrome(root)
+    reference.reset('abbaabbaabba')
+    expected = repr(reference.run_for(10 ** 6))
+    tm = _palindrome(root)
+    tm.reset('abbaabbaabba')
+    results = []
+    while not results or results[-1].status == RunResult.BUDGET:
+        results.append(tm.run_for(7))
+    assert all(result.steps % 7 == 0 for result in results[:-1])
+    assert repr(results[-1]) == expected
+
+
+def test_snapshots(root):
+    tm = _palindrome(root)
+    snapshots = list(tm.snapshots('abbaabba', every=10))
+    assert [snapshot.status for snapshot in snapshots[:-1]] == [RunResult.BUDGET] * (len(snapshots) - 1)
+    assert snapshots[-1].status == RunResult.HALTED
+    assert snapshots[-1].steps == tm.steps
+    assert snapshots[-1].tape() == ''.join(tm.get_tape(*tm.tape.span()))
+    with pytest.raises(Exception, match="advanced"):
+        snapshots[0].tape()
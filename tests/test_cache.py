@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:31:20 2026
+
+@author: gelenag
+
+Compile cache: a hit gives the same machine as a miss without compiling again
+"""
+import pickle
+from UNN.Cache import CompileCache
+from UNN.Turing import TuringMachineConfiguration, TuringMachine, CompiledProgram
+
+
+def _tables(program):
+    return program.states, program.symbols, program.next_state, program.write, program.move, program.halting
+
+
+def test_program_pickle_round_trip(root):
+    tm = TuringMachine(start_state='q0', accept_states=['q8'])
+    tm.load_program(str(root / 'Programs/palindrome_checker.txt'))
+    restored = pickle.loads(pickle.dumps(tm.program))
+    assert restored._transitions is None
+    assert _tables(restored) == _tables(tm.program)
+    assert restored.transitions == tm.program.transitions
+
+
+def test_program_hit_matches_miss(root, tmp_path):
+    cache = CompileCache(tmp_path)
+    results = []
+    for _ in range(2):
+        tm = TuringMachine(start_state='q0', accept_states=['q8'])
+        tm.load_program(str(root / 'Programs/palindrome_checker.txt'), cache=cache)
+        tm.reset('abbaabba')
+        results.append((repr(tm.run_for(10000)), ''.join(tm.get_tape(*tm.tape.span()))))
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert results[0] == results[1]
+    assert results[0][0].startswith("RunResult(status='halted'")
+
+
+def test_binarized_hit_builds_no_names(root, tmp_path):
+    cache = CompileCache(tmp_path)
+    config = TuringMachineConfiguration.load(str(root / 'TMs/binary_addition.txt'))
+    cold = TuringMachine()
+    cold.load_configuration(config.convert_to_binary())
+    cold_result = repr(cold.run_for(100000))
+
+    config.convert_to_binary(cache)
+    TuringMachine().load_configuration(config.convert_to_binary(cache), cache)
+    binary = config.convert_to_binary(cache)
+    warm = TuringMachine()
+    warm.load_configuration(binary, cache)
+    # neither the binary transitions nor the state names were rebuilt
+    assert binary._binary_transitions is None and binary._states is None and binary._state_names is None
+    assert warm.program._transitions is None
+    assert repr(warm.run_for(100000)) == cold_result
+    assert ''.join(warm.get_tape(*warm.tape.span())) == ''.join(cold.get_tape(*cold.tape.span()))
+
+
+def test_binary_transitions_unpack(root):
+    binary = TuringMachineConfiguration.load(str(root / 'TMs/binary_addition.txt')).convert_to_binary()
+    restored = pickle.loads(pickle.dumps(binary))
+    assert restored.binary_transitions == binary.binary_transitions
+    assert isinstance(CompiledProgram(restored.transitions, '0', restored.start_state, restored.accept_states),
+                      CompiledProgram)
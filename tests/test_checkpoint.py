@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:20:34 2026
+
+@author: gelenag
+
+Checkpoints: a restored or forked run ends where the uninterrupted run ends
+"""
+import pytest
+from UNN.Checkpoint import Checkpoint
+from UNN.Turing import TuringMachine
+from UNN.Post import TwoTagSystem
+
+PRODUCTIONS = ['a->ccbaH', 'b->cca', 'c->cc', 'H->ca*']
+
+
+def _machine(root):
+    tm = TuringMachine(start_state='q0', accept_states=['q8'])
+    tm.load_program(str(root / 'Programs/palindrome_checker.txt'))
+    tm.reset('abbaabbaabba' * 3)
+    return tm
+
+
+def _configuration(tm):
+    return tm.current_state, tm.head_position, tm.steps, ''.join(tm.get_tape(*tm.tape.span()))
+
+
+def test_machine_restore_matches_uninterrupted_run(root, tmp_path):
+    reference = _machine(root)
+    reference.run_for(10 ** 6)
+    tm = _machine(root)
+    tm.run_for(100)
+    path = tmp_path / "run.ckpt"
+    tm.checkpoint(path)
+    restored = _machine(root)
+    restored.restore(path)
+    assert restored.steps == 100
+    restored.run_for(10 ** 6)
+    assert _configuration(restored) == _configuration(reference)
+
+
+def test_machine_fork_leaves_the_original(root):
+    tm = _machine(root)
+    tm.run_for(50)
+    before = _configuration(tm)
+    fork = tm.fork()
+    fork.run_for(10 ** 6)
+    assert _configuration(tm) == before
+    tm.run_for(10 ** 6)
+    assert _configuration(fork) == _configuration(tm)
+
+
+def test_machine_run_checkpointed(root, tmp_path):
+    reference = _machine(root)
+    expected = repr(reference.run_for(10 ** 6))
+    tm = _machine(root)
+    path = tmp_path / "run.ckpt"
+    assert repr(tm.run_checkpointed(path, every=64)) == expected
+    assert Checkpoint.load(path).steps == reference.steps
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("options", [{}, {"vectorized": True}, {"run_length": True}])
+def test_tag_restore_matches_uninterrupted_run(tmp_path, options):
+    reference = TwoTagSystem(['a', 'b', 'c', 'H'], PRODUCTIONS, **options)
+    reference.load_word('bcabca')
+    reference.run_for(1000)
+    system = TwoTagSystem(['a', 'b', 'c', 'H'], PRODUCTIONS, **options)
+    system.load_word('bcabca')
+    system.run_for(3)
+    path = tmp_path / "tag.ckpt"
+    system.checkpoint(path)
+    restored = TwoTagSystem(['a', 'b', 'c', 'H'], PRODUCTIONS, **options).restore(path)
+    restored.run_for(1000)
+    assert restored.current_word == reference.current_word
+    assert restored.steps == reference.steps
+
+
+def test_checkpoint_kind_is_checked(root):
+    checkpoint = _machine(root).checkpoint()
+    with pytest.raises(Exception, match="turing run"):
+        checkpoint.restore_tag_system(TwoTagSystem(['a', 'b', 'c', 'H'], PRODUCTIONS))
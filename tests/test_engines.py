@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:12:55 2026
+
+@author: gelenag
+
+Execution engines: every engine ends in the configuration of the reference stepper
+"""
+import random
+import pytest
+from UNN.Turing import TuringMachine
+from UNN.Engines import RunLengthEngine, MacroEngine
+from UNN.Batch import BatchTuringMachine
+
+PALINDROME = ('Programs/palindrome_checker.txt', {"start_state": 'q0', "accept_states": ['q8']})
+ADDITION = ('Programs/binary_addition.txt', {"start_state": 'q0', "accept_states": ['H']})
+
+
+def _words():
+    rng = random.Random(1)
+    half = ''.join(rng.choice('ab') for _ in range(100))
+    return [(PALINDROME, ''), (PALINDROME, 'a'), (PALINDROME, 'abba'), (PALINDROME, 'abab'),
+            (PALINDROME, half + half[::-1]), (PALINDROME, half + 'b' + half[::-1] + 'a'),
+            (ADDITION, '1101_101'), (ADDITION, '1' * 12 + '_' + '1' * 9), (ADDITION, '0_0')]
+
+
+def _machine(root, program, word):
+    path, options = program
+    tm = TuringMachine(**options)
+    tm.load_program(str(root / path))
+    tm.reset(word)
+    return tm
+
+
+def _configuration(tm):
+    return tm.steps, tm.current_state, tm.head_position, ''.join(tm.get_tape(*tm.tape.span()))
+
+
+def _reference(root, program, word):
+    # one step() at a time, the slowest and simplest execution
+    tm = _machine(root, program, word)
+    while not tm.program.halting[tm.state_code] and tm.step():
+        pass
+    return _configuration(tm)
+
+
+def _run(root, program, word, engine=None):
+    tm = _machine(root, program, word)
+    tm.run_for(10 ** 8, engine)
+    return _configuration(tm)
+
+
+@pytest.mark.parametrize("program, word", _words())
+def test_compiled_loop_matches_reference(root, program, word):
+    assert _run(root, program, word) == _reference(root, program, word)
+
+
+@pytest.mark.parametrize("program, word", _words())
+def test_run_length_engine_matches_reference(root, program, word):
+    assert _run(root, program, word, RunLengthEngine()) == _reference(root, program, word)
+
+
+def test_run_length_engine_sweeps(root):
+    engine = RunLengthEngine()
+    program, word = ADDITION, '1' * 500 + '_' + '1' * 3
+    assert _run(root, program, word, engine) == _reference(root, program, word)
+    assert engine.sweeps > 0 and engine.swept_steps > engine.sweeps
+
+
+def test_run_length_engine_resumes(root):
+    program, word = _words()[4]
+    tm = _machine(root, program, word)
+    while tm.run_for(37, RunLengthEngine()).status == 'budget':
+        pass
+    assert _configuration(tm) == _reference(root, program, word)
+
+
+@pytest.mark.parametrize("program, word", _words())
+@pytest.mark.parametrize("block_size", [1, 3, 8])
+def test_macro_engine_matches_reference(root, program, word, block_size):
+    assert _run(root, program, word, MacroEngine(block_size)) == _reference(root, program, word)
+
+
+@pytest.mark.parametrize("max_blocks", [2, 8, None])
+def test_macro_engine_bounded_blocks(root, max_blocks):
+    program, word = _words()[4]
+    engine = MacroEngine(block_size=8, cache_size=256, max_blocks=max_blocks)
+    assert _run(root, program, word, engine) == _reference(root, program, word)
+    stats = engine.stats()
+    if max_blocks == 2:
+        assert stats["compactions"] > 0
+    assert stats["blocks"] <= max(engine.max_blocks, 2 * len(word) // 8 + 2)
+
+
+def test_macro_engine_reset_cache_clears_blocks(root):
+    program, word = _words()[4]
+    engine = MacroEngine(block_size=8)
+    _run(root, program, word, engine)
+    assert engine.stats()["blocks"] > 0
+    engine.reset_cache()
+    assert engine.stats()["blocks"] == 0 and engine.stats()["cached"] == 0
+    assert _run(root, program, word, engine) == _reference(root, program, word)
+
+
+@pytest.mark.parametrize("program", [PALINDROME, ADDITION])
+@pytest.mark.parametrize("max_steps", [None, 5, 40])
+def test_batch_matches_single_runs(root, program, max_steps):
+    words = [word for p, word in _words() if p is program]
+    batch = BatchTuringMachine(_machine(root, program, '')).run(words, max_steps)
+    for word, result in zip(words, batch):
+        tm = _machine(root, program, word)
+        status = tm.run_for(10 ** 8 if max_steps is None else max_steps).status
+        steps, state, head, tape = _configuration(tm)
+        assert result == {"input": word, "status": status, "steps": steps, "state": state, "head": head,
+                          "tape": tape.strip('_')}
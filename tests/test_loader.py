@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:52:06 2026
+
+@author: gelenag
+
+Validating loader of the text formats and the binary machine format
+"""
+import pytest
+from UNN.Loader import read_machine, read_configuration, is_binary
+from UNN.Turing import TuringMachine
+
+
+def test_bad_direction_is_rejected(tmp_path):
+    path = tmp_path / "bad.txt"
+    path.write_text("q0 a q1 b R\nq0 b q1 a X\n")
+    with pytest.raises(Exception, match=r"bad\.txt:2: unknown direction 'X'"):
+        read_machine(path)
+
+
+def test_malformed_line_is_rejected(tmp_path):
+    path = tmp_path / "short.txt"
+    path.write_text("q0 a q1 b\n")
+    with pytest.raises(Exception, match=r"short\.txt:1: expected"):
+        read_machine(path)
+
+
+def test_directions_are_stripped(root):
+    _, transitions = read_machine(root / 'Programs/toggle_bits.txt')
+    assert transitions[('q0', '0')] == ('q0', '1', 'R')
+    assert transitions[('q0', '_')] == ('q1', '0', '*')
+
+
+def test_header_format(root):
+    states, symbols, start, accept, tape, rows = read_configuration(root / 'TMs/binary_addition.txt')
+    assert start == 'q0' and accept == ['H'] and tape == '1101_101'
+    assert ('q5', '_', 'H', '_', '*') in rows
+
+
+def test_toggle_bits_moves_right(root):
+    tm = TuringMachine(start_state='q0', accept_states=['q1'])
+    tm.load_program(str(root / 'Programs/toggle_bits.txt'))
+    tm.reset('110010110')
+    assert tm.run_for(100).status == 'halted'
+    assert ''.join(tm.get_tape(*tm.tape.span())) == '0011010010'
+
+
+def test_binary_format_round_trip(root, tmp_path):
+    tm = TuringMachine(start_state='q0', accept_states=['q8'])
+    tm.load_program(str(root / 'Programs/palindrome_checker.txt'))
+    path = tmp_path / "palindrome.unn"
+    tm.save_program(path)
+    assert is_binary(path)
+    loaded = TuringMachine(start_state='q0', accept_states=['q8'])
+    loaded.load_program(str(path))
+    assert loaded.program.transitions == tm.program.transitions
+    for machine in (tm, loaded):
+        machine.reset('abbaabba')
+    assert repr(tm.run_for(10000)) == repr(loaded.run_for(10000))
+
+
+@pytest.mark.parametrize("start_state", ['q0', 'q1'])
+def test_binary_format_keeps_constructor_states(root, tmp_path, start_state):
+    path = tmp_path / "palindrome.unn"
+    saver = TuringMachine(start_state='q0', accept_states=['q8'])
+    saver.load_program(str(root / 'Programs/palindrome_checker.txt'))
+    saver.save_program(path)
+    results = []
+    for program in (root / 'Programs/palindrome_checker.txt', path):
+        tm = TuringMachine(start_state=start_state, accept_states=['q8'])
+        tm.load_program(str(program))
+        tm.reset('abba')
+        results.append((repr(tm.run_for(1000)), tm.current_state))
+    assert results[0] == results[1]
+
+
+def test_binary_format_unknown_start_state(root, tmp_path):
+    path = tmp_path / "palindrome.unn"
+    saver = TuringMachine(start_state='q0', accept_states=['q8'])
+    saver.load_program(str(root / 'Programs/palindrome_checker.txt'))
+    saver.save_program(path)
+    with pytest.raises(Exception, match="no state"):
+        TuringMachine(start_state='nowhere', accept_states=['q8']).load_program(str(path))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:32:08 2026
+
+@author: gelenag
+
+Post canonical systems: compiled productions, the successors of a word and derivation search
+"""
+import pytest
+from UNN.Post import PostCanonicalSystem
+from UNN.Derivation import DerivationSearch
+
+MIU = ["($1)I -> ($1)IU", "M($1) -> M($1)($1)", "($1)III($2) -> ($1)U($2)", "($1)UU($2) -> ($1)($2)"]
+
+
+@pytest.mark.parametrize("word, expected", [('1P', '111P1'), ('111P1', '11111P1111'), ('11111P1111', '1111111P111111111')])
+def test_unary_squares(word, expected):
+    system = PostCanonicalSystem(['1', 'P'], ["($1)P($2) -> ($1)11P($2)($1)"])
+    assert system.forward(word) == expected
+
+
+def test_productions_are_applied_in_order():
+    system = PostCanonicalSystem(['1', 'P'], ["($1)P($2) -> ($1)11P($2)($1)", "($1)P($2) -> ($1)($2)"])
+    assert system.forward('11111P1111') == '1' * 16
+
+
+def test_repeated_variable_is_a_back_reference():
+    system = PostCanonicalSystem(['a', 'b'], ["($1)b($1) -> ($1)"])
+    assert system.forward('aabaa') == 'aa'
+    # a left side that does not match gives the right side with its variables unfilled
+    assert system.forward('aaba') == '($1)'
+
+
+def test_matches_every_split():
+    system = PostCanonicalSystem(['M', 'I', 'U'], MIU)
+    assert list(system.matches(3, 'MUUUU')) == [('M', 'UU'), ('MU', 'U'), ('MUU', '')]
+    assert list(system.matches(0, 'MIU')) == []
+
+
+def test_successors():
+    system = PostCanonicalSystem(['M', 'I', 'U'], MIU)
+    assert system.successors('MIII') == {'MIIIU', 'MIIIIII', 'MU'}
+    assert system.successors('MUUUU') == {'MUU', 'MUUUUUUUU'}
+
+
+def test_breadth_first_finds_a_shortest_derivation():
+    search = DerivationSearch(PostCanonicalSystem(['M', 'I', 'U'], MIU), max_length=12)
+    assert search.search('MI', target='MUIIU', max_steps=8) == 5
+    derivation = search.derivation('MUIIU')
+    assert derivation[0] == 'MI' and derivation[-1] == 'MUIIU' and len(derivation) == 6
+    system = PostCanonicalSystem(['M', 'I', 'U'], MIU)
+    assert all(after in system.successors(before) for before, after in zip(derivation, derivation[1:]))
+
+
+def test_unreachable_target():
+    search = DerivationSearch(PostCanonicalSystem(['M', 'I', 'U'], MIU), max_length=10)
+    assert search.search('MI', target='MU', max_steps=6) is None
+    stats = search.stats()
+    assert stats["depth"] == 6 and stats["seen"] == stats["generated"] - stats["duplicates"] - stats["too_long"]
+
+
+@pytest.mark.parametrize("options", [{"bloom_bits": 1 << 16}, {"processes": 2, "chunk_size": 4}])
+def test_search_options_find_the_same_depth(options):
+    search = DerivationSearch(PostCanonicalSystem(['M', 'I', 'U'], MIU), max_length=12, **options)
+    assert search.search('MI', target='MUIIU', max_steps=8) == 5
+
+
+def test_best_first():
+    search = DerivationSearch(PostCanonicalSystem(['M', 'I', 'U'], MIU), max_length=16)
+    depth = search.search('MI', target='MIIIIIIIIU', heuristic=lambda word: abs(len(word) - 10))
+    assert depth is not None and len(search.derivation('MIIIIIIIIU')) == depth + 1
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:18:52 2026
+
+@author: gelenag
+
+Profiles: the hit counts add up to the steps of the run
+"""
+import json
+import pytest
+from UNN.Profile import _Profile, TagProfile
+from UNN.Turing import TuringMachine
+from UNN.Post import TagEngine, GenerationTagEngine, RunLengthTagEngine
+
+PRODUCTIONS = {'a': ['c', 'c', 'b', 'a', 'H'], 'b': ['c', 'c', 'a'], 'c': ['c', 'c'], 'H': ['a', 'b']}
+
+
+def test_machine_profile_hits_sum_to_steps(root):
+    tm = TuringMachine(start_state='q0', accept_states=['q8'])
+    tm.load_program(str(root / 'Programs/palindrome_checker.txt'))
+    result = tm.run('abbaabba', profile=True)
+    profile = result.profile
+    assert sum(profile.hits) == profile.steps == tm.steps
+    assert sum(row[-1] for row in profile.rows()) == tm.steps
+    assert len(profile.table(top=2).splitlines()) >= 3
+    assert json.loads(profile.to_json())["steps"] == tm.steps
+
+
+@pytest.mark.parametrize("engine_type", [TagEngine, GenerationTagEngine, RunLengthTagEngine])
+@pytest.mark.parametrize("word", ['bcabca', 'b' + 'ca' * 100])
+def test_tag_profile_hits_sum_to_steps(engine_type, word):
+    reference = TagEngine(PRODUCTIONS, 'H')
+    reference.load(word)
+    reference_profile = TagProfile(reference)
+    reference.run(profile=reference_profile)
+    engine = engine_type(PRODUCTIONS, 'H')
+    engine.load(word)
+    profile = TagProfile(engine)
+    steps = engine.run(profile=profile)
+    assert sum(profile.hits) == profile.steps == steps
+    assert profile.rows() == reference_profile.rows()
+    assert profile.length_min <= profile.length_after <= profile.length_max
+    assert profile.length_after == reference_profile.length_after
+
+
+def test_base_profile_is_abstract():
+    with pytest.raises(TypeError):
+        _Profile()
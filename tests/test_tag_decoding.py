@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:41:16 2026
+
+@author: gelenag
+
+Decoding the word of a tag system compiled from a Turing machine back to the machine's tape
+"""
+import pytest
+from UNN.Post import TwoTagSystem, RunLengthTagEngine
+
+
+def _system(runs):
+    system = TwoTagSystem(run_length=True)
+    system.engine = RunLengthTagEngine({}, None)
+    system.engine.load_runs(runs)
+    return system
+
+
+def test_counts_of_long_patterns_are_not_expanded():
+    system = _system([(('A_q', 'x'), 1), (('a_q', 'x', 'a_r', 'x'), 10 ** 12), (('B_q', 'x'), 1), (('b_q', 'x'), 5)])
+    assert system.get_tm_tape_counts() == (2 * 10 ** 12, 5)
+
+
+def test_counts_check_the_order_of_the_pairs():
+    system = _system([(('A_q', 'x'), 1), (('a_q', 'x', 'b_r', 'x'), 3), (('B_q', 'x'), 1)])
+    with pytest.raises(AssertionError):
+        system.get_tm_tape_counts()
+
+
+def test_run_length_decoding_matches_plain_word(root):
+    tapes = []
+    for options in ({}, {"run_length": True}):
+        system = TwoTagSystem(**options).from_turing_machine(str(root / 'TMs/toggle_bit_TM.txt'))
+        assert system.run_for(10 ** 6).status == 'halted'
+        tapes.append((system.steps, system.get_tm_tape_counts(), system.get_word_as_tm_tape()))
+    assert tapes[0] == tapes[1]
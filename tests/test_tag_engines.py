@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:48:07 2026
+
+@author: gelenag
+
+2-tag engines: the queue, generation and run-length engines can be swapped for each other
+"""
+import random
+import pytest
+from UNN.Post import TagEngine, GenerationTagEngine, RunLengthTagEngine, TwoTagSystem
+
+PRODUCTIONS = {'a': ['c', 'c', 'b', 'a', 'H'], 'b': ['c', 'c', 'a'], 'c': ['c', 'c'], 'H': ['a', 'b']}
+
+
+def _engines(engine_type, word):
+    reference = TagEngine(PRODUCTIONS, 'H')
+    reference.load(word)
+    engine = engine_type(PRODUCTIONS, 'H')
+    engine.load(word)
+    return reference, engine
+
+
+def _naive(word, max_steps):
+    # the definition of a 2-tag step on a list of symbols
+    word = list(word)
+    steps = 0
+    while steps < max_steps and len(word) >= 2 and word[0] != 'H':
+        word = word[2:] + PRODUCTIONS[word[0]]
+        steps += 1
+    return word, steps
+
+
+@pytest.mark.parametrize("word", ['', 'a', 'Hab', 'bcabca', 'abcabcabc', 'cacacacab'])
+def test_queue_engine_matches_definition(word):
+    engine = TagEngine(PRODUCTIONS, 'H')
+    engine.load(word)
+    steps = engine.run(500)
+    assert (engine.get_word(), steps) == _naive(word, 500)
+    assert engine.halted() == (len(engine.word) < 2 or engine.first() == 'H')
+    assert engine.prefix(3) == engine.get_word()[:3]
+
+
+def test_queue_engine_runs_are_the_pairs_of_the_word():
+    engine = TagEngine(PRODUCTIONS, 'H')
+    engine.load('ababcccccab')
+    assert engine.runs() == [(('a', 'b'), 2), (('c', 'c'), 2), (('c', 'a'), 1), (('b',), 1)]
+
+
+def test_two_tag_system_example():
+    system = TwoTagSystem(['a1', 'a2', 'a3'], ["a1 -> a2a1a3", "a2 -> a1", "a3 -> *"])
+    assert system.forward("a2a1a1") == "a3a1"
+    assert system.steps == 3
+
+
+@pytest.mark.parametrize("engine_type", [GenerationTagEngine, RunLengthTagEngine])
+@pytest.mark.parametrize("word", ['Hab', 'ab', 'bcaH', 'H' + 'abc' * 30])
+def test_step_matches_queue_step(engine_type, word):
+    reference, engine = _engines(engine_type, word)
+    for _ in range(40):
+        if reference.length() < 2:
+            break
+        reference.step()
+        engine.step()
+        assert engine.get_word() == reference.get_word()
+        assert engine.steps == reference.steps
+
+
+@pytest.mark.parametrize("engine_type", [GenerationTagEngine, RunLengthTagEngine])
+def test_step_missing_production(engine_type):
+    engine = engine_type(PRODUCTIONS, 'H')
+    engine.load('xa')
+    with pytest.raises(Exception, match="No production"):
+        engine.step()
+
+
+@pytest.mark.parametrize("engine_type", [GenerationTagEngine, RunLengthTagEngine])
+@pytest.mark.parametrize("length", [5, 63, 64, 500])
+def test_run_matches_queue_run(engine_type, length):
+    word = ''.join(random.Random(length).choice('abc') for _ in range(length))
+    reference, engine = _engines(engine_type, word)
+    # finite budgets only, words without 'H' in reach never halt
+    for budget in (1, 7, 100, 1000):
+        assert engine.run(budget) == reference.run(budget)
+        assert engine.get_word() == reference.get_word()
+        assert engine.halted() == reference.halted()
+
+
+@pytest.mark.parametrize("options", [{"vectorized": True}, {"run_length": True}])
+def test_forward_applies_the_first_production(options):
+    # forward() always applies the first production, also on the halting symbol
+    productions = ['a->ccbaH', 'b->cca', 'c->cc', 'H->ca*']
+    reference = TwoTagSystem(['a', 'b', 'c', 'H'], productions)
+    system = TwoTagSystem(['a', 'b', 'c', 'H'], productions, **options)
+    assert system.forward('Habc') == reference.forward('Habc')
+    assert system.steps == reference.steps
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:40:11 2026
+
+@author: gelenag
+
+Tapes: random reads and writes give the cells of a dict of positions, whatever the backend
+"""
+import random
+import pytest
+from UNN.Tape import Tape, PagedTape, BitTape
+from UNN.Turing import TuringMachine
+
+# kind -> (tape factory, number of symbols)
+TAPES = {"tape": (lambda: Tape(0, 'B', 4), 3), "wide": (lambda: Tape(0, 'I', 4), 3),
+         "paged": (lambda: PagedTape(0, page_size=64), 3),
+         "spilled": (lambda: PagedTape(0, page_size=64, max_resident=2), 3),
+         "bits": (lambda: BitTape(0, window_size=16), 2)}
+
+
+def _random_writes(tape, n_symbols, seed, spread=5000):
+    # every other write goes through the window, as the execution loops do
+    rng = random.Random(seed)
+    model = {}
+    for k in range(2000):
+        position = rng.randint(-spread, spread)
+        code = rng.randrange(n_symbols)
+        if k % 2:
+            cells, origin = tape.window(position)
+            cells[position + origin] = code
+        else:
+            tape[position] = code
+        model[position] = code
+    return model
+
+
+def _model_span(model, blank=0):
+    written = [position for position, code in model.items() if code != blank]
+    return (min(written), max(written) + 1) if written else (0, 0)
+
+
+@pytest.mark.parametrize("kind", sorted(TAPES))
+def test_tape_matches_model(kind):
+    factory, n_symbols = TAPES[kind]
+    tape = factory()
+    model = _random_writes(tape, n_symbols, seed=len(kind))
+    left, right = _model_span(model)
+    assert tape.span() == (left, right)
+    assert tape.to_list(left - 3, right + 3) == [model.get(p, 0) for p in range(left - 3, right + 3)]
+    assert list(tape.read(left, right)) == [model.get(p, 0) for p in range(left, right)]
+    assert all(tape[p] == model.get(p, 0) for p in range(left - 3, right + 3))
+
+
+@pytest.mark.parametrize("kind", sorted(TAPES))
+def test_tape_copy_and_span_bytes(kind):
+    factory, n_symbols = TAPES[kind]
+    tape = factory()
+    _random_writes(tape, n_symbols, seed=7, spread=300)
+    copy = tape.copy()
+    copy[0] = 1 - tape[0] if n_symbols == 2 else 2 if tape[0] != 2 else 1
+    assert copy[0] != tape[0]
+    left, raw = tape.span_bytes()
+    if isinstance(tape, Tape):
+        restored = Tape.from_span_bytes(left, raw, tape.blank, tape.typecode)
+    else:
+        # the other tapes hold one byte per cell, as Checkpoint restores them
+        restored = tape.fresh()
+        restored.load(raw, left)
+    assert restored.to_list(*tape.span()) == tape.to_list(*tape.span())
+
+
+@pytest.mark.parametrize("kind", sorted(TAPES))
+def test_tape_window_holds_position(kind):
+    tape = TAPES[kind][0]()
+    for position in (-1000, 3, 1000):
+        cells, origin = tape.window(position)
+        cells[position + origin] = 1
+        assert tape[position] == 1
+
+
+def test_spilled_pages_stay_bounded():
+    tape = PagedTape(0, page_size=64, max_resident=2)
+    model = _random_writes(tape, 3, seed=3)
+    assert len(tape.pages) <= 2 and tape.spilled
+    assert tape.read(-5000, 5001) == bytearray(model.get(p, 0) for p in range(-5000, 5001))
+    tape.close()
+
+
+@pytest.mark.parametrize("max_resident", [None, 2])
+def test_machine_on_paged_tape(root, max_resident):
+    word = ''.join(random.Random(5).choice('ab') for _ in range(300))
+    runs = []
+    for paged in (False, True):
+        tm = TuringMachine(start_state='q0', accept_states=['q8'])
+        tm.load_program(str(root / 'Programs/palindrome_checker.txt'))
+        tm.reset(word + word[::-1])
+        if paged:
+            tm.use_paged_tape(page_size=32, max_resident=max_resident)
+            assert isinstance(tm.tape, PagedTape)
+        runs.append((repr(tm.run_for(10 ** 8)), tm.head_position, ''.join(tm.get_tape(*tm.tape.span()))))
+    assert runs[0] == runs[1]
+
+
+def test_bit_tape_with_blank_one():
+    tape = BitTape(1, window_size=16)
+    model = _random_writes(tape, 2, seed=11, spread=200)
+    left, right = _model_span(model, blank=1)
+    assert tape.span() == (left, right)
+    assert tape.to_list(left - 9, right + 9) == [model.get(p, 1) for p in range(left - 9, right + 9)]
+
+
+def test_bit_tape_fields():
+    tape = BitTape(0, window_size=16)
+    tape.load([0, 1, 1, 1, 0, 0, 1, 0, 1], -2)
+    assert tape.fields(-2, 7, 3).tolist() == [3, 4, 5]
+    with pytest.raises(Exception, match="0 and 1"):
+        tape.load([2])
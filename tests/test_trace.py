@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:03:29 2026
+
+@author: gelenag
+
+Traces: sampled and windowed text lines, and a replayed DeltaTrace ends in the configuration of
+the traced run
+"""
+import pytest
+from UNN.Trace import Trace, DeltaTrace, RingSink, FileSink, replay
+from UNN.Turing import TuringMachine
+from UNN.Post import TwoTagSystem
+
+
+def _palindrome(root):
+    tm = TuringMachine(start_state='q0', accept_states=['q8'])
+    tm.load_program(str(root / 'Programs/palindrome_checker.txt'))
+    return tm
+
+
+def test_sampled_window_trace(root):
+    tm = _palindrome(root)
+    trace = Trace(RingSink(100), window=2, every=4)
+    tm.run('abba', trace=trace)
+    lines = trace.sink.lines()
+    assert [int(line.split()[0]) for line in lines] == list(range(0, tm.steps, 4))
+    assert lines[0] == '0 __[a]bb q0'
+
+
+def test_ring_sink_keeps_the_last_lines(root, tmp_path):
+    tm = _palindrome(root)
+    full = FileSink(tmp_path / "trace.txt")
+    tm.run('abbaabba', trace=Trace(full))
+    full.close()
+    ring = Trace(RingSink(5))
+    tm.run('abbaabba', trace=ring)
+    assert ring.sink.lines() == (tmp_path / "trace.txt").read_text().splitlines()[-5:]
+
+
+def test_tag_trace():
+    system = TwoTagSystem(['a1', 'a2', 'a3'], ["a1 -> a2a1a3", "a2 -> a1", "a3 -> *"])
+    trace = Trace(RingSink(), window=2)
+    assert system.forward("a2a1a1", trace=trace) == "a3a1"
+    assert trace.sink.lines() == ['a2a1... -> a1a1', 'a1a1 -> a2a1...', 'a2a1... -> a3a1']
+
+
+def test_delta_trace_replay_matches_run(root, tmp_path):
+    tm = TuringMachine(start_state='q0', accept_states=['q8'])
+    tm.load_program(str(root / 'Programs/palindrome_checker.txt'))
+    path = tmp_path / "run.trace"
+    trace = DeltaTrace(path, buffer_steps=16)
+    tm.run('abbaabba', trace=trace)
+    trace.close()
+    configurations = list(replay(path))
+    step, state, head, tape = configurations[-1]
+    assert len(configurations) == tm.steps + 1
+    assert (step, state, head) == (tm.steps, tm.current_state, tm.head_position)
+    assert tape == ''.join(tm.get_tape(*tm.tape.span())).strip('_')
+
+
+def test_delta_trace_rejects_tag_systems(tmp_path):
+    system = TwoTagSystem(['a1', 'a2', 'a3'], ["a1 -> a2a1a3", "a2 -> a1", "a3 -> *"])
+    with pytest.raises(Exception, match="Turing machines only"):
+        system.forward("a2a1a1", trace=DeltaTrace(tmp_path / "tag.trace"))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:02:36 2026
+
+@author: gelenag
+
+Minsky's universal machine ends with the word of the tag system it simulates
+"""
+import pytest
+from UNN.Engines import MacroEngine
+from UNN.Post import TwoTagSystem
+from UNN.Turing import Minsky47UniversalTuringMachine, RunResult
+
+PRODUCTIONS = ["a -> bH", "b -> ca", "c -> acb", "H -> *"]
+
+
+@pytest.fixture
+def utm(root, monkeypatch):
+    # the machine loads its program from TMs/ relative to the working directory
+    monkeypatch.chdir(root)
+    return Minsky47UniversalTuringMachine()
+
+
+def _tag():
+    return TwoTagSystem(alphabet=['a', 'b', 'c', 'H'], production=PRODUCTIONS)
+
+
+@pytest.mark.parametrize("word", ['aabc', 'bca', 'cccb', 'abcab'])
+def test_utm_matches_direct_run(utm, word):
+    tag = _tag()
+    direct = tag.forward(word)
+    utm.load_two_tag_system(tag)
+    result = utm.run(word)
+    assert result.status == RunResult.HALTED
+    assert ''.join(utm.get_tag_word()) == direct
+
+
+def test_utm_engines_agree(utm):
+    utm.load_two_tag_system(_tag())
+    steps = utm.run('aabc').steps
+    assert utm.run('aabc', engine=MacroEngine(4)).steps == steps
+    assert utm.run('aabc', max_steps=10 ** 7).steps == steps
+
+
+def test_utm_encoding(utm):
+    utm.load_two_tag_system(_tag())
+    # the halting letter has the number 0, a_1 the number 1, then N_k+1 = N_k + n_k + 2
+    assert utm.letter_number == {'H': 0, 'a': 1, 'b': 5, 'c': 9}
+    assert utm.encode_tag_word('aH') == '23' + '3'
+    with pytest.raises(Exception, match="No production"):
+        utm.encode_tag_word('x')
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:58:02 2026
+
+@author: gelenag
+
+Example: one program over many inputs, all machines advance in lockstep
+"""
+
+import random
+from UNN.Turing import TuringMachine
+from UNN.Batch import BatchTuringMachine
+
+states = ['q0', 'q1', 'q2', 'q3', 'q4', 'q5', 'H']
+alphabet = ['0', '1']
+tape_alphabet = ['0', '1', '_']     # _ is for blank
+start_state = 'q0'
+accept_states = ['H']
+
+tm = TuringMachine(states, alphabet, tape_alphabet, start_state, accept_states)
+tm.load_program('Programs/binary_addition.txt')
+
+inputs = []
+for _ in range(1000):
+    a, b = random.randint(1, 255), random.randint(1, 63)
+    inputs.append("{:b}_{:b}".format(a, b))
+
+results = BatchTuringMachine(tm).run(inputs)
+for r in results[:10]:
+    print("{} -> {} ({}, {} steps)".format(r["input"], r["tape"], r["status"], r["steps"]))
+
+#%% job lists over several machines on all cores (python -m UNN.Batch jobs.jsonl runs a JSONL file)
+from UNN.Batch import BatchRunner
+
+jobs = [{"machine": "Programs/binary_addition.txt", "input": i, "start_state": "q0", "accept_states": ["H"]}
+        for i in inputs[:100]]
+jobs.append({"machine": "TMs/binary_addition.txt", "max_steps": 1000})
+for r in list(BatchRunner(processes=2).run(jobs))[-3:]:
+    print("{} {} -> {} ({}, {} steps)".format(r["machine"], r["input"], r["tape"], r["status"], r["steps"]))
@@ -19,4 +19,10 @@ accept_states = ['q1']
 tm = TuringMachine(states, alphabet, tape_alphabet, start_state, accept_states,  blank_symbol='_', verbose=True)
 tm.load_program('Programs/toggle_bits.txt')
 
-tm.run(input_string)
\ No newline at end of file
+tm.run(input_string)
+
+#%% Profile: which transitions are hot, how far the head travelled
+tm.verbose = False
+result = tm.run(input_string, profile=True)
+print(result.profile.table())
+print("head range:", result.profile.head_min, result.profile.head_max)